@@ -0,0 +1,79 @@
+"""
+Porovná cenu jedné operace nad položkou plátna adresovanou tagem
+(např. "Rectangle17", jak to dělaly tvary dříve) a celočíselným id
+položky, které tvary používají nyní.
+
+Měří itemconfig, coords, move a tag_raise na plátně s N položkami
+a navíc cenu skládání jména tvaru (__repr__) oproti uloženému jménu.
+
+    python benchmarks/canvas_ids.py --backend memory --items 1000
+Bez displeje je třeba použít backend memory.
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shapes.Backends import create_backend  # noqa: E402
+
+
+def run(backend_name: str, items: int, number: int) -> dict:
+    """
+    Vytvoří plátno s items obdélníky a změří operace nad prostřední položkou.
+    :return: dict {operace: {"tag": µs, "id": µs}}
+    """
+    backend = create_backend(backend_name)
+    item_ids = [backend.create_rectangle(i, i, i + 10, i + 10, tag="Rectangle" + str(i), fill="red")
+                for i in range(items)]
+    middle = items // 2
+    tag = "Rectangle" + str(middle)
+    item_id = item_ids[middle]
+
+    operations = {
+        "itemconfig": lambda target: backend.itemconfig(target, fill="blue"),
+        "coords": lambda target: backend.coords(target, 1, 2, 3, 4),
+        "move": lambda target: backend.move(target, 1, 1),
+        "tag_raise": lambda target: backend.tag_raise(target),
+    }
+    results = {}
+    for name, operation in operations.items():
+        results[name] = {
+            "tag": timeit.timeit(lambda: operation(tag), number=number) / number * 1e6,
+            "id": timeit.timeit(lambda: operation(item_id), number=number) / number * 1e6,
+        }
+
+    class Named:
+        id = str(middle)
+        _repr = "Rectangle" + id
+    named = Named()
+    results["repr"] = {
+        "tag": timeit.timeit(lambda: named.__class__.__name__ + named.id, number=number) / number * 1e6,
+        "id": timeit.timeit(lambda: named._repr, number=number) / number * 1e6,
+    }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", default=os.environ.get("SHAPES_BACKEND", "tk"))
+    parser.add_argument("--items", type=int, default=1000, help="počet položek na plátně")
+    parser.add_argument("--number", type=int, default=2000, help="počet opakování operace")
+    parser.add_argument("--json", action="store_true", help="výstup jako JSON")
+    args = parser.parse_args()
+
+    results = run(args.backend, args.items, args.number)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"backend {args.backend}, {args.items} položek, µs na operaci")
+    print(f"{'operace':>12} {'tag':>10} {'id':>10} {'zrychlení':>10}")
+    for name, result in results.items():
+        print(f"{name:>12} {result['tag']:10.3f} {result['id']:10.3f} {result['tag'] / result['id']:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
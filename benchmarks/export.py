@@ -0,0 +1,93 @@
+"""
+Měří export plátna do SVG a PostScriptu pro velké scény.
+
+Vytvoří na backendu memory N tvarů (obdélníky, elipsy a trojúhelníky
+střídavě, část z nich v multishapech) a změří čas exportu do
+dočasného souboru, velikost souboru a s --memory i nejvyšší
+přírůstek paměti během exportu (export zapisuje postupně, paměť
+nemá růst s počtem tvarů).
+
+    python benchmarks/export.py --count 1000000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import shapes  # noqa: E402
+
+
+def build_scene(count: int, group_size: int) -> None:
+    """
+    Vytvoří count tvarů, každých group_size obdélníků tvoří multishape.
+    """
+    third = count // 3
+    xs = [i * 7 % 990 for i in range(third)]
+    ys = [i * 13 % 990 for i in range(third)]
+    shapes.Ellipse.bulk(xs, ys, 8, 6, shapes.BLUE)
+    shapes.Triangle.bulk(xs, ys, 8, 6, shapes.GREEN)
+    rectangles = shapes.Rectangle.bulk(xs, ys, 8, 6, shapes.RED)
+    if group_size:
+        with shapes.canvas.batch():
+            for start in range(0, len(rectangles), group_size):
+                multishape = shapes.Multishape(f"group {start // group_size}")
+                for part in rectangles[start:start + group_size]:
+                    multishape.add_shape(part)
+                multishape.creation_is_done()
+
+
+def measure(function, path: str, memory: bool) -> dict:
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    written = function(path)
+    elapsed = time.perf_counter() - start
+    result = {"shapes": written, "seconds": elapsed, "shapes_per_s": written / elapsed,
+              "file_mb": os.path.getsize(path) / 1e6}
+    if memory:
+        result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=1000000, help="počet tvarů")
+    parser.add_argument("--group-size", type=int, default=100,
+                        help="počet obdélníků v jednom multishapu, 0 = bez multishapů")
+    parser.add_argument("--memory", action="store_true", help="změří i paměť (export je pak pomalejší)")
+    parser.add_argument("--json", action="store_true", help="výstup jako JSON")
+    args = parser.parse_args()
+
+    shapes.use_backend("memory")
+    start = time.perf_counter()
+    build_scene(args.count, args.group_size)
+    build = time.perf_counter() - start
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        results["svg"] = measure(shapes.export_svg, os.path.join(directory, "scene.svg"), args.memory)
+        results["postscript"] = measure(shapes.export_postscript, os.path.join(directory, "scene.ps"),
+                                        args.memory)
+
+    if args.json:
+        print(json.dumps({"count": args.count, "build_s": build, "results": results}, indent=2))
+        return
+    print(f"{args.count} tvarů, vytvoření {build:.2f} s")
+    for name, result in results.items():
+        line = (f"{name:>11}: {result['seconds']:7.2f} s  {result['shapes_per_s'] / 1000:8.1f} tis. tvarů/s"
+                f"  {result['file_mb']:8.1f} MB")
+        if "peak_mb" in result:
+            line += f"  paměť {result['peak_mb']:.1f} MB"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Měří, jak dlouho trvá `import shapes`.
+
+Spouští `python -X importtime -c "import shapes"` v samostatném procesu,
+z výpisu vezme kumulativní čas modulu shapes a vypíše medián z několika
+běhů. Zároveň zjistí, zda import načetl tkinter.
+
+Porovnání před/po:
+    python benchmarks/import_time.py --ref baseline_commit
+změří stejný import ve stromu zadané git revize (rozbalené do dočasného
+adresáře) a vedle něj aktuální pracovní strom.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHECK_TKINTER = "import sys; import shapes; print('tkinter' in sys.modules)"
+
+
+def measure(path: str, repeat: int) -> dict:
+    """
+    Změří import balíčku shapes ležícího v adresáři path.
+    :param path: adresář, ve kterém je balíček shapes
+    :param repeat: počet opakování
+    :return: dict s mediánem, minimem a informací o tkinter
+    """
+    env = dict(os.environ, PYTHONPATH=path)
+    times = []
+    error = None
+    tkinter_loaded = None
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", _CHECK_TKINTER],
+                                cwd=path, env=env, capture_output=True, text=True)
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and line.rstrip().endswith("| shapes"):
+                times.append(int(line.split("|")[1]))
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1]
+        else:
+            tkinter_loaded = result.stdout.strip() == "True"
+    return {
+        "path": path,
+        "median_us": statistics.median(times) if times else None,
+        "min_us": min(times) if times else None,
+        "runs": len(times),
+        "tkinter_loaded": tkinter_loaded,
+        "error": error,
+    }
+
+
+def export_revision(ref: str, directory: str) -> None:
+    """
+    Rozbalí balíček shapes ze zadané git revize do adresáře.
+    """
+    archive = subprocess.run(["git", "archive", ref, "shapes"], cwd=REPO_ROOT,
+                             capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", directory], input=archive.stdout, check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ref", help="git revize, se kterou se má porovnat")
+    parser.add_argument("--repeat", type=int, default=10, help="počet opakování")
+    parser.add_argument("--json", action="store_true", help="výstup jako JSON")
+    args = parser.parse_args()
+
+    results = {}
+    if args.ref:
+        with tempfile.TemporaryDirectory() as directory:
+            export_revision(args.ref, directory)
+            results[args.ref] = measure(directory, args.repeat)
+    results["working tree"] = measure(REPO_ROOT, args.repeat)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, result in results.items():
+        if result["median_us"] is None:
+            print(f"{name:>14}: nepodařilo se změřit ({result['error']})")
+            continue
+        print(f"{name:>14}: median {result['median_us'] / 1000:7.2f} ms, "
+              f"min {result['min_us'] / 1000:7.2f} ms, "
+              f"tkinter načten: {result['tkinter_loaded']}"
+              + (f", chyba: {result['error']}" if result["error"] else ""))
+
+
+if __name__ == "__main__":
+    main()
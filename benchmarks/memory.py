@@ -0,0 +1,126 @@
+"""
+Měří paměť, kterou zabere jeden tvar, při velkém počtu tvarů.
+
+Pro každý druh tvaru vytvoří v samostatném procesu N instancí na
+backendu memory a pomocí tracemalloc změří, kolik bajtů přibylo.
+Od toho odečte paměť položek display listu backendu (ty nejsou
+součástí tvaru), takže zbývá paměť objektu tvaru včetně jeho
+atributů a záznamu v registru plátna.
+
+Porovnání před/po:
+    python benchmarks/memory.py --ref <revize> --count 1000000
+změří stejné tvary ve stromu zadané git revize a v pracovním stromu.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# kód měření, běží v samostatném procesu s balíčkem shapes ze zadaného stromu
+_MEASURE = """
+import gc, json, sys, tracemalloc
+import shapes
+from shapes.Backends import MemoryBackend
+
+kind, count = sys.argv[1], int(sys.argv[2])
+shapes.use_backend("memory")
+factory = {
+    "Rectangle": lambda i: shapes.Rectangle(i % 1000, i // 1000, 10, 10),
+    "Ellipse": lambda i: shapes.Ellipse(i % 1000, i // 1000, 10, 10),
+    "Triangle": lambda i: shapes.Triangle(i % 1000, i // 1000, 10, 10),
+    "Text": lambda i: shapes.Text(i % 1000, i // 1000, "text"),
+}[kind]
+create_item = {
+    "Rectangle": "create_rectangle", "Ellipse": "create_oval",
+    "Triangle": "create_polygon", "Text": "create_text",
+}[kind]
+shapes.canvas.backend
+factory(0).remove()
+
+gc.collect()
+tracemalloc.start()
+start = tracemalloc.get_traced_memory()[0]
+with shapes.canvas.batch():
+    created = [factory(i) for i in range(count)]
+total = tracemalloc.get_traced_memory()[0] - start
+
+# stejné položky přímo v backendu, bez tvarů
+backend = MemoryBackend()
+coords = created[-1].get_coord() if hasattr(created[-1], "get_coord") else (created[-1].x, created[-1].y)
+gc.collect()
+start = tracemalloc.get_traced_memory()[0]
+items = [getattr(backend, create_item)(coords, tag="Rectangle" + str(1000000 + i), fill="#ffff00")
+         for i in range(count)]
+backend_total = tracemalloc.get_traced_memory()[0] - start
+tracemalloc.stop()
+
+print(json.dumps({
+    "count": count,
+    "total_bytes_per_shape": total / count,
+    "backend_bytes_per_item": backend_total / count,
+    "shape_bytes": (total - backend_total) / count,
+    "getsizeof": sys.getsizeof(created[0]),
+    "has_dict": hasattr(created[0], "__dict__"),
+}))
+"""
+
+
+def measure(path: str, kind: str, count: int) -> dict:
+    """
+    Změří tvary druhu kind z balíčku shapes v adresáři path.
+    """
+    env = dict(os.environ, PYTHONPATH=path)
+    result = subprocess.run([sys.executable, "-c", _MEASURE, kind, str(count)],
+                            cwd=path, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"error": result.stderr.strip().splitlines()[-1]}
+    return json.loads(result.stdout)
+
+
+def export_revision(ref: str, directory: str) -> None:
+    """
+    Rozbalí balíček shapes ze zadané git revize do adresáře.
+    """
+    archive = subprocess.run(["git", "archive", ref, "shapes"], cwd=REPO_ROOT,
+                             capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", directory], input=archive.stdout, check=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--ref", help="git revize, se kterou se má porovnat")
+    parser.add_argument("--count", type=int, default=100000, help="počet tvarů")
+    parser.add_argument("--kinds", nargs="+", default=["Rectangle", "Ellipse", "Triangle", "Text"])
+    parser.add_argument("--json", action="store_true", help="výstup jako JSON")
+    args = parser.parse_args()
+
+    trees = {}
+    with tempfile.TemporaryDirectory() as directory:
+        if args.ref:
+            export_revision(args.ref, directory)
+            trees[args.ref] = directory
+        trees["working tree"] = REPO_ROOT
+        results = {name: {kind: measure(path, kind, args.count) for kind in args.kinds}
+                   for name, path in trees.items()}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.count} tvarů, bajtů na tvar (bez položky backendu)")
+    print(f"{'strom':>14} {'tvar':>10} {'tvar B':>9} {'celkem B':>9} {'getsizeof':>10} {'__dict__':>9}")
+    for name, kinds in results.items():
+        for kind, result in kinds.items():
+            if "error" in result:
+                print(f"{name:>14} {kind:>10} chyba: {result['error']}")
+                continue
+            print(f"{name:>14} {kind:>10} {result['shape_bytes']:9.1f} "
+                  f"{result['total_bytes_per_shape']:9.1f} {result['getsizeof']:>10} {str(result['has_dict']):>9}")
+
+
+if __name__ == "__main__":
+    main()
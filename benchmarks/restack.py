@@ -0,0 +1,99 @@
+"""
+Měří cenu přeskládání multishapu (raise_above_shape, lower_below_shape)
+pro multishapy s 10, 100, 1 000 a 10 000 částmi.
+
+Porovnává hromadný přesun přes skupinový tag (jeden tag_raise/tag_lower)
+s původním přesouváním část po části, kdy každá část posílá vlastní
+tag_raise/tag_lower.
+
+    python benchmarks/restack.py --backend memory
+Bez displeje je třeba použít backend memory.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import shapes  # noqa: E402
+
+
+def per_part_raise(multishape, shape) -> None:
+    """
+    Původní algoritmus - každá část se zvedne zvlášť.
+    """
+    with shapes.canvas.batch():
+        for part in reversed(multishape._get_parts_in_order()):
+            part.raise_above_shape(shape)
+
+
+def per_part_lower(multishape, shape) -> None:
+    """
+    Původní algoritmus - každá část se sníží zvlášť.
+    """
+    with shapes.canvas.batch():
+        for part in multishape._get_parts_in_order():
+            part.lower_below_shape(shape)
+
+
+def measure(function, repeat: int) -> float:
+    """
+    Vrátí nejlepší čas jednoho volání v milisekundách.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def run(sizes, repeat: int) -> dict:
+    results = {}
+    for size in sizes:
+        with shapes.canvas.batch():
+            below = shapes.Rectangle(0, 0, 10, 10)
+            parts = [shapes.Rectangle(i % 500, i // 500, 5, 5) for i in range(size)]
+            above = shapes.Rectangle(0, 0, 10, 10)
+        multishape = shapes.Multishape("benchmark", parts)
+        multishape.creation_is_done()
+        calls = multishape.tk_calls
+        results[size] = {
+            "group_raise_ms": measure(lambda: multishape.raise_above_shape(above), repeat),
+            "group_lower_ms": measure(lambda: multishape.lower_below_shape(below), repeat),
+            "group_tk_calls": (multishape.tk_calls - calls) / (2 * repeat),
+            "per_part_raise_ms": measure(lambda: per_part_raise(multishape, above), repeat),
+            "per_part_lower_ms": measure(lambda: per_part_lower(multishape, below), repeat),
+            "per_part_tk_calls": size,
+        }
+        multishape.remove()
+        below.remove()
+        above.remove()
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", default=os.environ.get("SHAPES_BACKEND", "tk"))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="výstup jako JSON")
+    args = parser.parse_args()
+
+    shapes.use_backend(args.backend)
+    results = run(args.sizes, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"backend {args.backend}, nejlepší čas z {args.repeat} v ms")
+    print(f"{'částí':>7} {'raise':>10} {'lower':>10} {'po částech raise':>17} {'po částech lower':>17}")
+    for size, result in results.items():
+        print(f"{size:>7} {result['group_raise_ms']:10.3f} {result['group_lower_ms']:10.3f} "
+              f"{result['per_part_raise_ms']:17.3f} {result['per_part_lower_ms']:17.3f}")
+
+
+if __name__ == "__main__":
+    main()
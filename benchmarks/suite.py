@@ -0,0 +1,416 @@
+"""
+Sada benchmarků hlavních operací balíčku shapes.
+
+Měří vytváření tvarů a textů, posuny (move_*, set_position),
+Multishape.set_size, set_position a copy pro 10 až 10 000 částí,
+add_shape pro 100 000 částí, vnořené multishapy (strom robotů),
+razítka multishapu (stamp) proti copy, raise_above_shape
+a lower_below_shape, Triangle.get_coord pro všech osm směrů
+(opakovaně i po změně polohy),
+vyhledání barev přes getColor, přebarvování po snímcích barevného
+přechodu a vykreslení plátna do obrázku (rasterize, PNG).
+
+    python benchmarks/suite.py --json --output vysledky.json
+    python benchmarks/suite.py --compare vysledky.json
+Výsledky ve formátu JSON je možné porovnat mezi commity. Bez displeje
+se použije backend memory (je také základní).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import shapes  # noqa: E402
+from shapes.Animation import Tween  # noqa: E402
+
+# registr benchmarků v pořadí definice, viz benchmark()
+_BENCHMARKS = {}
+
+
+def benchmark(function):
+    """
+    Dekorátor, který zařadí funkci do sady. Funkce dostane parametry
+    příkazové řádky a vrátí dict {název případu: výsledek}.
+    """
+    _BENCHMARKS[function.__name__] = function
+    return function
+
+
+def measure(function, repeat: int, operations: int = 1, setup=None) -> dict:
+    """
+    Změří funkci repeat krát a vrátí nejlepší a střední čas.
+    :param operations: počet operací v jednom volání, pro přepočet na jednu
+    :param setup: funkce volaná před každým měřením, do času se nepočítá
+    :return: dict s best_ms, median_ms a per_op_us
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    times.sort()
+    best = times[0]
+    return {
+        "best_ms": best * 1000,
+        "median_ms": times[len(times) // 2] * 1000,
+        "per_op_us": best / operations * 1e6,
+    }
+
+
+def clear_canvas() -> None:
+    """
+    Odstraní z plátna všechny tvary a texty, aby případy neovlivňovaly
+    jeden druhý.
+    """
+    with shapes.canvas.batch():
+        for shape in shapes.canvas.all_shapes:
+            shape.remove()
+
+
+def build_multishape(parts: int) -> shapes.Multishape:
+    with shapes.canvas.batch():
+        multishape = shapes.Multishape("benchmark", [
+            shapes.Rectangle(i % 100 * 5, i // 100 * 5, 4, 4) for i in range(parts)])
+    multishape.creation_is_done()
+    return multishape
+
+
+@benchmark
+def creation(args) -> dict:
+    count = args.count
+    factories = {
+        "Rectangle": lambda i: shapes.Rectangle(i % 500, i // 500, 10, 10),
+        "Ellipse": lambda i: shapes.Ellipse(i % 500, i // 500, 10, 10),
+        "Triangle": lambda i: shapes.Triangle(i % 500, i // 500, 10, 10),
+        "Text": lambda i: shapes.Text(i % 500, i // 500, "text"),
+    }
+    results = {}
+    for name, factory in factories.items():
+        def create(factory=factory):
+            with shapes.canvas.batch():
+                for i in range(count):
+                    factory(i)
+        results[f"create_{name}[{count}]"] = measure(create, args.repeat, count, setup=clear_canvas)
+    xs = [i % 500 for i in range(count)]
+    ys = [i // 500 for i in range(count)]
+    results[f"create_Rectangle_bulk[{count}]"] = measure(
+        lambda: shapes.Rectangle.bulk(xs, ys, 10, 10), args.repeat, count, setup=clear_canvas)
+    results[f"create_Triangle_bulk[{count}]"] = measure(
+        lambda: shapes.Triangle.bulk(xs, ys, 10, 10), args.repeat, count, setup=clear_canvas)
+    clear_canvas()
+    return results
+
+
+@benchmark
+def movement(args) -> dict:
+    count = args.count
+    with shapes.canvas.batch():
+        rectangles = [shapes.Rectangle(i % 500, i // 500, 10, 10) for i in range(count)]
+
+    def move_all():
+        with shapes.canvas.batch():
+            for rectangle in rectangles:
+                rectangle.move_right(1)
+                rectangle.move_down(1)
+                rectangle.move_left(1)
+                rectangle.move_up(1)
+
+    def set_position_all():
+        with shapes.canvas.batch():
+            for rectangle in rectangles:
+                rectangle.set_position(rectangle.x + 1, rectangle.y)
+
+    def move_unbatched():
+        for rectangle in rectangles:
+            rectangle.move_right(1)
+
+    results = {
+        f"move_*[{count}]": measure(move_all, args.repeat, 4 * count),
+        f"set_position[{count}]": measure(set_position_all, args.repeat, count),
+        f"move_right_unbatched[{count}]": measure(move_unbatched, args.repeat, count),
+    }
+    clear_canvas()
+    return results
+
+
+@benchmark
+def multishape(args) -> dict:
+    results = {}
+    for parts in args.sizes:
+        multishape = build_multishape(parts)
+        sizes = [(multishape.width * 2, multishape.height * 2), (multishape.width, multishape.height)]
+
+        def set_size():
+            for width, height in sizes:
+                multishape.set_size(width, height)
+
+        def set_position():
+            multishape.set_position(multishape.x + 10, multishape.y + 10)
+
+        results[f"multishape_set_size[{parts}]"] = measure(set_size, args.repeat, 2)
+        results[f"multishape_set_position[{parts}]"] = measure(set_position, args.repeat)
+        copies = []
+
+        def copy():
+            with shapes.canvas.batch():
+                copies.append(multishape.copy())
+
+        results[f"multishape_copy[{parts}]"] = measure(copy, args.repeat)
+        clear_canvas()
+    # robot z robotů: strom vnořených multishapů, každý list má 4 části
+    for depth in (4, 8):
+        def build_tree(level=depth):
+            if level == 0:
+                return build_multishape(4)
+            return shapes.Multishape(f"level {level}", build_tree(level - 1), build_tree(level - 1))
+
+        results[f"multishape_nest[depth {depth}]"] = measure(build_tree, args.repeat, 2 ** depth,
+                                                              setup=clear_canvas)
+        tree = build_tree()
+        results[f"multishape_nested_set_position[depth {depth}]"] = measure(
+            lambda: tree.set_position(tree.x + 10, tree.y + 10), args.repeat)
+        clear_canvas()
+    # přidávání částí po jedné, obvodový obdélník se jen rozšiřuje
+    count = max(args.sizes) * 10
+    parts = []
+
+    def new_parts():
+        clear_canvas()
+        parts[:] = shapes.Rectangle.bulk([i % 1000 for i in range(count)], [i // 1000 for i in range(count)], 4, 4)
+
+    def add_shapes():
+        multishape = shapes.Multishape("benchmark")
+        for part in parts:
+            multishape.add_shape(part)
+        return multishape.width, multishape.height
+
+    results[f"multishape_add_shape[{count}]"] = measure(add_shapes, args.repeat, count, setup=new_parts)
+    clear_canvas()
+    return results
+
+
+@benchmark
+def instancing(args) -> dict:
+    count = args.count
+    positions = [(i % 50 * 10, i // 50 * 10) for i in range(count)]
+    prototype = None
+    instances = []
+
+    def copies():
+        with shapes.canvas.batch():
+            for x, y in positions:
+                prototype.copy().set_position(x, y)
+
+    def stamp():
+        instances.extend(prototype.stamp(positions))
+
+    def new_prototype():
+        # položky instancí nejsou v registru tvarů, clear_canvas je nesmaže
+        nonlocal prototype
+        shapes.MultishapeInstance.remove_many(instances)
+        instances.clear()
+        clear_canvas()
+        prototype = build_multishape(50)
+
+    results = {
+        f"multishape_copy_50[{count}]": measure(copies, args.repeat, count, setup=new_prototype),
+        f"multishape_stamp_50[{count}]": measure(stamp, args.repeat, count, setup=new_prototype),
+    }
+    new_prototype()
+    clear_canvas()
+    return results
+
+
+@benchmark
+def stacking(args) -> dict:
+    results = {}
+    for parts in args.sizes:
+        below = shapes.Rectangle(0, 0, 10, 10)
+        multishape = build_multishape(parts)
+        above = shapes.Rectangle(0, 0, 10, 10)
+        results[f"multishape_raise_above_shape[{parts}]"] = measure(
+            lambda: multishape.raise_above_shape(above), args.repeat)
+        results[f"multishape_lower_below_shape[{parts}]"] = measure(
+            lambda: multishape.lower_below_shape(below), args.repeat)
+        clear_canvas()
+
+    count = args.count
+    with shapes.canvas.batch():
+        rectangles = [shapes.Rectangle(i % 500, i // 500, 10, 10) for i in range(count)]
+    target = rectangles[count // 2]
+
+    def raise_all():
+        with shapes.canvas.batch():
+            for rectangle in rectangles:
+                rectangle.raise_above_shape(target)
+
+    def lower_all():
+        with shapes.canvas.batch():
+            for rectangle in rectangles:
+                rectangle.lower_below_shape(target)
+
+    results[f"shape_raise_above_shape[{count}]"] = measure(raise_all, args.repeat, count)
+    results[f"shape_lower_below_shape[{count}]"] = measure(lower_all, args.repeat, count)
+    clear_canvas()
+    return results
+
+
+@benchmark
+def triangle_coords(args) -> dict:
+    number = args.number
+    triangle = shapes.Triangle(10, 20, 30, 40)
+    results = {}
+    for direction in shapes.values8:
+        triangle.dir8 = direction
+
+        def get_coord():
+            for _ in range(number):
+                triangle.get_coord()
+
+        def get_coord_changed():
+            # poloha se mění, vrcholy se pokaždé spočítají ze šablony
+            for i in range(number):
+                triangle.x = i
+                triangle.get_coord()
+
+        results[f"triangle_get_coord[{direction.short_name}]"] = measure(get_coord, args.repeat, number)
+        results[f"triangle_get_coord_changed[{direction.short_name}]"] = measure(get_coord_changed, args.repeat,
+                                                                                 number)
+    clear_canvas()
+    return results
+
+
+@benchmark
+def colors(args) -> dict:
+    number = args.number
+    names = ["black", "blue", "red", "yellow", "brown"]
+    components = [color.rgb for color in (shapes.BLACK, shapes.BLUE, shapes.RED, shapes.YELLOW, shapes.BROWN)]
+
+    def by_name():
+        for i in range(number):
+            shapes.getColor(name=names[i % 5])
+
+    def by_rgb():
+        for i in range(number):
+            shapes.getColor(*components[i % 5])
+
+    def by_rgb_fade():
+        # nepojmenované barvy přechodu, registr je drží omezeně
+        for i in range(number):
+            shapes.getColor(i % 256, 0, 255 - i % 256)
+
+    # přebarvení všech tvarů v každém snímku barevného přechodu
+    count = args.count
+    rectangles = shapes.Rectangle.bulk([i % 500 for i in range(count)], [i // 500 for i in range(count)],
+                                       10, 10, shapes.RED)
+    tweens = [Tween(rectangle, "color", shapes.RED, shapes.BLUE, 0, 1000) for rectangle in rectangles]
+
+    def fade_frames():
+        for frame in range(10):
+            with shapes.canvas.batch():
+                for tween in tweens:
+                    tween.apply(frame / 10)
+
+    results = {
+        "getColor_by_name": measure(by_name, args.repeat, number),
+        "getColor_by_rgb": measure(by_rgb, args.repeat, number),
+        "getColor_by_rgb_fade": measure(by_rgb_fade, args.repeat, number),
+        f"color_fade_frame[{count}]": measure(fade_frames, args.repeat, 10 * count),
+    }
+    clear_canvas()
+    return results
+
+
+@benchmark
+def raster(args) -> dict:
+    count = args.count
+    factories = (shapes.Rectangle, shapes.Ellipse, shapes.Triangle)
+    colors = (shapes.RED, shapes.BLUE, shapes.GREEN, shapes.BROWN)
+    with shapes.canvas.batch():
+        for i in range(count):
+            factories[i % 3](i * 7 % 990, i * 13 % 990, 3 + i % 8, 3 + i % 7, colors[i % 4])
+    framebuffer = shapes.rasterize(1000, 1000, use_numpy=False)
+    results = {
+        f"rasterize[{count}]": measure(lambda: shapes.rasterize(1000, 1000, use_numpy=False), args.repeat, count),
+        "to_png[1000x1000]": measure(framebuffer.to_png, args.repeat),
+    }
+    if shapes.OptionalNumpy.get_numpy() is not None:
+        results[f"rasterize_numpy[{count}]"] = measure(
+            lambda: shapes.rasterize(1000, 1000, use_numpy=True), args.repeat, count)
+    clear_canvas()
+    return results
+
+
+def metadata(backend: str) -> dict:
+    """
+    Vrátí informace o běhu, aby šlo výsledky přiřadit ke commitu.
+    """
+    commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                            capture_output=True, text=True).stdout.strip() or None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "backend": backend,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def print_results(results: dict, previous: dict | None) -> None:
+    header = f"{'případ':<42} {'nejlepší ms':>12} {'µs/operace':>12}"
+    if previous is not None:
+        header += f" {'předtím µs':>12} {'poměr':>7}"
+    print(header)
+    for name, result in results.items():
+        line = f"{name:<42} {result['best_ms']:12.3f} {result['per_op_us']:12.3f}"
+        if previous is not None and name in previous:
+            old = previous[name]["per_op_us"]
+            line += f" {old:12.3f} {result['per_op_us'] / old if old else float('nan'):6.2f}x"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backend", default=os.environ.get("SHAPES_BACKEND", "memory"))
+    parser.add_argument("--only", nargs="+", choices=list(_BENCHMARKS), help="spustí jen vybrané skupiny")
+    parser.add_argument("--count", type=int, default=1000, help="počet tvarů pro tvorbu a posuny")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="počty částí multishapu")
+    parser.add_argument("--number", type=int, default=10000, help="počet volání get_coord a getColor")
+    parser.add_argument("--repeat", type=int, default=5, help="počet opakování, bere se nejlepší")
+    parser.add_argument("--json", action="store_true", help="výstup jako JSON")
+    parser.add_argument("--output", help="soubor, do kterého se uloží JSON")
+    parser.add_argument("--compare", help="JSON z předchozího běhu pro porovnání")
+    args = parser.parse_args()
+
+    shapes.use_backend(args.backend)
+    results = {}
+    for name in args.only or _BENCHMARKS:
+        results.update(_BENCHMARKS[name](args))
+    report = {"meta": metadata(args.backend), "results": results}
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            previous = json.load(file)["results"]
+    print(f"backend {args.backend}, commit {report['meta']['commit']}")
+    print_results(results, previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,70 +4,102 @@ Zde najdete všechjny abstraktní třídy
 
 from .Interfaces import *
 
+# Příznaky změn, které ještě nebyly odeslány na plátno, viz Paintable
+DIRTY_GEOMETRY = 1
+DIRTY_COLOR = 2
+DIRTY_TEXT = 4
+
 
 class ID(ABC):
+    """
+    Objekt s pořadovým číslem a jménem.
+    Atributy _repr a canvas_id mají ve __slots__ až konkrétní třídy,
+    aby se sloty nepotkaly s jinou větví dědičnosti.
+    """
+    __slots__ = ()
     _counter = 0
     canvas_id: int
 
     def __init__(self):
         ID._counter += 1
-        self.id = str(ID._counter)
+        # jméno se nemění, stačí ho složit jednou, id se z něj odvodí
+        self._repr = self.__class__.__name__ + str(ID._counter)
+
+    @property
+    def id(self) -> str:
+        """
+        Pořadové číslo objektu jako str.
+        """
+        return self._repr[len(self.__class__.__name__):]
 
     def __repr__(self) -> str:
         """
         Dunderová metota
         :return: str s jménem řídy a id třídy
         """
-        return self.__class__.__name__ + self.id
+        return self._repr
 
 
 class Coord(ABC):
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y):
         self.x = x
         self.y = y
 
 
 class Movable(Coord, IMovable, ABC):
+    __slots__ = ()
 
     def move_up(self, length=25) -> None:
         """
         Metoda pohne obrazcem nahoru
         :param length: jak dlouhý má být krok
         """
-        self.y -= length
-        self._count_corners()
-        self.paint()
+        self._move_by(0, -length)
 
     def move_down(self, length=25) -> None:
         """
         Metoda pohne obrazcem nahoru
         :param length: jak dlouhý má být krok
         """
-        self.y += length
-        self._count_corners()
-        self.paint()
+        self._move_by(0, length)
 
     def move_right(self, length=25) -> None:
         """
         Metoda pohne obrazcem doprava
         :param length: jak dlouhý má být krok
         """
-        self.x += length
-        self._count_corners()
-        self.paint()
+        self._move_by(length, 0)
 
     def move_left(self, length=25) -> None:
         """
         Metoda pohne obrazcem doleva
         :param length: jak dlouhý má být krok
         """
-        self.x -= length
-        self._count_corners()
-        self.paint()
+        self._move_by(-length, 0)
 
     def set_position(self, x: int, y: int) -> None:
+        dx = x - self.x
+        dy = y - self.y
         self.x = x
         self.y = y
+        self._moved(dx, dy)
+
+    def _move_by(self, dx, dy) -> None:
+        """
+        Posune obrazec o dx, dy.
+        """
+        self.x += dx
+        self.y += dy
+        self._moved(dx, dy)
+
+    def _moved(self, dx, dy) -> None:
+        """
+        Obrazec byl posunut o dx, dy, aktualizuje ho na plátně.
+        Potomci mohou místo překreslení použít rychlejší posun
+        položky na plátně.
+        """
         self._count_corners()
         self.paint()
 
@@ -79,6 +111,8 @@ class Movable(Coord, IMovable, ABC):
 
 
 class Resizable(Movable, Coord, ABC):
+    __slots__ = ('width', 'height')
+
     def __init__(self, x, y, width, height):
         Coord.__init__(self, x, y)
         Movable.__init__(self, x, y)
@@ -86,8 +120,19 @@ class Resizable(Movable, Coord, ABC):
         self.height = height
         self.width = width
 
-        self.corner_1 = (x, y)
-        self.corner_2 = (x + width, y + height)
+    @property
+    def corner_1(self) -> tuple:
+        """
+        Levý horní roh, odvozuje se z polohy.
+        """
+        return self.x, self.y
+
+    @property
+    def corner_2(self) -> tuple:
+        """
+        Pravý dolní roh, odvozuje se z polohy a velikosti.
+        """
+        return self.x + self.width, self.y + self.height
 
     def set_width(self, width: int) -> None:
         self.width = width
@@ -110,6 +155,16 @@ class Resizable(Movable, Coord, ABC):
 
 
 class Paintable(ABC):
+    """
+    Objekt vykreslovaný na plátně. V atributu _dirty si pamatuje,
+    které jeho vlastnosti se od posledního paint() změnily, aby
+    paint() poslal na plátno jen to, co je opravdu potřeba.
+    V tk_calls počítá příkazy, které na plátno poslal.
+    Atributy _is_painted_on_canvas, _dirty a tk_calls mají ve __slots__
+    konkrétní třídy a musí je nastavit ještě před první změnou.
+    """
+    __slots__ = ()
+
     def __init__(self):
         self._is_painted_on_canvas = False
         self.paint()
@@ -120,6 +175,8 @@ class Paintable(ABC):
 
 
 class Removable(ABC):
+    __slots__ = ()
+
     def __init__(self):
         self._is_painted_on_canvas = False
         self.paint()
@@ -0,0 +1,278 @@
+"""
+Zde najdete animace tvarů, které neblokují smyčku událostí.
+Animace (tween) plynule mění polohu, velikost nebo barvu tvaru,
+multishapu či textu z aktuální hodnoty na cílovou za zadanou dobu.
+Všechny běžící animace posouvá jeden snímkový časovač (Animator)
+naplánovaný přes after(), každý snímek v jedné dávce překreslení.
+"""
+
+import time
+
+from .NamedColor import color_blend
+
+
+def linear(t: float) -> float:
+    """
+    Rovnoměrný průběh animace.
+    """
+    return t
+
+
+def ease_in_out(t: float) -> float:
+    """
+    Animace se pomalu rozjede a na konci pomalu zastaví.
+    """
+    return t * t * (3 - 2 * t)
+
+
+class Tween:
+    """
+    Jedna animace jedné vlastnosti (position, size nebo color) cíle.
+    Hodnota se počítá z uplynulého času, ne přičítáním po snímcích,
+    takže vynechaný snímek nezpůsobí odchylku od cílové hodnoty.
+    """
+
+    def __init__(self, target, kind: str, start, end, start_time: float, duration: float,
+                 easing=linear, on_done=None):
+        """
+        :param target: animovaný tvar, multishape nebo text
+        :param kind: "position", "size" nebo "color"
+        :param start: počáteční hodnota (dvojice čísel, resp. barva)
+        :param end: cílová hodnota
+        :param start_time: čas začátku v ms podle hodin animátoru
+        :param duration: délka animace v ms
+        :param easing: funkce průběhu z <0, 1> do <0, 1>
+        :param on_done: funkce bez parametrů volaná po dokončení
+        """
+        self.target = target
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.start_time = start_time
+        self.duration = duration
+        self.easing = easing
+        self.on_done = on_done
+        if kind == "color":
+            # přechod po krocích o jednu jednotku složky, sdílený všemi
+            # animacemi stejných barev, snímek pak jen vybere barvu
+            steps = max(abs(a - b) for a, b in zip(start.rgb, end.rgb)) + 1
+            self.palette = color_blend(start, end, max(2, steps))
+
+    def __repr__(self) -> str:
+        return f"Tween({self.target!r}, {self.kind}, {self.start} -> {self.end})"
+
+    def progress(self, now: float) -> float:
+        """
+        Vrátí podíl uplynulé doby animace z intervalu <0, 1>.
+        """
+        if self.duration <= 0:
+            return 1.0
+        return min(1.0, max(0.0, (now - self.start_time) / self.duration))
+
+    def apply(self, progress: float) -> None:
+        """
+        Nastaví cíli hodnotu odpovídající zadanému podílu doby.
+        """
+        if self.kind == "color":
+            if progress >= 1.0:
+                color = self.end
+            else:
+                last = len(self.palette) - 1
+                color = self.palette[min(last, max(0, round(self.easing(progress) * last)))]
+            self.target.change_shape_color(color)
+            return
+        if progress >= 1.0:
+            value = self.end
+        else:
+            value = _interpolate(self.start, self.end, self.easing(progress))
+        if self.kind == "position":
+            self.target.set_position(*value)
+        else:
+            self.target.set_size(*value)
+
+
+class Animator:
+    """
+    Snímkový časovač animací plátna.
+    Snímky se počítají s pevným krokem frame_interval: čas animací se
+    posouvá vždy o celé násobky kroku. Když se časovač opozdí o víc než
+    jeden krok, vynechané snímky se započítají do dropped_frames
+    a animace doskočí na správný čas, aby nezpomalovaly.
+    Všechny animace jednoho snímku se provedou v jednom canvas.batch(),
+    takže se plátno překreslí jednou za snímek.
+    """
+
+    # nejvíce kroků, které se doženou v jednom snímku, zbytek se zahodí
+    MAX_CATCH_UP = 10
+
+    def __init__(self, canvas, fps: int = 60):
+        """
+        :param canvas: plátno, jehož after() a batch() se použijí
+        :param fps: počet snímků za sekundu
+        """
+        self._canvas = canvas
+        self.frame_interval = 1000 / fps
+        self._tweens = []
+        self._timer = None
+        # čas posledního snímku v ms podle canvas.clock()
+        self._time = 0.0
+        self.frames = 0
+        self.dropped_frames = 0
+        self.last_frame_ms = 0.0
+        self.max_frame_ms = 0.0
+        self._total_frame_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        """
+        True, pokud je naplánován další snímek.
+        """
+        return self._timer is not None
+
+    @property
+    def active(self) -> int:
+        """
+        Počet běžících animací.
+        """
+        return len(self._tweens)
+
+    def animate(self, target, position=None, size=None, color=None, duration: float = 500,
+                easing=linear, on_done=None) -> list:
+        """
+        Spustí animaci cíle z jeho aktuálního stavu do zadaného.
+        Běžící animace stejné vlastnosti téhož cíle se nahradí.
+        canvas.animate(robot, position=(300, 100), duration=1000)
+        :param target: tvar, multishape nebo text (text jen position)
+        :param position: cílová poloha (x, y)
+        :param size: cílová velikost (width, height)
+        :param color: cílová barva, u multishapu pro všechny části
+        :param duration: délka animace v ms
+        :param easing: funkce průběhu, např. linear nebo ease_in_out
+        :param on_done: funkce volaná po dokončení (jednou, po poslední vlastnosti)
+        :return: list vytvořených animací
+        """
+        if not self.running:
+            self._time = self._canvas.clock()
+        tweens = []
+        if position is not None:
+            tweens.append(Tween(target, "position", (target.x, target.y), tuple(position),
+                                self._time, duration, easing))
+        if size is not None:
+            if not hasattr(target, "set_size"):
+                raise Exception(f"{target!r} cannot change its size")
+            tweens.append(Tween(target, "size", (target.width, target.height), tuple(size),
+                                self._time, duration, easing))
+        if color is not None:
+            parts = target.get_all_parts() if hasattr(target, "get_all_parts") else (target,)
+            for part in parts:
+                if not hasattr(part, "change_shape_color"):
+                    raise Exception(f"{part!r} cannot change its color")
+                tweens.append(Tween(part, "color", part.color, color,
+                                    self._time, duration, easing))
+        if not tweens:
+            return tweens
+        tweens[-1].on_done = on_done
+        replaced = {(id(tween.target), tween.kind) for tween in tweens}
+        self._tweens = [tween for tween in self._tweens
+                        if (id(tween.target), tween.kind) not in replaced]
+        self._tweens.extend(tweens)
+        self._start()
+        return tweens
+
+    def cancel(self, target=None) -> None:
+        """
+        Zastaví animace zadaného cíle (u multishapu i jeho částí),
+        bez parametru všechny. Cíle zůstanou v aktuálním stavu.
+        """
+        if target is None:
+            self._tweens = []
+        else:
+            parts = target.get_all_parts() if hasattr(target, "get_all_parts") else ()
+            targets = {id(target)} | {id(part) for part in parts}
+            self._tweens = [tween for tween in self._tweens if id(tween.target) not in targets]
+        if not self._tweens:
+            self._stop()
+
+    def stats(self) -> dict:
+        """
+        Vrátí statistiky snímků - počet snímků, vynechané snímky,
+        dobu výpočtu posledního, průměrného a nejdelšího snímku v ms
+        a počet běžících animací.
+        """
+        return {
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "last_frame_ms": self.last_frame_ms,
+            "average_frame_ms": self._total_frame_ms / self.frames if self.frames else 0.0,
+            "max_frame_ms": self.max_frame_ms,
+            "active": len(self._tweens),
+        }
+
+    def reset_stats(self) -> None:
+        self.frames = 0
+        self.dropped_frames = 0
+        self.last_frame_ms = 0.0
+        self.max_frame_ms = 0.0
+        self._total_frame_ms = 0.0
+
+    def _start(self) -> None:
+        if self._timer is None:
+            self._schedule(self._canvas.clock())
+
+    def _stop(self) -> None:
+        if self._timer is not None:
+            self._canvas.after_cancel(self._timer)
+            self._timer = None
+
+    def _schedule(self, now: float) -> None:
+        """
+        Naplánuje další snímek na čas dalšího kroku.
+        """
+        delay = self._time + self.frame_interval - now
+        self._timer = self._canvas.after(max(1, round(delay)), self._frame)
+
+    def _frame(self) -> None:
+        """
+        Callback časovače - posune všechny animace o uplynulé kroky
+        a překreslí je v jedné dávce.
+        """
+        self._timer = None
+        now = self._canvas.clock()
+        steps = int((now - self._time) / self.frame_interval)
+        if steps < 1:
+            # časovač přišel dřív, snímek se jen přeplánuje
+            self._schedule(now)
+            return
+        if steps > 1:
+            self.dropped_frames += steps - 1
+        if steps > self.MAX_CATCH_UP:
+            # dlouhé zdržení (např. přetahování okna) se nedohání
+            self._time = now
+        else:
+            self._time += steps * self.frame_interval
+
+        started = time.perf_counter()
+        finished = []
+        running = []
+        with self._canvas.batch():
+            for tween in self._tweens:
+                progress = tween.progress(self._time)
+                tween.apply(progress)
+                (finished if progress >= 1.0 else running).append(tween)
+            self._canvas.update_shapes()
+        self._tweens = running
+        frame_ms = (time.perf_counter() - started) * 1000
+        self.frames += 1
+        self.last_frame_ms = frame_ms
+        self.max_frame_ms = max(self.max_frame_ms, frame_ms)
+        self._total_frame_ms += frame_ms
+
+        if self._tweens:
+            self._schedule(self._canvas.clock())
+        for tween in finished:
+            if tween.on_done is not None:
+                tween.on_done()
+
+
+def _interpolate(start, end, t: float) -> tuple:
+    return tuple(a + (b - a) * t for a, b in zip(start, end))
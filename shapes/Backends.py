@@ -0,0 +1,325 @@
+"""
+Zde najdete vykreslovací backendy plátna.
+Plátno CanvasShapes samo nic nekreslí, všechny příkazy (create_*,
+itemconfig, coords, tag_raise, ...) předává backendu. Backendy mají
+stejné rozhraní jako Canvas z tkinter, takže tvary nepoznají rozdíl.
+
+K dispozici jsou:
+    tk     - okno s plátnem tkinter (výchozí)
+    memory - čistě pythonovský display list v paměti, nepotřebuje
+             displej ani Tk, hodí se pro servery, testy a měření
+
+Backend se vybírá proměnnou prostředí SHAPES_BACKEND nebo
+voláním shapes.use_backend() před prvním kreslením.
+"""
+
+import heapq
+import itertools
+
+# proměnná prostředí, kterou se volí backend
+BACKEND_ENV_VAR = "SHAPES_BACKEND"
+DEFAULT_BACKEND = "tk"
+
+
+class _MemoryItem:
+    """
+    Jedna položka display listu paměťového backendu.
+    """
+
+    def __init__(self, item_id: int, kind: str, coords: list, options: dict):
+        self.id = item_id
+        self.kind = kind
+        self.coords = coords
+        self.tags = _normalize_tags(options.pop("tags", options.pop("tag", ())))
+        self.options = options
+
+    def __repr__(self) -> str:
+        return f"{self.kind}{self.id}{self.tags}"
+
+
+class MemoryBackend:
+    """
+    Backend, který nic nevykresluje, pouze si v paměti vede display
+    list - id položek, tagy, souřadnice, volby (fill, text, ...)
+    a pořadí vykreslení (odspodu nahoru) stejně jako Canvas z tkinter.
+    Časovače after() a after_idle() běží na virtuálních hodinách,
+    mainloop() je provede všechny a skončí.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.stacking = []
+        self.canvas_options = {}
+        self._ids = itertools.count(1)
+        self._idle = []
+        self._timers = []
+        self._timer_ids = itertools.count(1)
+        self._cancelled = set()
+        self._running = False
+        # virtuální čas v milisekundách
+        self.time = 0
+
+    # ------------------------------------------------------------ plátno
+
+    def config(self, **options) -> None:
+        self.canvas_options.update(options)
+
+    configure = config
+
+    def pack(self) -> None:
+        pass
+
+    def show(self) -> None:
+        pass
+
+    def update(self) -> None:
+        """
+        Stejně jako Tk provede čekající úlohy z after_idle.
+        """
+        self.update_idletasks()
+
+    def update_idletasks(self) -> None:
+        while self._idle:
+            func, args = self._idle.pop(0)
+            func(*args)
+
+    def after_idle(self, func, *args) -> str:
+        self._idle.append((func, args))
+        return "idle"
+
+    def after(self, ms: int, func=None, *args) -> str | None:
+        if func is None:
+            self.time += ms
+            return None
+        timer_id = "after#" + str(next(self._timer_ids))
+        heapq.heappush(self._timers, (self.time + ms, timer_id, func, args))
+        return timer_id
+
+    def clock(self) -> float:
+        """
+        Virtuální čas v milisekundách.
+        """
+        return self.time
+
+    def after_cancel(self, timer_id: str) -> None:
+        self._cancelled.add(timer_id)
+
+    def mainloop(self, n: int = 0) -> None:
+        """
+        Provádí naplánované časovače v pořadí jejich virtuálního času,
+        dokud nějaké zbývají nebo dokud není zavoláno quit().
+        """
+        self._running = True
+        self.update_idletasks()
+        while self._running and self._timers:
+            when, timer_id, func, args = heapq.heappop(self._timers)
+            if timer_id in self._cancelled:
+                self._cancelled.discard(timer_id)
+                continue
+            self.time = max(self.time, when)
+            func(*args)
+            self.update_idletasks()
+        self._running = False
+
+    def quit(self) -> None:
+        self._running = False
+
+    # ------------------------------------------------------------ položky
+
+    def _create(self, kind: str, args: tuple, options: dict) -> int:
+        item_id = next(self._ids)
+        self.items[item_id] = _MemoryItem(item_id, kind, _flatten(args), options)
+        self.stacking.append(item_id)
+        return item_id
+
+    def create_rectangle(self, *args, **options) -> int:
+        return self._create("rectangle", args, options)
+
+    def create_oval(self, *args, **options) -> int:
+        return self._create("oval", args, options)
+
+    def create_polygon(self, *args, **options) -> int:
+        return self._create("polygon", args, options)
+
+    def create_text(self, *args, **options) -> int:
+        return self._create("text", args, options)
+
+    def _find(self, tag_or_id) -> list:
+        """
+        Vrátí id položek odpovídajících tagu nebo id v pořadí vykreslení.
+        """
+        if isinstance(tag_or_id, int) or (isinstance(tag_or_id, str) and tag_or_id.isdigit()):
+            item_id = int(tag_or_id)
+            return [item_id] if item_id in self.items else []
+        if tag_or_id == "all":
+            return list(self.stacking)
+        return [i for i in self.stacking if tag_or_id in self.items[i].tags]
+
+    def find_all(self) -> tuple:
+        return tuple(self.stacking)
+
+    def find_withtag(self, tag_or_id) -> tuple:
+        return tuple(self._find(tag_or_id))
+
+    def type(self, tag_or_id) -> str | None:
+        found = self._find(tag_or_id)
+        return self.items[found[0]].kind if found else None
+
+    def gettags(self, tag_or_id) -> tuple:
+        found = self._find(tag_or_id)
+        return self.items[found[0]].tags if found else ()
+
+    def coords(self, tag_or_id, *args) -> list:
+        found = self._find(tag_or_id)
+        if args:
+            new_coords = _flatten(args)
+            for item_id in found:
+                self.items[item_id].coords = list(new_coords)
+            return []
+        return list(self.items[found[0]].coords) if found else []
+
+    def move(self, tag_or_id, dx, dy) -> None:
+        for item_id in self._find(tag_or_id):
+            coords = self.items[item_id].coords
+            coords[0::2] = [x + dx for x in coords[0::2]]
+            coords[1::2] = [y + dy for y in coords[1::2]]
+
+    def addtag_withtag(self, new_tag: str, tag_or_id) -> None:
+        for item_id in self._find(tag_or_id):
+            item = self.items[item_id]
+            if new_tag not in item.tags:
+                item.tags += (new_tag,)
+
+    def dtag(self, tag_or_id, tag_to_delete: str = None) -> None:
+        tag_to_delete = tag_or_id if tag_to_delete is None else tag_to_delete
+        for item_id in self._find(tag_or_id):
+            item = self.items[item_id]
+            item.tags = tuple(tag for tag in item.tags if tag != tag_to_delete)
+
+    def itemconfig(self, tag_or_id, **options) -> dict | None:
+        found = self._find(tag_or_id)
+        if not options:
+            return dict(self.items[found[0]].options) if found else {}
+        tags = None
+        if "tags" in options or "tag" in options:
+            tags = _normalize_tags(options.pop("tags", options.pop("tag", ())))
+        for item_id in found:
+            item = self.items[item_id]
+            if tags is not None:
+                item.tags = tags
+            item.options.update(options)
+        return None
+
+    itemconfigure = itemconfig
+
+    def itemcget(self, tag_or_id, option: str):
+        found = self._find(tag_or_id)
+        return self.items[found[0]].options.get(option, "") if found else ""
+
+    def delete(self, *tags_or_ids) -> None:
+        removed = set()
+        for tag_or_id in tags_or_ids:
+            for item_id in self._find(tag_or_id):
+                del self.items[item_id]
+                removed.add(item_id)
+        if len(removed) == 1:
+            self.stacking.remove(removed.pop())
+        elif removed:
+            self.stacking = [item_id for item_id in self.stacking if item_id not in removed]
+
+    def tag_raise(self, tag_or_id, above=None) -> None:
+        """
+        Přesune položky nad nejvyšší položku above, případně úplně nahoru.
+        Vzájemné pořadí přesouvaných položek se zachová.
+        """
+        moved = self._find(tag_or_id)
+        if not moved:
+            return
+        moved_set = set(moved)
+        rest = [i for i in self.stacking if i not in moved_set]
+        if above is None:
+            position = len(rest)
+        else:
+            targets = set(self._find(above))
+            position = max((n + 1 for n, i in enumerate(rest) if i in targets), default=len(rest))
+        self.stacking = rest[:position] + moved + rest[position:]
+
+    lift = tag_raise
+
+    def tag_lower(self, tag_or_id, below=None) -> None:
+        """
+        Přesune položky pod nejnižší položku below, případně úplně dolů.
+        Vzájemné pořadí přesouvaných položek se zachová.
+        """
+        moved = self._find(tag_or_id)
+        if not moved:
+            return
+        moved_set = set(moved)
+        rest = [i for i in self.stacking if i not in moved_set]
+        if below is None:
+            position = 0
+        else:
+            targets = set(self._find(below))
+            position = min((n for n, i in enumerate(rest) if i in targets), default=0)
+        self.stacking = rest[:position] + moved + rest[position:]
+
+    lower = tag_lower
+
+
+def _flatten(args) -> list:
+    """
+    Souřadnice je možné zadat jako jednotlivá čísla i jako
+    (vnořené) listy nebo n-tice, stejně jako v tkinter.
+    """
+    flat = []
+    for arg in args:
+        if isinstance(arg, (list, tuple)):
+            flat.extend(_flatten(arg))
+        else:
+            flat.append(arg)
+    return flat
+
+
+def _normalize_tags(tags) -> tuple:
+    """
+    Tag může být zadán jako řetězec nebo jako n-tice řetězců.
+    """
+    if isinstance(tags, str):
+        return tuple(tags.split())
+    return tuple(tags)
+
+
+def _create_tk_backend():
+    """
+    Tkinter se importuje až při vytvoření backendu, aby import
+    balíčku shapes nevytvářel okno ani nenačítal Tk.
+    """
+    from .TkBackend import TkBackend
+    return TkBackend()
+
+
+# dostupné backendy podle jména
+_backends = {
+    "tk": _create_tk_backend,
+    "memory": MemoryBackend,
+}
+
+
+def register_backend(name: str, factory) -> None:
+    """
+    Zaregistruje nový backend.
+    :param name: jméno, kterým se backend vybírá
+    :param factory: callable bez parametrů, které vrátí instanci backendu
+    """
+    _backends[name] = factory
+
+
+def create_backend(name: str):
+    """
+    Vytvoří instanci backendu podle jména.
+    :param name: jméno backendu, např. "tk" nebo "memory"
+    :return: nová instance backendu
+    """
+    if name not in _backends:
+        raise KeyError(f"Neznámý backend: {name=}, dostupné: {sorted(_backends)}")
+    return _backends[name]()
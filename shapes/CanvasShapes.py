@@ -1,38 +1,250 @@
-import tkinter
+import os
+import weakref
+from contextlib import contextmanager
 
 from .NamedColor import CREAMY
+from .Backends import BACKEND_ENV_VAR, DEFAULT_BACKEND, create_backend
+from .ZOrder import StackingIndex
+from .SpatialIndex import SpatialIndex
+from .Animation import Animator, linear
+from .Instrumentation import Instrumentation, InstrumentedBackend
+from .ItemPool import DEFAULT_MAX_SIZE, ItemPool
 
 
-class CanvasShapes(tkinter.Canvas):
+class CanvasShapes:
     """
-    Třída která dědí Canvas(plátno). Na toto plátno se následně vykreslí
-    jednotlivé tvary balíčku shapes.
-    Tato třída je instancována jednou při importování balíčku shapes.
+    Plátno, na které se následně vykreslí jednotlivé tvary balíčku shapes.
+    Samotné kreslení provádí backend (viz modul Backends), kterému plátno
+    předává všechny příkazy. Backend se vytvoří až při prvním kreslení,
+    do té doby je možné ho zvolit metodou use_backend().
+    Tato třída je instancována jednou při importování balíčku shapes,
+    vytvoření je ale levné - okno tkinter vznikne až při prvním kreslení,
+    takže instance slouží jako líný zástupce skutečného plátna.
     """
 
-    def __init__(self, canvas_color=CREAMY, canvas_width=600, canvas_height=600):
+    def __init__(self, canvas_color=CREAMY, canvas_width=600, canvas_height=600, backend=None):
         """
         Vytvoří instanci plátna.
         :param canvas_color: Barva pozadí plátna
         :param canvas_width: Šířka plátna
         :param canvas_height: Výška plátna
+        :param backend: jméno nebo instance backendu, základně podle
+        proměnné prostředí SHAPES_BACKEND, jinak "tk"
         """
-        tkinter.Canvas.__init__(self)
-        self.master.title("Plátno")
-        # self.master.geometry(f"{pos_x}+{pos_y}")
         self.canvas_color = canvas_color
         self.canvas_width = canvas_width
         self.canvas_height = canvas_height
 
-        # pokud si neuložíte tvary tak jsou všechny v tomto atributu
-        self.all_shapes = []
+        self._backend = None
+        self._backend_choice = backend or os.environ.get(BACKEND_ENV_VAR) or DEFAULT_BACKEND
 
-        # nastaví různé atributy plátna
-        self.config(bg=self.canvas_color.tkn,
-                    width=self.canvas_height,
-                    height=self.canvas_width)
-        # aktivuje správce geometrie
-        self.pack()
+        # registr tvarů a textů na plátně podle id položky, viz register_shape
+        self._shapes = {}
+        # odstraněné tvary, na které ještě někdo drží odkaz
+        self._removed_shapes = weakref.WeakSet()
+        self._registered_total = 0
+        self._unregistered_total = 0
+
+        # pořadí položek odspodu nahoru, aby se nemuselo zjišťovat z Tk
+        self.z_order = StackingIndex(self._find_stacked, self._z_order_changed)
+        # prostorový index tvarů pro dotazy na bod a oblast
+        self.spatial_index = SpatialIndex()
+
+        # dávkové překreslování, viz batch() a set_auto_flush()
+        self._batch_depth = 0
+        self._auto_flush = False
+        self._flush_scheduled = False
+        self._pending_updates = 0
+        # kolik volání update_shapes() bylo sloučeno do jiného překreslení
+        self.coalesced_updates = 0
+
+        # snímkový časovač animací, viz animate()
+        self.animator = Animator(self)
+
+        # měření příkazů backendu, viz set_instrumentation()
+        self.instrumentation = None
+        # pool skrytých položek k novému použití, viz set_item_pool()
+        self.item_pool = None
+
+    @property
+    def backend(self):
+        """
+        Backend plátna, při prvním použití se vytvoří a nastaví.
+        """
+        if self._backend is None:
+            if isinstance(self._backend_choice, str):
+                self._backend = create_backend(self._backend_choice)
+            else:
+                self._backend = self._backend_choice
+            # nastaví různé atributy plátna
+            self._backend.config(bg=self.canvas_color.tkn,
+                                 width=self.canvas_height,
+                                 height=self.canvas_width)
+            # aktivuje správce geometrie
+            self._backend.pack()
+            if self.instrumentation is not None:
+                self._backend = InstrumentedBackend(self._backend, self.instrumentation)
+        return self._backend
+
+    def use_backend(self, backend) -> None:
+        """
+        Zvolí backend plátna. Je třeba zavolat před prvním kreslením.
+        :param backend: jméno backendu ("tk", "memory") nebo jeho instance
+        """
+        if self._backend is not None:
+            raise Exception("Backend can be chosen only before the first use of the canvas")
+        self._backend_choice = backend
+
+    def set_instrumentation(self, enabled: bool = True) -> Instrumentation | None:
+        """
+        Zapne nebo vypne měření příkazů, které plátno posílá backendu.
+        Zapnuté měření počítá a měří každý příkaz podle druhu a podle
+        třídy tvaru, který ho poslal, a dobu update() zapisuje do
+        histogramu. Vypnuté měření nic nestojí.
+        stats = canvas.set_instrumentation()
+        ...
+        print(stats.report())
+        :param enabled: True zapne, False vypne
+        :return: objekt s posbíranými údaji, při vypnutí ten poslední
+        """
+        instrumentation = self.instrumentation
+        if enabled:
+            if instrumentation is None:
+                instrumentation = self.instrumentation = Instrumentation()
+                if self._backend is not None:
+                    self._backend = InstrumentedBackend(self._backend, instrumentation)
+            return instrumentation
+        if instrumentation is not None:
+            self.instrumentation = None
+            if isinstance(self._backend, InstrumentedBackend):
+                self._backend = self._backend.wrapped
+        return instrumentation
+
+    def __getattr__(self, name):
+        """
+        Ostatní metody Canvas z tkinter (bind, postscript, ...)
+        se předávají backendu.
+        """
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self.backend, name)
+
+    @property
+    def all_shapes(self) -> list:
+        """
+        Pokud si neuložíte tvary, najdete je všechny zde.
+        :return: list tvarů a textů, které jsou právě na plátně
+        """
+        return list(self._shapes.values())
+
+    def register_shape(self, shape) -> None:
+        """
+        Zaregistruje tvar nebo text, který byl právě vykreslen
+        na plátno. Volá se z paint() při vytvoření položky.
+        :param shape: tvar s nastaveným canvas_id
+        """
+        self._shapes[shape.canvas_id] = shape
+        self._removed_shapes.discard(shape)
+        self._registered_total += 1
+        self._invalidate_multishape_painted(shape)
+        if hasattr(shape, "contains_point"):
+            self.spatial_index.add(shape)
+
+    def register_shapes(self, shapes: list) -> None:
+        """
+        Zaregistruje najednou mnoho nově vykreslených tvarů,
+        viz Shape.bulk.
+        :param shapes: tvary s nastaveným canvas_id, zatím v žádném multishapu
+        """
+        self._shapes.update((shape.canvas_id, shape) for shape in shapes)
+        self._registered_total += len(shapes)
+        for shape in shapes:
+            self.spatial_index.add(shape)
+
+    def unregister_shape(self, shape) -> None:
+        """
+        Vyřadí tvar z registru při odstranění z plátna. Registr na něj
+        pak už nedrží odkaz, takže ho může uvolnit garbage collector.
+        :param shape: odstraňovaný tvar
+        """
+        if self._shapes.pop(shape.canvas_id, None) is not None:
+            self._removed_shapes.add(shape)
+            self._unregistered_total += 1
+            self._invalidate_multishape_painted(shape)
+            self.spatial_index.discard(shape)
+
+    def unregister_shapes(self, shapes: list) -> None:
+        """
+        Vyřadí z registru najednou mnoho odstraněných tvarů.
+        :param shapes: odstraňované tvary
+        """
+        for shape in shapes:
+            self.unregister_shape(shape)
+
+    def find_shape(self, canvas_id: int):
+        """
+        Vrátí tvar nebo text podle id jeho položky na plátně.
+        :param canvas_id: id položky, např. z find_all()
+        :return: tvar, nebo None pokud na plátně není
+        """
+        return self._shapes.get(canvas_id)
+
+    def shapes_at(self, x, y) -> list:
+        """
+        Vrátí tvary, které obsahují bod x, y, s ohledem na skutečný
+        tvar elipsy a trojúhelníku.
+        :return: list tvarů seřazený odspodu nahoru jako find_overlapping
+        """
+        return self._in_z_order(self.spatial_index.shapes_at(x, y))
+
+    def shapes_in_rect(self, x1, y1, x2, y2) -> list:
+        """
+        Vrátí tvary, které zasahují do obdélníku zadaného dvěma rohy.
+        :return: list tvarů seřazený odspodu nahoru jako find_overlapping
+        """
+        return self._in_z_order(self.spatial_index.shapes_in_rect(x1, y1, x2, y2))
+
+    def nearest(self, x, y, max_distance: float = float("inf")):
+        """
+        Vrátí tvar nejbližší bodu x, y, nebo None.
+        :param max_distance: tvary vzdálenější než tato vzdálenost se ignorují
+        """
+        return self.spatial_index.nearest(x, y, max_distance)[0]
+
+    def _in_z_order(self, found: list) -> list:
+        by_id = {shape.canvas_id: shape for shape in found}
+        return [by_id[item_id] for item_id in self.z_order.in_order(by_id)]
+
+    def _z_order_changed(self, item_ids) -> None:
+        """
+        Oznámí multishapům, že se změnilo pořadí některé jejich části.
+        """
+        for item_id in item_ids:
+            self._invalidate_multishape_order(self._shapes.get(item_id))
+
+    @staticmethod
+    def _invalidate_multishape_order(shape) -> None:
+        for multishape in getattr(shape, "_multishapes", ()):
+            multishape._invalidate_order()
+
+    @staticmethod
+    def _invalidate_multishape_painted(shape) -> None:
+        for multishape in getattr(shape, "_multishapes", ()):
+            multishape._invalidate_painted()
+
+    def memory_stats(self) -> dict:
+        """
+        Vrátí statistiky registru tvarů pro sledování paměti.
+        :return: dict s počtem tvarů na plátně (live), odstraněných
+        tvarů, na které ještě existuje odkaz (removed_referenced),
+        a celkovým počtem registrací a odregistrací
+        """
+        return {
+            "live": len(self._shapes),
+            "removed_referenced": len(self._removed_shapes),
+            "registered_total": self._registered_total,
+            "unregistered_total": self._unregistered_total,
+        }
 
     def change_canvas_size(self, height: int, width: int) -> None:
         """
@@ -46,12 +258,14 @@ class CanvasShapes(tkinter.Canvas):
 
     def _update_canvas_config(self) -> None:
         """
-        Aktualizuje platno
+        Aktualizuje platno. Pokud backend ještě nebyl vytvořen,
+        nastavení se použije až při jeho vytvoření.
         """
-        self.config(bg=self.canvas_color.tkn, width=self.canvas_height,
-                    height=self.canvas_width)
-        self.pack()
-        self.master.attributes("-topmost", True)
+        if self._backend is None:
+            return
+        self.backend.config(bg=self.canvas_color.tkn, width=self.canvas_height,
+                            height=self.canvas_width)
+        self.backend.show()
 
     def change_canvas_color(self, bg_color) -> None:
         """
@@ -59,18 +273,320 @@ class CanvasShapes(tkinter.Canvas):
         :param bg_color: nová barva
         """
         self.canvas_color = bg_color
-        self.config(bg=self.canvas_color.tkn)
+        if self._backend is None:
+            return
+        self.backend.config(bg=self.canvas_color.tkn)
         self.update()
 
+    # Příkazy, které tvary posílají backendu
+
+    # Příkazy s celočíselným id udržují index pořadí z_order,
+    # příkazy s tagem ho zneplatní.
+
+    def create_rectangle(self, *args, **kw) -> int:
+        if self.item_pool is not None:
+            return self._create_pooled("rectangle", args, kw)
+        item_id = self.backend.create_rectangle(*args, **kw)
+        self.z_order.add(item_id)
+        return item_id
+
+    def create_oval(self, *args, **kw) -> int:
+        if self.item_pool is not None:
+            return self._create_pooled("oval", args, kw)
+        item_id = self.backend.create_oval(*args, **kw)
+        self.z_order.add(item_id)
+        return item_id
+
+    def create_polygon(self, *args, **kw) -> int:
+        if self.item_pool is not None:
+            return self._create_pooled("polygon", args, kw)
+        item_id = self.backend.create_polygon(*args, **kw)
+        self.z_order.add(item_id)
+        return item_id
+
+    def create_text(self, *args, **kw) -> int:
+        if self.item_pool is not None:
+            return self._create_pooled("text", args, kw)
+        item_id = self.backend.create_text(*args, **kw)
+        self.z_order.add(item_id)
+        return item_id
+
+    def _create_pooled(self, kind: str, args: tuple, kw: dict) -> int:
+        """
+        Vytvoří položku, je-li to možné, ze skryté položky v poolu.
+        Znovu použitá položka dostane nové souřadnice, tagy a volby,
+        zobrazí se a přesune nahoru, kam by se dostala nová položka.
+        """
+        item_id = self.item_pool.acquire(kind)
+        if item_id is None:
+            item_id = getattr(self.backend, "create_" + kind)(*args, **kw)
+            self.item_pool.track(item_id, kind)
+        else:
+            options = dict(kw)
+            tags = options.pop("tag", options.pop("tags", ()))
+            self.backend.coords(item_id, *args)
+            self.backend.itemconfig(item_id, state="normal", tags=tags, **options)
+            self.backend.tag_raise(item_id)
+        self.z_order.add(item_id)
+        return item_id
+
+    def itemconfig(self, tag_or_id, **kw):
+        return self.backend.itemconfig(tag_or_id, **kw)
+
+    def coords(self, tag_or_id, *args):
+        return self.backend.coords(tag_or_id, *args)
+
+    def move(self, tag_or_id, dx, dy) -> None:
+        self.backend.move(tag_or_id, dx, dy)
+
+    def addtag_withtag(self, new_tag: str, tag_or_id) -> None:
+        self.backend.addtag_withtag(new_tag, tag_or_id)
+
+    def dtag(self, tag_or_id, tag_to_delete: str = None) -> None:
+        if tag_to_delete is None:
+            self.backend.dtag(tag_or_id)
+        else:
+            self.backend.dtag(tag_or_id, tag_to_delete)
+
+    def delete(self, *tags_or_ids) -> None:
+        if self.item_pool is not None:
+            tags_or_ids = self._release_to_pool(tags_or_ids)
+            if not tags_or_ids:
+                return
+        self.backend.delete(*tags_or_ids)
+        if len(tags_or_ids) > 1 and all(isinstance(tag_or_id, int) for tag_or_id in tags_or_ids):
+            self.z_order.discard_many(tags_or_ids)
+            return
+        for tag_or_id in tags_or_ids:
+            if isinstance(tag_or_id, int):
+                self.z_order.discard(tag_or_id)
+            else:
+                self.z_order.invalidate()
+
+    def _release_to_pool(self, tags_or_ids) -> tuple:
+        """
+        Položky zadané id skryje a uloží do poolu.
+        :return: tagy a id, které je třeba opravdu smazat
+        """
+        to_delete = []
+        pooled = []
+        for tag_or_id in tags_or_ids:
+            if not isinstance(tag_or_id, int):
+                if tag_or_id == "all":
+                    # smažou se i skryté položky v poolu
+                    self.item_pool.forget()
+                to_delete.append(tag_or_id)
+                continue
+            stored, evicted = self.item_pool.release(tag_or_id)
+            if stored:
+                pooled.append(tag_or_id)
+            to_delete.extend(evicted)
+        for item_id in pooled:
+            # bez tagů se skryté položky netýkají příkazů pro skupiny
+            self.backend.itemconfig(item_id, state="hidden", tags="")
+        if len(pooled) > 1:
+            self.z_order.discard_many(pooled)
+        elif pooled:
+            self.z_order.discard(pooled[0])
+        return tuple(to_delete)
+
+    def set_item_pool(self, enabled: bool = True, max_size: int = DEFAULT_MAX_SIZE) -> ItemPool | None:
+        """
+        Zapne nebo vypne pool položek plátna. Položky odstraněných
+        tvarů a textů se pak nemažou, ale skryjí a další vytvořený
+        tvar stejného druhu je použije znovu, což šetří vytváření
+        položek ve scénách, kde tvary stále vznikají a zanikají.
+        Odstraněný tvar pak nesmí dál používat své canvas_id, jeho
+        položka už může patřit jinému tvaru.
+        :param enabled: True zapne, False vypne a skryté položky smaže
+        :param max_size: největší počet skrytých položek jednoho druhu,
+        starší se smažou
+        :return: pool se statistikami (stats()), při vypnutí ten poslední
+        """
+        pool = self.item_pool
+        if enabled:
+            if pool is None:
+                pool = self.item_pool = ItemPool(max_size)
+            else:
+                pool.max_size = max_size
+                evicted = pool.shrink(max_size)
+                if evicted:
+                    self.backend.delete(*evicted)
+            return pool
+        if pool is not None:
+            self.item_pool = None
+            evicted = pool.shrink(0)
+            pool.forget()
+            if evicted:
+                self.backend.delete(*evicted)
+        return pool
+
+    def tag_raise(self, tag_or_id, above=None) -> None:
+        if above is None:
+            self.backend.tag_raise(tag_or_id)
+        else:
+            self.backend.tag_raise(tag_or_id, above)
+        if isinstance(tag_or_id, int) and (above is None or isinstance(above, int)):
+            self.z_order.raise_items((tag_or_id,), above)
+        else:
+            self.z_order.invalidate()
+
+    def tag_lower(self, tag_or_id, below=None) -> None:
+        if below is None:
+            self.backend.tag_lower(tag_or_id)
+        else:
+            self.backend.tag_lower(tag_or_id, below)
+        if isinstance(tag_or_id, int) and (below is None or isinstance(below, int)):
+            self.z_order.lower_items((tag_or_id,), below)
+        else:
+            self.z_order.invalidate()
+
+    def tag_raise_group(self, tag: str, item_ids, above=None) -> None:
+        """
+        Přesune všechny položky se skupinovým tagem jedním příkazem
+        nad položku above, případně úplně nahoru. Protože jsou známa
+        id položek se zadaným tagem, index z_order se nemusí zneplatnit.
+        :param tag: skupinový tag
+        :param item_ids: id všech položek, které tag mají
+        :param above: id položky, nad kterou se má skupina přesunout
+        """
+        if above is None:
+            self.backend.tag_raise(tag)
+        else:
+            self.backend.tag_raise(tag, above)
+        self.z_order.raise_items(item_ids, above)
+
+    def tag_lower_group(self, tag: str, item_ids, below=None) -> None:
+        """
+        Přesune všechny položky se skupinovým tagem jedním příkazem
+        pod položku below, případně úplně dolů, viz tag_raise_group.
+        :param tag: skupinový tag
+        :param item_ids: id všech položek, které tag mají
+        :param below: id položky, pod kterou se má skupina přesunout
+        """
+        if below is None:
+            self.backend.tag_lower(tag)
+        else:
+            self.backend.tag_lower(tag, below)
+        self.z_order.lower_items(item_ids, below)
+
+    def find_all(self) -> tuple:
+        return self.backend.find_all()
+
+    def _find_stacked(self) -> list:
+        """
+        Vrátí id položek pro index pořadí odspodu nahoru, bez skrytých
+        položek v poolu (ty nepatří žádnému tvaru).
+        """
+        item_ids = self.backend.find_all()
+        if self.item_pool is None or not len(self.item_pool):
+            return list(item_ids)
+        pooled = self.item_pool.pooled_ids()
+        return [item_id for item_id in item_ids if item_id not in pooled]
+
+    def update(self) -> None:
+        self.backend.update()
+
+    def after_idle(self, func, *args):
+        return self.backend.after_idle(func, *args)
+
+    def after(self, ms: int, func=None, *args):
+        return self.backend.after(ms, func, *args)
+
+    def mainloop(self) -> None:
+        self.backend.mainloop()
+
+    def clock(self) -> float:
+        """
+        Vrátí čas backendu v milisekundách, podle kterého běží animace.
+        """
+        return self.backend.clock()
+
+    def animate(self, target, position=None, size=None, color=None, duration: float = 500,
+                easing=linear, on_done=None) -> list:
+        """
+        Plynule změní polohu, velikost nebo barvu tvaru, multishapu
+        či textu. Animace běží na pozadí přes after(), metoda se
+        vrátí hned, viz Animator.animate.
+        canvas.animate(robot, position=(300, 100), duration=1000)
+        :return: list vytvořených animací
+        """
+        return self.animator.animate(target, position, size, color, duration, easing, on_done)
+
     def update_shapes(self) -> None:
         """
         Aktualizuje tvary na plátně.
+        Uvnitř bloku batch() nebo při zapnutém set_auto_flush() se
+        překreslení odloží a všechna volání se sloučí do jednoho
+        update() na konci dávky, resp. snímku.
         """
-        self.update()
+        if not self._batch_depth and not self._auto_flush:
+            self.update()
+            return
+        self._pending_updates += 1
+        if not self._batch_depth:
+            self._schedule_flush()
+
+    def flush(self) -> None:
+        """
+        Provede odložené překreslení, pokud nějaké čeká.
+        """
+        if self._pending_updates:
+            self.coalesced_updates += self._pending_updates - 1
+            self._pending_updates = 0
+            self.update()
+
+    @contextmanager
+    def batch(self):
+        """
+        Kontextový manažer, který sloučí všechna překreslení
+        provedená uvnitř bloku do jednoho.
+        with canvas.batch():
+            robot.move_right(100)
+        Bloky je možné vnořovat, překresluje se až na konci vnějšího.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._pending_updates:
+                if self._auto_flush:
+                    self._schedule_flush()
+                else:
+                    self.flush()
+
+    def set_auto_flush(self, enabled: bool = True) -> None:
+        """
+        Zapne nebo vypne automatické překreslování po snímcích.
+        Je-li zapnuto, update_shapes() pouze naplánuje překreslení
+        pomocí after_idle, takže se všechny změny provedené před
+        dalším průchodem smyčkou událostí vykreslí najednou.
+        :param enabled: True zapne, False vypne a dokreslí čekající změny
+        """
+        self._auto_flush = enabled
+        if not enabled:
+            self.flush()
+
+    def _schedule_flush(self) -> None:
+        """
+        Naplánuje překreslení na nejbližší nečinnost smyčky událostí.
+        """
+        if self._flush_scheduled:
+            return
+        self._flush_scheduled = True
+        self.after_idle(self._scheduled_flush)
+
+    def _scheduled_flush(self) -> None:
+        """
+        Callback pro after_idle, provede naplánované překreslení.
+        """
+        self._flush_scheduled = False
+        self.flush()
 
 
 # o kolik skáčou obrazce
 canvas_step = 50
 
-# Vytvoří plátno
+# Vytvoří plátno, backend (a s ním okno tkinter) vznikne až při prvním kreslení
 canvas = CanvasShapes()
@@ -1,3 +1,5 @@
+import math
+
 from .Shape import Shape
 from .CanvasShapes import canvas, canvas_step
 from .NamedColor import BLUE
@@ -14,6 +16,7 @@ class Ellipse(Shape):
     a její velikost je definována jako velikost
     tohoto obdélníku.
     """
+    __slots__ = ()
 
     def __init__(self, x=0, y=0, width=2 * canvas_step, height=canvas_step, color=BLUE):
         """
@@ -33,22 +36,100 @@ class Ellipse(Shape):
         """
         super().__init__(x, y, width, height, color)
 
-    def paint(self) -> None:
+    def _create_item(self) -> int:
         """
-        Tato metoda zavolá plátno a pokud tvar ještě nebyl
-        vytvořen tak na něm vytvoří nový, pokud již byl tak
-        aktualizuje tvar na plátně podle atributů x,y,width,
-        height a color.
+        Vytvoří elipsu na plátně podle atributů x, y, width,
+        height a color. Aktualizaci již vytvořeného tvaru
+        řeší Shape.paint.
         """
-        if not self._is_painted_on_canvas:
-            self.canvas_id = canvas.create_oval(self.get_coord(), tag=self.__repr__(),
-                                                fill=self.color.tkn, width=0, outline="")
-            self._is_painted_on_canvas = True
-            canvas.update_shapes()
-        else:
-            canvas.itemconfig(self.__repr__(), fill=self.color.tkn)
-            canvas.coords(self.__repr__(), self.get_coord())
-            canvas.update_shapes()
+        return canvas.create_oval(self.get_coord(), tag=self._get_tags(),
+                                  fill=self.color.tkn, width=0, outline="")
+
+    def contains_point(self, x, y) -> bool:
+        """
+        Zjistí, zda bod leží uvnitř elipsy.
+        """
+        left, top, right, bottom = self._get_bounds()
+        radius_x, radius_y = (right - left) / 2, (bottom - top) / 2
+        if radius_x == 0 or radius_y == 0:
+            # degenerovaná elipsa je úsečka
+            return super().contains_point(x, y)
+        dx = (x - left - radius_x) / radius_x
+        dy = (y - top - radius_y) / radius_y
+        return dx * dx + dy * dy <= 1
+
+    def intersects_rect(self, left, top, right, bottom) -> bool:
+        """
+        Zjistí, zda elipsa zasahuje do obdélníku. Stačí otestovat bod
+        obdélníku nejbližší středu elipsy.
+        """
+        if not super().intersects_rect(left, top, right, bottom):
+            return False
+        x1, y1, x2, y2 = self._get_bounds()
+        center_x, center_y = (x1 + x2) / 2, (y1 + y2) / 2
+        return self.contains_point(min(max(center_x, left), right), min(max(center_y, top), bottom))
+
+    def distance_to(self, x, y) -> float:
+        """
+        Vrátí vzdálenost bodu od elipsy, uvnitř elipsy 0.
+        """
+        if self.contains_point(x, y):
+            return 0.0
+        left, top, right, bottom = self._get_bounds()
+        radius_x, radius_y = (right - left) / 2, (bottom - top) / 2
+        if radius_x == 0 or radius_y == 0:
+            return super().distance_to(x, y)
+        return _distance_to_ellipse(radius_x, radius_y, x - left - radius_x, y - top - radius_y)
 
     def copy(self) -> Shape:
         return Ellipse(self.x, self.y, self.width, self.height, self.color)
+
+
+def _distance_to_ellipse(radius_x, radius_y, x, y) -> float:
+    """
+    Vzdálenost bodu x, y (vůči středu) od elipsy s poloosami radius_x,
+    radius_y. Nejbližší bod se hledá bisekcí podle D. Eberly,
+    Distance from a Point to an Ellipse.
+    """
+    x, y = abs(x), abs(y)
+    if radius_x < radius_y:
+        radius_x, radius_y, x, y = radius_y, radius_x, y, x
+    if y > 0:
+        if x > 0:
+            z0, z1 = x / radius_x, y / radius_y
+            g = z0 * z0 + z1 * z1 - 1
+            if g == 0:
+                return 0.0
+            ratio = (radius_x / radius_y) ** 2
+            root = _get_root(ratio, z0, z1, g)
+            nearest_x = ratio * x / (root + ratio)
+            nearest_y = y / (root + 1)
+            return math.hypot(nearest_x - x, nearest_y - y)
+        return abs(y - radius_y)
+    numerator = radius_x * x
+    denominator = radius_x * radius_x - radius_y * radius_y
+    if numerator < denominator:
+        fraction = numerator / denominator
+        nearest_x = radius_x * fraction
+        nearest_y = radius_y * math.sqrt(1 - fraction * fraction)
+        return math.hypot(nearest_x - x, nearest_y)
+    return abs(x - radius_x)
+
+
+def _get_root(ratio, z0, z1, g) -> float:
+    n0 = ratio * z0
+    s0 = z1 - 1
+    s1 = 0 if g < 0 else math.hypot(n0, z1) - 1
+    s = 0
+    for _ in range(200):
+        s = (s0 + s1) / 2
+        if s == s0 or s == s1:
+            break
+        g = (n0 / (s + ratio)) ** 2 + (z1 / (s + 1)) ** 2 - 1
+        if g > 0:
+            s0 = s
+        elif g < 0:
+            s1 = s
+        else:
+            break
+    return s
@@ -0,0 +1,220 @@
+"""
+Zde najdete instance multishapu (razítka).
+Multishape slouží jako předloha a každá instance si pamatuje jen svou
+polohu, měřítko, případně barvu a id svých položek na plátně.
+Geometrii částí (souřadnice vůči levému hornímu rohu předlohy) sdílí
+všechny instance s předlohou, objekty tvarů se pro ně nevytvářejí.
+Položky instancí nejsou v registru tvarů plátna, takže je nenajde
+find_shape, hledání v oblasti ani export scény a obrázku.
+"""
+
+from .Interfaces import IMovable, IRemovable
+from .CanvasShapes import canvas
+from .Ellipse import Ellipse
+from .Rectangle import Rectangle
+from .Triangle import Triangle
+
+# metoda plátna a volby položky pro část předlohy dané třídy,
+# stejné jako v _create_item dané třídy
+_CREATE_METHODS = {Rectangle: ("create_rectangle", {"width": 0}),
+                   Ellipse: ("create_oval", {"width": 0, "outline": ""}),
+                   Triangle: ("create_polygon", {"width": 0})}
+
+
+def build_template(prototype) -> tuple:
+    """
+    Vytvoří sdílenou geometrii předlohy - pro každou část metodu
+    plátna a volby položky, souřadnice x a y vůči levému hornímu rohu
+    předlohy a samotnou část, od které se bere barva. Části, které
+    nejsou na plátně (např. po remove předlohy), se vynechají.
+    """
+    origin_x, origin_y = prototype.x, prototype.y
+    template = []
+    for part in prototype._get_all_parts():
+        if not part._is_painted_on_canvas:
+            continue
+        method, options = _CREATE_METHODS.get(type(part), (None, None))
+        if method is None:
+            raise Exception(f"{part!r} cannot be a part of an instanced multishape")
+        coord = part.get_coord()
+        template.append((method, options,
+                         tuple(x - origin_x for x in coord[0::2]),
+                         tuple(y - origin_y for y in coord[1::2]),
+                         part))
+    return tuple(template)
+
+
+class MultishapeInstance(IMovable, IRemovable):
+    """
+    Lehká kopie multishapu na plátně. Všechny položky instance mají
+    společný tag, takže posun, přebarvení i přeskládání je jeden
+    příkaz plátna. Instance se vytvářejí metodami
+    Multishape.instantiate a Multishape.stamp.
+    """
+    __slots__ = ('prototype', '_template', 'x', 'y', 'scale_x', 'scale_y', 'color',
+                 '_group_tag', '_item_ids', 'tk_calls')
+
+    _counter = 0
+
+    def __init__(self, prototype, x, y, scale=1, color=None):
+        """
+        Vytvoří instanci a její položky na plátně. Pro mnoho instancí
+        najednou je rychlejší Multishape.stamp.
+        :param prototype: multishape - předloha
+        :param x: vodorovná souřadnice levého horního rohu
+        :param y: svislá souřadnice levého horního rohu
+        :param scale: měřítko vůči předloze, číslo nebo (scale_x, scale_y)
+        :param color: barva všech částí, základně barvy předlohy
+        """
+        MultishapeInstance._counter += 1
+        self.tk_calls = 0
+        self.prototype = prototype
+        self._template = prototype._get_template()
+        self.x = x
+        self.y = y
+        self.scale_x, self.scale_y = scale if isinstance(scale, tuple) else (scale, scale)
+        self.color = color
+        self._group_tag = "instance_" + str(MultishapeInstance._counter)
+        self._item_ids = ()
+        self._paint()
+        canvas.update_shapes()
+
+    @property
+    def width(self):
+        return self.prototype.width * self.scale_x
+
+    @property
+    def height(self):
+        return self.prototype.height * self.scale_y
+
+    def __repr__(self) -> str:
+        return f"Instance {self._group_tag} of {self.prototype}"
+
+    def _paint(self) -> None:
+        """
+        Vytvoří položky instance na plátně.
+        """
+        x, y, scale_x, scale_y = self.x, self.y, self.scale_x, self.scale_y
+        tags = (self._group_tag,)
+        fill = self.color.tkn if self.color is not None else None
+        item_ids = []
+        for method, options, xs, ys, part in self._template:
+            coords = [value for pair in zip([x + value * scale_x for value in xs],
+                                            [y + value * scale_y for value in ys])
+                      for value in pair]
+            item_ids.append(getattr(canvas, method)(coords, tag=tags, fill=fill or part.color.tkn, **options))
+        self._item_ids = tuple(item_ids)
+        self.tk_calls += len(item_ids)
+
+    def set_position(self, x, y) -> None:
+        """
+        Přesune instanci, všechny položky jedním příkazem.
+        """
+        dx, dy = x - self.x, y - self.y
+        self.x, self.y = x, y
+        if self._item_ids:
+            canvas.move(self._group_tag, dx, dy)
+            self.tk_calls += 1
+            canvas.update_shapes()
+
+    def move_right(self, length=25) -> None:
+        self.set_position(self.x + length, self.y)
+
+    def move_left(self, length=25) -> None:
+        self.set_position(self.x - length, self.y)
+
+    def move_up(self, length=25) -> None:
+        self.set_position(self.x, self.y - length)
+
+    def move_down(self, length=25) -> None:
+        self.set_position(self.x, self.y + length)
+
+    def set_color(self, color) -> None:
+        """
+        Přebarví všechny části instance jednou barvou, None vrátí
+        barvy předlohy.
+        """
+        self.color = color
+        if not self._item_ids:
+            return
+        if color is not None:
+            canvas.itemconfig(self._group_tag, fill=color.tkn)
+            self.tk_calls += 1
+        else:
+            with canvas.batch():
+                for item_id, (*_, part) in zip(self._item_ids, self._template):
+                    canvas.itemconfig(item_id, fill=part.color.tkn)
+            self.tk_calls += len(self._item_ids)
+        canvas.update_shapes()
+
+    def refresh(self) -> None:
+        """
+        Převezme aktuální geometrii a barvy předlohy (např. po její
+        změně) a instanci znovu vykreslí.
+        """
+        with canvas.batch():
+            self.remove()
+            self._template = self.prototype._get_template()
+            self._paint()
+            canvas.update_shapes()
+
+    def raise_to_top(self) -> None:
+        """
+        Zvedne instanci na vrchol, pořadí jejích částí se zachová.
+        """
+        canvas.tag_raise_group(self._group_tag, self._item_ids)
+        self.tk_calls += 1
+        canvas.update_shapes()
+
+    def lower_to_bottom(self) -> None:
+        """
+        Sníží instanci na dno, pořadí jejích částí se zachová.
+        """
+        canvas.tag_lower_group(self._group_tag, self._item_ids)
+        self.tk_calls += 1
+        canvas.update_shapes()
+
+    def remove(self) -> None:
+        """
+        Odstraní položky instance z plátna, instanci je možné znovu
+        vykreslit metodou refresh.
+        """
+        if not self._item_ids:
+            return
+        canvas.delete(*self._item_ids)
+        self.tk_calls += 1
+        self._item_ids = ()
+        canvas.update_shapes()
+
+    @staticmethod
+    def remove_many(instances) -> None:
+        """
+        Odstraní z plátna položky všech zadaných instancí jedním
+        příkazem, např. výsledek Multishape.stamp.
+        """
+        instances = [instance for instance in instances if instance._item_ids]
+        if not instances:
+            return
+        canvas.delete(*[item_id for instance in instances for item_id in instance._item_ids])
+        for instance in instances:
+            instance._item_ids = ()
+        canvas.update_shapes()
+
+
+def stamp(prototype, positions, scale=1, colors=None) -> list:
+    """
+    Vytvoří mnoho instancí předlohy v jedné dávce, plátno se
+    překreslí jen jednou, viz Multishape.stamp.
+    """
+    positions = list(positions)
+    if colors is None or hasattr(colors, "tkn"):
+        colors = [colors] * len(positions)
+    else:
+        colors = list(colors)
+        if len(colors) != len(positions):
+            raise Exception(f"Expected {len(positions)} colors, got {len(colors)}")
+    with canvas.batch():
+        instances = [MultishapeInstance(prototype, x, y, scale, color)
+                     for (x, y), color in zip(positions, colors)]
+        canvas.update_shapes()
+    return instances
@@ -0,0 +1,158 @@
+"""
+Zde najdete měření příkazů, které plátno posílá backendu.
+Měření se zapíná metodou canvas.set_instrumentation(). Plátno pak
+backend obalí třídou InstrumentedBackend, která každý příkaz spočítá
+a změří podle druhu (itemconfig, coords, tag_raise, update, ...)
+a podle třídy tvaru, který ho poslal. Vypnuté měření nic nestojí,
+plátno v tu chvíli mluví přímo s backendem.
+"""
+
+import sys
+import time
+
+# horní hranice přihrádek histogramu doby update() v ms
+UPDATE_BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, float("inf"))
+
+# příkazy, které se neměří (mainloop běží po celou dobu programu)
+_UNTIMED = frozenset(("mainloop", "clock"))
+# kolik rámců zásobníku se nejvýše prohledá při hledání volajícího tvaru
+_MAX_CALLER_DEPTH = 12
+
+
+class Instrumentation:
+    """
+    Posbírané údaje o příkazech plátna.
+    Je možné je průběžně číst metodou snapshot() nebo vypsat report().
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Vynuluje všechny posbírané údaje.
+        """
+        # {příkaz: [počet, celkový čas v s, nejdelší čas v s]}
+        self._commands = {}
+        # {(třída, příkaz): [počet, celkový čas v s]}
+        self._by_class = {}
+        self._update_histogram = [0] * len(UPDATE_BUCKETS_MS)
+        self._started = time.perf_counter()
+
+    def record(self, command: str, caller: str, duration: float) -> None:
+        """
+        Zapíše jedno provedení příkazu.
+        :param command: jméno příkazu backendu
+        :param caller: jméno třídy tvaru, který příkaz poslal
+        :param duration: doba provedení v sekundách
+        """
+        stats = self._commands.get(command)
+        if stats is None:
+            self._commands[command] = [1, duration, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+            if duration > stats[2]:
+                stats[2] = duration
+        key = (caller, command)
+        stats = self._by_class.get(key)
+        if stats is None:
+            self._by_class[key] = [1, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+        if command == "update":
+            milliseconds = duration * 1000
+            for index, bound in enumerate(UPDATE_BUCKETS_MS):
+                if milliseconds <= bound:
+                    self._update_histogram[index] += 1
+                    break
+
+    def snapshot(self) -> dict:
+        """
+        Vrátí kopii posbíraných údajů.
+        :return: dict s klíči commands ({příkaz: count, total_ms, max_ms}),
+        by_class ({třída: {příkaz: count, total_ms}}), update_histogram
+        (list dvojic (horní hranice v ms, počet)) a elapsed_ms
+        """
+        by_class = {}
+        for (caller, command), (count, total) in self._by_class.items():
+            by_class.setdefault(caller, {})[command] = {"count": count, "total_ms": total * 1000}
+        return {
+            "commands": {command: {"count": count, "total_ms": total * 1000, "max_ms": longest * 1000}
+                         for command, (count, total, longest) in self._commands.items()},
+            "by_class": by_class,
+            "update_histogram": list(zip(UPDATE_BUCKETS_MS, self._update_histogram)),
+            "elapsed_ms": (time.perf_counter() - self._started) * 1000,
+        }
+
+    def report(self) -> str:
+        """
+        Vrátí přehled posbíraných údajů jako text.
+        """
+        snapshot = self.snapshot()
+        lines = [f"Příkazy plátna za {snapshot['elapsed_ms']:.1f} ms",
+                 f"{'příkaz':<20} {'počet':>8} {'celkem ms':>11} {'průměr µs':>11} {'max ms':>9}"]
+        commands = sorted(snapshot["commands"].items(), key=lambda item: -item[1]["total_ms"])
+        for command, stats in commands:
+            lines.append(f"{command:<20} {stats['count']:>8} {stats['total_ms']:11.3f} "
+                         f"{stats['total_ms'] / stats['count'] * 1000:11.2f} {stats['max_ms']:9.3f}")
+        lines.append("")
+        lines.append(f"{'třída':<20} {'příkaz':<20} {'počet':>8} {'celkem ms':>11}")
+        for caller, commands in sorted(snapshot["by_class"].items()):
+            for command, stats in sorted(commands.items(), key=lambda item: -item[1]["total_ms"]):
+                lines.append(f"{caller:<20} {command:<20} {stats['count']:>8} {stats['total_ms']:11.3f}")
+        lines.append("")
+        lines.append("update() ms")
+        lower = 0
+        for bound, count in snapshot["update_histogram"]:
+            label = f"{lower:g}-{bound:g}" if bound != float("inf") else f"> {lower:g}"
+            lines.append(f"{label:>12} {count:>8}")
+            lower = bound
+        return "\n".join(lines)
+
+
+class InstrumentedBackend:
+    """
+    Obal backendu, který měří každé volání jeho metod.
+    Ostatní atributy předává beze změny.
+    """
+
+    def __init__(self, backend, instrumentation: Instrumentation):
+        self.wrapped = backend
+        self.instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        attribute = getattr(self.wrapped, name)
+        if not callable(attribute) or name in _UNTIMED:
+            return attribute
+        record = self.instrumentation.record
+
+        def timed(*args, **kw):
+            start = time.perf_counter()
+            try:
+                return attribute(*args, **kw)
+            finally:
+                record(name, _caller_class(), time.perf_counter() - start)
+
+        return timed
+
+    def __repr__(self) -> str:
+        return f"InstrumentedBackend({self.wrapped!r})"
+
+
+def _caller_class() -> str:
+    """
+    Najde na zásobníku nejbližší metodu tvaru (Shape, Multishape, Text)
+    a vrátí jméno jeho třídy. Příkazy poslané přímo z programu
+    se zapíší pod "-".
+    """
+    frame = sys._getframe(2)
+    for _ in range(_MAX_CALLER_DEPTH):
+        if frame is None:
+            break
+        owner = frame.f_locals.get("self")
+        if owner is not None and hasattr(owner, "tk_calls"):
+            return type(owner).__name__
+        frame = frame.f_back
+    return "-"
@@ -5,18 +5,23 @@ from abc import ABC, abstractmethod
 
 
 class ICopyable(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def copy(self):
         """Vrátí kopii instance"""
 
 
 class IRemovable(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def remove(self):
         """Odstraní objekt z plátna"""
 
 
 class IMovable(ABC):
+    __slots__ = ()
 
     @abstractmethod
     def move_up(self, length=25):
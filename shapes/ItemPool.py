@@ -0,0 +1,122 @@
+"""
+Zde najdete zásobník (pool) položek plátna.
+Při zapnutém poolu se položky odstraněných tvarů a textů ze plátna
+nemažou, ale skryjí (state=hidden), a další vytvoření položky
+stejného druhu (rectangle, oval, polygon, text) skrytou položku
+znovu použije. Samotné příkazy pro plátno posílá CanvasShapes,
+pool si jen vede evidenci volných položek a statistiky.
+"""
+
+from collections import deque
+
+# druhy položek, které se do poolu ukládají
+ITEM_KINDS = ("rectangle", "oval", "polygon", "text")
+# výchozí největší počet skrytých položek jednoho druhu
+DEFAULT_MAX_SIZE = 1000
+
+
+class ItemPool:
+    """
+    Evidence skrytých položek plátna připravených k novému použití.
+    Pro každý druh položky je fronta volných id; při překročení
+    max_size se vyřadí nejdéle skrytá položka a plátno ji smaže.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        :param max_size: největší počet skrytých položek jednoho druhu
+        """
+        self.max_size = max_size
+        self._free = {kind: deque() for kind in ITEM_KINDS}
+        # druh živých položek vytvořených při zapnutém poolu
+        self._kinds = {}
+        self._hits = dict.fromkeys(ITEM_KINDS, 0)
+        self._misses = dict.fromkeys(ITEM_KINDS, 0)
+        self._evictions = dict.fromkeys(ITEM_KINDS, 0)
+
+    def __len__(self) -> int:
+        return sum(len(free) for free in self._free.values())
+
+    def acquire(self, kind: str) -> int | None:
+        """
+        Vrátí id skryté položky daného druhu, nebo None, pokud žádná
+        není a položku je třeba vytvořit.
+        """
+        free = self._free[kind]
+        if free:
+            self._hits[kind] += 1
+            item_id = free.popleft()
+            self._kinds[item_id] = kind
+            return item_id
+        self._misses[kind] += 1
+        return None
+
+    def track(self, item_id: int, kind: str) -> None:
+        """
+        Zapíše nově vytvořenou položku, aby ji šlo po odstranění
+        uložit do poolu.
+        """
+        self._kinds[item_id] = kind
+
+    def release(self, item_id: int) -> tuple:
+        """
+        Vrátí odstraněnou položku do poolu.
+        :return: dvojice (bool, list) - zda byla položka uložena
+        a id položek, které je třeba opravdu smazat (neznámá položka
+        nebo položky vyřazené kvůli max_size)
+        """
+        kind = self._kinds.pop(item_id, None)
+        if kind is None:
+            return False, [item_id]
+        if self.max_size <= 0:
+            self._evictions[kind] += 1
+            return False, [item_id]
+        free = self._free[kind]
+        evicted = []
+        while len(free) >= self.max_size:
+            evicted.append(free.popleft())
+            self._evictions[kind] += 1
+        free.append(item_id)
+        return True, evicted
+
+    def shrink(self, max_size: int) -> list:
+        """
+        Zmenší pool na max_size položek od každého druhu.
+        :return: id vyřazených položek, které je třeba smazat
+        """
+        evicted = []
+        for kind, free in self._free.items():
+            while len(free) > max_size:
+                evicted.append(free.popleft())
+                self._evictions[kind] += 1
+        return evicted
+
+    def forget(self) -> None:
+        """
+        Zapomene všechny položky, např. když je plátno smazalo samo.
+        """
+        for free in self._free.values():
+            free.clear()
+        self._kinds.clear()
+
+    def pooled_ids(self) -> set:
+        """
+        Vrátí id všech skrytých položek v poolu.
+        """
+        return {item_id for free in self._free.values() for item_id in free}
+
+    def stats(self) -> dict:
+        """
+        Vrátí statistiky poolu po druzích položek.
+        :return: dict {druh: {hits, misses, evictions, pooled}}
+        a souhrn pod klíčem "total"
+        """
+        result = {kind: {
+            "hits": self._hits[kind],
+            "misses": self._misses[kind],
+            "evictions": self._evictions[kind],
+            "pooled": len(self._free[kind]),
+        } for kind in ITEM_KINDS}
+        result["total"] = {name: sum(stats[name] for stats in result.values())
+                           for name in ("hits", "misses", "evictions", "pooled")}
+        return result
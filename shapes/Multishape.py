@@ -1,7 +1,14 @@
+from array import array
+
 from .Abstract_classes import IMovable, IRemovable
 from .Shape import Shape
 from abc import ABC
 from .CanvasShapes import canvas
+from .Instance import MultishapeInstance, build_template, stamp
+from .OptionalNumpy import get_numpy
+
+# Od kolika částí se pro transformace použije NumPy, pokud je nainstalován
+NUMPY_THRESHOLD = 256
 
 
 class Multishape(IMovable, IRemovable, ABC):
@@ -15,13 +22,18 @@ class Multishape(IMovable, IRemovable, ABC):
     definována jako velikost tohoto obdélníku.
     Multishape je postupně složen z jednodušších tvarů, které
     musí být instancemi rozhraní Shape. Nejsou na ně kladeny
-    žádné další požadavky. Během skládání se multishape
-    automaticky opravuje své vnitřní informace o své poloze a
-    velikosti takovým způsobem, aby pozice trvale směřovala do
-    levého horního rohu obrázku. obvodového obdélníku a
-    velikost odpovídá velikosti tohoto obdélníku.
+    žádné další požadavky. Obvodový obdélník je sjednocení
+    obdélníků všech částí; při přidání části se jen rozšíří,
+    po změně části mimo multishape se přepočítá při dalším použití.
+    Multishape může obsahovat i jiné multishapy. Ty se nekopírují,
+    ale vloží se odkazem jako uzly stromu (scene graph) - posun nebo
+    změna velikosti rodiče se provede najednou pro celý podstrom.
     """
 
+    _counter = 0
+    # počet příkazů, které multishape sám poslal na plátno
+    tk_calls = 0
+
     def __init__(self, name: str = '', *parts):
         """
         Vytvoří multishape s daným názvem a případně složený z
@@ -32,18 +44,104 @@ class Multishape(IMovable, IRemovable, ABC):
         """
         self._name = name
         self.parts = []
+        # společný tag všech částí, kterým se multishape posouvá najednou
+        Multishape._counter += 1
+        self._group_tag = "multishape_" + str(Multishape._counter)
+        # poloha prázdného multishapu, jinak se bere z obvodového obdélníku
         self._x_pos = 0
         self._y_pos = 0
-        self._height = 0
-        self._width = 0
-        self._first_shape = True
         self._creation_done = False
+        # geometrie částí (x, y, width, height za sebou) v souvislém poli,
+        # přepočítá se jen když se některá část změní mimo multishape
+        self._geometry = array('d')
+        self._geometry_dirty = False
+        # části seřazené podle pořadí na plátně, viz _get_parts_in_order
+        self._parts_in_order = None
+        self._order_generation = -1
+        # strom: vnořené multishapy (odkazem) a rodič, tagy celé cesty ke kořeni
+        self.children = []
+        self._parent = None
+        self._group_tags = (self._group_tag,)
+        # všechny tvary podstromu, viz _get_all_parts
+        self._all_parts = []
+        # obvodový obdélník podstromu (left, top, right, bottom), viz _get_bounds
+        self._bounds = None
+        # měřítko vůči původní velikosti, násobí se při set_size uzlu i rodičů
+        self._scale_x = 1.0
+        self._scale_y = 1.0
+        # geometrie částí vůči levému hornímu rohu sdílená instancemi, viz _get_template
+        self._template = None
         self.add_shapes(*parts)
 
+    @property
+    def x(self):
+        """
+        Vodorovná souřadnice levého horního rohu obvodového obdélníku.
+        """
+        return self._get_bounds()[0]
+
+    @property
+    def y(self):
+        """
+        Svislá souřadnice levého horního rohu obvodového obdélníku.
+        """
+        return self._get_bounds()[1]
+
+    @property
+    def width(self):
+        left, _, right, _ = self._get_bounds()
+        return right - left
+
+    @property
+    def height(self):
+        _, top, _, bottom = self._get_bounds()
+        return bottom - top
+
+    @property
+    def offset(self) -> tuple:
+        """
+        Poloha vůči rodiči (rozdíl levých horních rohů), u multishapu
+        bez rodiče poloha na plátně.
+        """
+        left, top, _, _ = self._get_bounds()
+        if self._parent is None:
+            return left, top
+        parent_left, parent_top, _, _ = self._parent._get_bounds()
+        return left - parent_left, top - parent_top
+
+    @property
+    def scale(self) -> tuple:
+        """
+        Měřítko (scale_x, scale_y) vůči původní velikosti, včetně
+        změn velikosti rodičů.
+        """
+        return self._scale_x, self._scale_y
+
+    @property
+    def local_scale(self) -> tuple:
+        """
+        Měřítko vůči rodiči, u multishapu bez rodiče stejné jako scale.
+        """
+        if self._parent is None:
+            return self.scale
+        return self._scale_x / self._parent._scale_x, self._scale_y / self._parent._scale_y
+
+    def set_offset(self, dx, dy) -> None:
+        """
+        Přesune multishape tak, aby byl o dx, dy od levého horního
+        rohu rodiče. U multishapu bez rodiče stejné jako set_position.
+        """
+        if self._parent is None:
+            self.set_position(dx, dy)
+        else:
+            self.set_position(self._parent.x + dx, self._parent.y + dy)
+
     def add_shapes(self, *args) -> None:
         """
-        Přidá kopii daných tvarů do tohoto multishapu
-         a vhodně upraví jeho vnitřní pozici a velikost.
+        Přidá dané tvary do tohoto multishapu a vhodně upraví jeho
+        vnitřní pozici a velikost. Multishapy se přidají odkazem jako
+        vnořené uzly, multishape, který už je v jiném, jako kopie, viz
+        add_child.
         :param args: Tvar(y) které chceme přidat
         """
         if self._creation_done:
@@ -55,8 +153,7 @@ class Multishape(IMovable, IRemovable, ABC):
             if isinstance(shape, Shape):
                 self.add_shape(shape)
             elif isinstance(shape, Multishape):
-                for s in shape.parts:
-                    self.add_shape(s.copy())
+                self.add_child(shape)
             else:
                 raise Exception("Wrong arguments")
 
@@ -87,18 +184,185 @@ class Multishape(IMovable, IRemovable, ABC):
             raise Exception("Attempt to add a shape " +
                             "after finishing the creation " +
                             "of the mutlishape ")
-        if self._first_shape:
-            self._x_pos = shape.x
-            self._y_pos = shape.y
-            self._width = shape.width
-            self._height = shape.height
-            self._first_shape = False
-        else:
-            self._x_pos = min(self._x_pos, shape.x)
-            self._y_pos = min(self._y_pos, shape.y)
-            self._width = max(self._width, shape.width)
-            self._height = max(self._height, shape.height)
+        box = shape._get_bounds()
+        if self._bounds is not None:
+            self._bounds = _union(self._bounds, box)
+        elif self._all_parts == []:
+            # první část
+            self._bounds = box
         self.parts.append(shape)
+        shape._multishapes += (self,)
+        self._parts_in_order = None
+        self._template = None
+        # nevykreslený tvar dostane tagy až při vytvoření položky
+        # (_get_tags), jeho staré id už může patřit jiné položce
+        if shape._is_painted_on_canvas:
+            for tag in self._group_tags:
+                canvas.addtag_withtag(tag, shape.canvas_id)
+                self.tk_calls += 1
+        if self._all_parts is not None:
+            self._all_parts.append(shape)
+        if not self._geometry_dirty:
+            self._geometry.extend((shape.x, shape.y, shape.width, shape.height))
+        if self._parent is not None:
+            self._parent._structure_changed(box)
+
+    def add_child(self, child: 'Multishape') -> None:
+        """
+        Vloží do tohoto multishapu jiný multishape odkazem, jeho části
+        se nekopírují. Vnořený multishape zůstává samostatný (je možné
+        ho dál posouvat a měnit jeho velikost), posun nebo změna
+        velikosti tohoto multishapu posune a změní i jeho.
+        Multishape může mít jen jednoho rodiče, pokud už ho má, vloží
+        se jeho kopie (stejně jako dřív při přidání multishapu).
+        :param child: vkládaný multishape
+        """
+        if self._creation_done:
+            raise Exception("Attempt to add a shape " +
+                            "after finishing the creation " +
+                            "of the mutlishape ")
+        node = self
+        while node is not None:
+            if node is child:
+                raise Exception("The multishape cannot be a part of itself")
+            node = node._parent
+        if child._parent is not None:
+            child = child.copy(child._name)
+        self.children.append(child)
+        child._parent = self
+        for node in child._iter_nodes():
+            node._group_tags = (node._group_tag,) + node._parent._group_tags
+        # části podstromu mají tag vkládaného multishapu, stačí přidat tagy předků
+        for tag in self._group_tags:
+            canvas.addtag_withtag(tag, child._group_tag)
+            self.tk_calls += 1
+        self._structure_changed(child._get_bounds() if len(child) else None)
+
+    def _structure_changed(self, box: tuple = None) -> None:
+        """
+        V podstromu přibyl tvar nebo vnořený multishape, seznam všech
+        částí a pole geometrie se přepočítají. Platný obvodový obdélník
+        se jen rozšíří o obdélník box přidaných tvarů.
+        """
+        node = self
+        while node is not None:
+            node._all_parts = None
+            node._geometry_dirty = True
+            if box is None or node._bounds is None:
+                node._bounds = None
+            else:
+                node._bounds = _union(node._bounds, box)
+            node._parts_in_order = None
+            node._template = None
+            node = node._parent
+
+    def _iter_nodes(self):
+        """
+        Projde podstrom (tento multishape a všechny vnořené) od kořene.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def _get_path(self) -> tuple:
+        """
+        Vrátí multishapy od kořene stromu až po tento.
+        """
+        path = []
+        node = self
+        while node is not None:
+            path.append(node)
+            node = node._parent
+        return tuple(reversed(path))
+
+    def _get_all_parts(self) -> list:
+        """
+        Vrátí všechny tvary podstromu - vlastní části a části vnořených
+        multishapů. Seznam se ukládá až do změny struktury.
+        """
+        if self._all_parts is None:
+            all_parts = list(self.parts)
+            for child in self.children:
+                all_parts.extend(child._get_all_parts())
+            self._all_parts = all_parts
+        return self._all_parts
+
+    def _get_template(self) -> tuple:
+        """
+        Vrátí geometrii částí vůči levému hornímu rohu, kterou sdílejí
+        instance multishapu, v případě potřeby ji přepočítá.
+        """
+        if self._template is None:
+            self._template = build_template(self)
+        return self._template
+
+    def instantiate(self, x, y, scale=1, color=None) -> MultishapeInstance:
+        """
+        Vytvoří na plátně lehkou instanci multishapu (razítko) s levým
+        horním rohem v x, y. Instance nevytváří kopie tvarů, pamatuje
+        si jen polohu, měřítko a barvu, geometrii sdílí s tímto
+        multishapem.
+        :param scale: měřítko, číslo nebo (scale_x, scale_y)
+        :param color: barva všech částí, základně barvy částí předlohy
+        :return: MultishapeInstance
+        """
+        return MultishapeInstance(self, x, y, scale, color)
+
+    def stamp(self, positions, scale=1, colors=None) -> list:
+        """
+        Vytvoří instance multishapu na zadaných pozicích v jedné dávce,
+        plátno se překreslí jen jednou.
+        robot.stamp([(0, 0), (100, 0), (200, 0)])
+        :param positions: dvojice (x, y) levých horních rohů
+        :param scale: měřítko všech instancí
+        :param colors: barva nebo posloupnost barev (po jedné pro
+        každou instanci), základně barvy částí předlohy
+        :return: list instancí MultishapeInstance
+        """
+        return stamp(self, positions, scale, colors)
+
+    def get_all_parts(self) -> list:
+        """
+        Vrátí všechny tvary multishapu včetně částí vnořených multishapů.
+        """
+        return list(self._get_all_parts())
+
+    def _get_bounds(self) -> tuple:
+        """
+        Vrátí obvodový obdélník všech částí podstromu jako
+        (left, top, right, bottom). Ukládá se, při přidání části se
+        rozšíří a přepočítá se jen po změně některé části.
+        """
+        if self._bounds is None:
+            boxes = [part._get_bounds() for part in self.parts]
+            boxes.extend(child._get_bounds() for child in self.children if len(child))
+            if not boxes:
+                return self._x_pos, self._y_pos, self._x_pos, self._y_pos
+            self._bounds = (min(box[0] for box in boxes), min(box[1] for box in boxes),
+                            max(box[2] for box in boxes), max(box[3] for box in boxes))
+        return self._bounds
+
+    def contains_point(self, x, y) -> bool:
+        """
+        Zjistí, zda bod leží v některé části multishapu. Body mimo
+        obvodový obdélník se odmítnou bez procházení částí.
+        """
+        left, top, right, bottom = self._get_bounds()
+        if not (left <= x <= right and top <= y <= bottom):
+            return False
+        return any(part.contains_point(x, y) for part in self._get_all_parts())
+
+    def intersects_rect(self, left, top, right, bottom) -> bool:
+        """
+        Zjistí, zda některá část multishapu zasahuje do obdélníku
+        (left <= right, top <= bottom), viz contains_point.
+        """
+        x1, y1, x2, y2 = self._get_bounds()
+        if not (x1 <= right and left <= x2 and y1 <= bottom and top <= y2):
+            return False
+        return any(part.intersects_rect(left, top, right, bottom) for part in self._get_all_parts())
 
     def creation_is_done(self) -> None:
         """
@@ -134,16 +398,25 @@ class Multishape(IMovable, IRemovable, ABC):
         if width < 0 or height < 0:
             raise Exception("The dimensions may not be negativ: width=" + str(width) + ", height=" + str(height))
 
-        scale_x = width / self._width if self._width != 0 else 1
-        scale_y = height / self._height if self._height != 0 else 1
-        for shape in self.parts:
-            difference_x = shape.x - self._x_pos
-            difference_y = shape.y - self._y_pos
-            shape.set_size(scale_x * shape.width, scale_y * shape.height)
-            shape.set_position(scale_x * difference_x + self._x_pos, scale_y * difference_y + self._y_pos)
-
-        self._width = max(1, width)
-        self._height = max(1, height)
+        width = max(1, width)
+        height = max(1, height)
+        scale_x = width / self.width if self.width != 0 else 1
+        scale_y = height / self.height if self.height != 0 else 1
+        origin_x, origin_y = self.x, self.y
+        _scale(self._get_geometry(), origin_x, origin_y, scale_x, scale_y)
+        nodes = list(self._iter_nodes())
+        bounds = [node._bounds for node in nodes]
+        self._apply_geometry()
+
+        # obdélníky multishapu i vnořených se změní stejně jako části
+        for node, box in zip(nodes, bounds):
+            node._x_pos = (node._x_pos - origin_x) * scale_x + origin_x
+            node._y_pos = (node._y_pos - origin_y) * scale_y + origin_y
+            node._scale_x *= scale_x
+            node._scale_y *= scale_y
+            if box is not None:
+                node._bounds = ((box[0] - origin_x) * scale_x + origin_x, (box[1] - origin_y) * scale_y + origin_y,
+                                (box[2] - origin_x) * scale_x + origin_x, (box[3] - origin_y) * scale_y + origin_y)
 
     def set_position(self, x: int, y: int) -> None:
         """
@@ -157,46 +430,109 @@ class Multishape(IMovable, IRemovable, ABC):
         okraj plátna má y=0, souřadnice se zvyšuje směrem dolů.
         """
         # self.verify_done()
-        dx = x - self._x_pos
-        dy = y - self._y_pos
-        for shape in self.parts:
-            shape.set_position(dx + shape.x, dy + shape.y)
-        self._x_pos = x
-        self._y_pos = y
+        dx = x - self.x
+        dy = y - self.y
+        _translate(self._get_geometry(), dx, dy)
+        nodes = list(self._iter_nodes())
+        bounds = [node._bounds for node in nodes]
+        templates = [node._template for node in nodes]
+        self._apply_translation(dx, dy)
+        # vnořené multishapy se posunou stejně, bez přepočítání,
+        # geometrie pro instance je vůči rohu multishapu a nemění se
+        for node, box, template in zip(nodes, bounds, templates):
+            node._x_pos += dx
+            node._y_pos += dy
+            node._template = template
+            if box is not None:
+                node._bounds = (box[0] + dx, box[1] + dy, box[2] + dx, box[3] + dy)
+
+    def _invalidate_geometry(self) -> None:
+        """
+        Některá část se změnila, pole geometrie a obvodový obdélník
+        (i u rodičů) se přepočítají při dalším použití.
+        """
+        node = self
+        while node is not None:
+            node._geometry_dirty = True
+            node._bounds = None
+            node._template = None
+            node = node._parent
+
+    def _get_geometry(self) -> array:
+        """
+        Vrátí pole geometrie částí, v případě potřeby ho přepočítá.
+        :return: array('d') s hodnotami x, y, width, height každé části
+        """
+        if self._geometry_dirty:
+            self._geometry = array('d', [value for shape in self._get_all_parts()
+                                         for value in (shape.x, shape.y, shape.width, shape.height)])
+            self._geometry_dirty = False
+        return self._geometry
+
+    def _apply_geometry(self) -> None:
+        """
+        Zapíše pole geometrie zpět do částí a překreslí je
+        najednou v jedné dávce.
+        """
+        # celá čísla zůstanou celými čísly jako při posunu jednotlivých tvarů
+        values = [int(value) if value.is_integer() else value for value in self._geometry]
+        with canvas.batch():
+            for index, shape in enumerate(self._get_all_parts()):
+                offset = 4 * index
+                shape._set_geometry(*values[offset:offset + 4])
+        # změny provedl sám multishape, pole je aktuální
+        self._geometry_dirty = False
+
+    def _apply_translation(self, dx, dy) -> None:
+        """
+        Zapíše posunuté polohy z pole geometrie do částí a všechny
+        části posune na plátně jedním příkazem přes společný tag.
+        """
+        x_values = [int(value) if value.is_integer() else value for value in self._geometry[0::4]]
+        y_values = [int(value) if value.is_integer() else value for value in self._geometry[1::4]]
+        for shape, x, y in zip(self._get_all_parts(), x_values, y_values):
+            shape._place(x, y)
+        self._geometry_dirty = False
+        canvas.move(self._group_tag, dx, dy)
+        self.tk_calls += 1
+        canvas.update_shapes()
 
     def move_right(self, length=25):
-        self.set_position(self._x_pos + length, self._y_pos)
+        self.set_position(self.x + length, self.y)
 
     def move_left(self, length=25):
-        self.set_position(self._x_pos - length, self._y_pos)
+        self.set_position(self.x - length, self.y)
 
     def move_up(self, length=25):
-        self.set_position(self._x_pos, self._y_pos - length)
+        self.set_position(self.x, self.y - length)
 
     def move_down(self, length=25):
-        self.set_position(self._x_pos, self._y_pos + length)
+        self.set_position(self.x, self.y + length)
 
     def set_x(self, x: int):
-        self.set_position(x, self._y_pos)
+        self.set_position(x, self.y)
 
     def set_y(self, y: int):
-        self.set_position(self._x_pos, y)
+        self.set_position(self.x, y)
 
     def remove(self) -> None:
         """
-        Metoda odstraní všechny tvary v multishapu z plátna
+        Metoda odstraní všechny tvary v multishapu (i ve vnořených
+        multishapech) z plátna
         """
-        for part in self.parts:
-            part.delete()
+        for part in self._get_all_parts():
+            part.remove()
 
     def copy(self, new_name: str = None) -> 'Multishape':
         """
-        Vytvoří kopii multishapu.
+        Vytvoří kopii multishapu, vnořené multishapy se zkopírují také.
         :return: kopie multishapu
         """
         copy = Multishape(new_name if new_name else self._name + ' - copy')
         for part in self.parts:
             copy.add_shape(part.copy())
+        for child in self.children:
+            copy.add_child(child.copy(child._name))
         return copy
 
     def __str__(self) -> str:
@@ -204,7 +540,7 @@ class Multishape(IMovable, IRemovable, ABC):
         Vrátí informace o multishapu.
         :return: informace o multishapu
         """
-        return "Multishape " + self._name + " with " + str(len(self.parts)) + " parts"
+        return "Multishape " + self._name + " with " + str(len(self)) + " parts"
 
     def __repr__(self) -> str:
         """
@@ -215,10 +551,10 @@ class Multishape(IMovable, IRemovable, ABC):
 
     def __len__(self) -> int:
         """
-        Vrátí počet tvarů v multishapu.
+        Vrátí počet tvarů v multishapu včetně vnořených multishapů.
         :return: počet tvarů v multishapu
         """
-        return len(self.parts)
+        return len(self._get_all_parts())
 
     def get_name(self) -> str:
         """
@@ -229,63 +565,154 @@ class Multishape(IMovable, IRemovable, ABC):
 
     def raise_above_shape(self, shape) -> None:
         """
-        Zvedne obrazec nad jiný obrazec
+        Zvedne obrazec nad jiný obrazec. Všechny části se přesunou
+        najednou přes společný tag a zachovají si vzájemné pořadí.
         :param shape: pozice na kterou se má obrazec zvednout
         """
-        print(reversed(self._get_parts_in_order()))
-        for part in reversed(self._get_parts_in_order()):
-            part.raise_above_shape(shape)
+        target = shape if isinstance(shape, Shape) else shape.get_highest_shape()
+        if target is None or not target._is_painted_on_canvas:
+            # cíl (nebo žádná část multishapu) není na plátně
+            return
+        canvas.tag_raise_group(self._group_tag, self._get_painted_ids(), target.canvas_id)
+        self.tk_calls += 1
+        canvas.update_shapes()
 
     def lower_below_shape(self, shape) -> None:
         """
-        Snižuje obrazec pod jiný obrazec
+        Snižuje obrazec pod jiný obrazec. Všechny části se přesunou
+        najednou přes společný tag a zachovají si vzájemné pořadí.
         :param shape: pozice na kterou se má obrazec snížit
         """
-        print(self._get_parts_in_order())
-        for part in self._get_parts_in_order():
-            part.lower_below_shape(shape)
+        target = shape if isinstance(shape, Shape) else shape.get_lowest_shape()
+        if target is None or not target._is_painted_on_canvas:
+            # cíl (nebo žádná část multishapu) není na plátně
+            return
+        canvas.tag_lower_group(self._group_tag, self._get_painted_ids(), target.canvas_id)
+        self.tk_calls += 1
+        canvas.update_shapes()
+
+    def raise_to_top(self) -> None:
+        """
+        Zvedne celý multishape na vrchol.
+        """
+        canvas.tag_raise_group(self._group_tag, self._get_painted_ids())
+        self.tk_calls += 1
+        canvas.update_shapes()
+
+    def lower_to_bottom(self) -> None:
+        """
+        Sníží celý multishape na dno.
+        """
+        canvas.tag_lower_group(self._group_tag, self._get_painted_ids())
+        self.tk_calls += 1
+        canvas.update_shapes()
+
+    def _get_painted_ids(self) -> list:
+        """
+        Vrátí id položek všech částí, které jsou na plátně.
+        """
+        return [part.canvas_id for part in self._get_all_parts() if part._is_painted_on_canvas]
+
+    def _invalidate_order(self) -> None:
+        """
+        Pořadí některé části na plátně se změnilo, seřazené
+        části (i u rodičů) se přepočítají při dalším dotazu.
+        """
+        node = self
+        while node is not None:
+            node._parts_in_order = None
+            node = node._parent
+
+    def _invalidate_painted(self) -> None:
+        """
+        Některá část se vykreslila nebo odstranila z plátna, seřazené
+        části a geometrie pro instance (i u rodičů) se přepočítají
+        při dalším použití.
+        """
+        node = self
+        while node is not None:
+            node._parts_in_order = None
+            node._template = None
+            node = node._parent
 
     def _get_parts_in_order(self) -> list:
         """
         Vrátí list tvarů v multishapu v pořadí, v jakém jsou v display listu v kanvasu.
-        :return:
-        """
-        list_all = canvas.find_all()
-        dict_in_multishape = {}
-        list_parts_in_order = []
-        for s in self.parts:
-            dict_in_multishape.update({s.canvas_id: s})
-        for i in list_all:
-            if i in dict_in_multishape.keys():
-                list_parts_in_order.append(dict_in_multishape.get(i))
-        return list_parts_in_order
+        Pořadí se bere z indexu canvas.z_order a ukládá se, dokud se
+        pořadí některé části nezmění.
+        :return: části odspodu nahoru
+        """
+        z_order = canvas.z_order
+        z_order.refresh()
+        if self._parts_in_order is None or self._order_generation != z_order.generation:
+            by_id = {part.canvas_id: part for part in self._get_all_parts() if part._is_painted_on_canvas}
+            self._parts_in_order = [by_id[item_id] for item_id in z_order.in_order(by_id)]
+            self._order_generation = z_order.generation
+        return self._parts_in_order
 
     def get_highest_shape(self) -> Shape | None:
         """
         Vrátí nejvyšší tvar v multishapu.
         :return: nejvyšší tvar
         """
-        list_all = canvas.find_all()
-        dict_in_multishape = {}
-        for s in self.parts:
-            dict_in_multishape.update({s.canvas_id: s})
-
-        for i in reversed(list_all):
-            if i in dict_in_multishape.keys():
-                return dict_in_multishape.get(i)
-        return None
+        parts_in_order = self._get_parts_in_order()
+        return parts_in_order[-1] if parts_in_order else None
 
     def get_lowest_shape(self) -> Shape | None:
         """
         Vrátí nejnižší tvar v multishapu.
         :return: nejnižší tvar
         """
-        list_all = canvas.find_all()
-        dict_in_multishape = {}
-        for s in self.parts:
-            dict_in_multishape.update({s.canvas_id: s})
+        parts_in_order = self._get_parts_in_order()
+        return parts_in_order[0] if parts_in_order else None
+
 
-        for i in list_all:
-            if i in dict_in_multishape.keys():
-                return dict_in_multishape.get(i)
-        return None
+def _union(box: tuple, other: tuple) -> tuple:
+    """
+    Vrátí obvodový obdélník dvou obdélníků (left, top, right, bottom).
+    """
+    return (box[0] if box[0] < other[0] else other[0], box[1] if box[1] < other[1] else other[1],
+            box[2] if box[2] > other[2] else other[2], box[3] if box[3] > other[3] else other[3])
+
+
+def _get_numpy(size: int):
+    """
+    Vrátí modul numpy, pokud je nainstalován a pole je dost velké,
+    aby se vyplatil.
+    """
+    return get_numpy() if size >= NUMPY_THRESHOLD else None
+
+
+def _translate(geometry: array, dx, dy) -> None:
+    """
+    Posune všechny části v poli geometrie o dx, dy.
+    """
+    numpy = _get_numpy(len(geometry))
+    if numpy is not None:
+        view = numpy.frombuffer(geometry, dtype=numpy.float64).reshape(-1, 4)
+        view[:, 0] += dx
+        view[:, 1] += dy
+        del view
+        return
+    geometry[0::4] = array('d', [x + dx for x in geometry[0::4]])
+    geometry[1::4] = array('d', [y + dy for y in geometry[1::4]])
+
+
+def _scale(geometry: array, origin_x, origin_y, scale_x, scale_y) -> None:
+    """
+    Změní měřítko všech částí v poli geometrie vzhledem k bodu
+    origin_x, origin_y. Mění se polohy i velikosti částí.
+    """
+    numpy = _get_numpy(len(geometry))
+    if numpy is not None:
+        view = numpy.frombuffer(geometry, dtype=numpy.float64).reshape(-1, 4)
+        view[:, 0] = (view[:, 0] - origin_x) * scale_x + origin_x
+        view[:, 1] = (view[:, 1] - origin_y) * scale_y + origin_y
+        view[:, 2] *= scale_x
+        view[:, 3] *= scale_y
+        del view
+        return
+    geometry[0::4] = array('d', [(x - origin_x) * scale_x + origin_x for x in geometry[0::4]])
+    geometry[1::4] = array('d', [(y - origin_y) * scale_y + origin_y for y in geometry[1::4]])
+    geometry[2::4] = array('d', [width * scale_x for width in geometry[2::4]])
+    geometry[3::4] = array('d', [height * scale_y for height in geometry[3::4]])
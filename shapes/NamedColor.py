@@ -3,11 +3,23 @@
 Modul definuje multiton pojmenovaných barev.
 Umožňuje vytvářet nové barvy, ale nepovoluje vytvářet barvy,
 které již existují.
+Registr drží barvy jen slabými odkazy, pojmenované barvy navíc
+trvale. Barva vytvořená jen ze složek (bez názvu) tak z registru
+zmizí, až ji nic nepoužívá, aby např. barevné přechody v animacích
+nezaplnily paměť. Dokud ji nějaký tvar používá, getColor vrací
+stejný objekt. Naposledy použitých MAX_UNNAMED_COLORS nepojmenovaných
+barev si registr drží, aby je nemusel stále vytvářet znovu.
 
 Author:  Rudolf PECINOVSKÝ
 Version: 2021_Summer
 """
-from typing import Tuple
+
+from weakref import WeakValueDictionary as _WeakValueDictionary
+
+# nejvýše tolik naposledy použitých nepojmenovaných barev si registr drží
+MAX_UNNAMED_COLORS = 4096
+# nejvýše tolik přechodů si pamatuje color_blend
+MAX_BLENDS = 256
 
 
 def getColor(red=-1, green=-1, blue=-1, name=None):
@@ -36,13 +48,20 @@ def getColor(red=-1, green=-1, blue=-1, name=None):
     # Už víme, že všechny barevné složky jsou zadány
     rgb = (red, green, blue)
 
-    if _name2color is None:  # Nebyl zadán název
-        if rgb in _rgb2color:
-            return _rgb2color[rgb]  # Barva existuje => vracím ji
+    if name is None:  # Nebyl zadán název
+        result = _rgb2color.get(rgb)
+        if result is not None:
+            if rgb in _unnamed:  # Naposledy použitá, pustí se poslední
+                _unnamed[rgb] = _unnamed.pop(rgb)
+            return result  # Barva existuje => vracím ji
         else:  # Barva ještě neexistuje
             # Vytvořím ji s názvem shodným s názvem pro knihovnu Tkinter
             _not_new = True
             result = _NC(rgb, _create_tkname(*rgb))
+            _unnamed[rgb] = result
+            if len(_unnamed) > MAX_UNNAMED_COLORS:
+                # v registru zůstane, dokud ji něco používá
+                del _unnamed[next(iter(_unnamed))]
             return result
 
     else:  # Byly zadány složky i název
@@ -51,6 +70,7 @@ def getColor(red=-1, green=-1, blue=-1, name=None):
             # není zatím vytvořena
             _not_new = True
             result = _NC(rgb, name)
+            _named.append(result)  # Pojmenované barvy se nezapomínají
             return result  # Vytvořil jsem ji a vracím ji
 
         else:  # Název či rgb složka jsou již použity a nesedí
@@ -67,6 +87,42 @@ def getColor(red=-1, green=-1, blue=-1, name=None):
                 f'existující barvou: {name=}, {rgb=}')
 
 
+def color_lerp(start, end, t: float):
+    """Vrátí barvu v poměru t mezi barvami start (t=0) a end (t=1).
+    Složky se zaokrouhlí, t mimo <0, 1> se omezí na krajní barvu.
+    """
+    if t <= 0:
+        return start
+    if t >= 1:
+        return end
+    return getColor(*(round(a + (b - a) * t) for a, b in zip(start.rgb, end.rgb)))
+
+
+def color_blend(start, end, steps: int) -> tuple:
+    """Vrátí přechod z barvy start do barvy end o steps barvách
+    (včetně obou krajních), např. pro plynulé přebarvování po snímcích:
+    fade = color_blend(RED, BLUE, 30)
+    shape.change_shape_color(fade[frame])
+    Přechod se spočítá jen poprvé, pak se vrací z tabulky přechodů
+    (nejvýše MAX_BLENDS, nejdéle nepoužité se zapomenou). Tabulka
+    barvy přechodu drží, takže je getColor do té doby vrací stejné.
+    """
+    key = (start, end, steps)
+    palette = _blends.get(key)
+    if palette is not None:
+        _blends[key] = _blends.pop(key)
+        return palette
+    if steps < 2:
+        raise Exception(f'Přechod musí mít alespoň 2 barvy: {steps=}')
+    palette = ((start,)
+               + tuple(color_lerp(start, end, index / (steps - 1)) for index in range(1, steps - 1))
+               + (end,))
+    _blends[key] = palette
+    if len(_blends) > MAX_BLENDS:
+        del _blends[next(iter(_blends))]
+    return palette
+
+
 def print_named_colors():
     """Vytiskne definované barvy.
     """
@@ -78,15 +134,14 @@ def print_named_colors():
 
 def _create_tkname(red: int, green: int, blue: int) -> str:
     """Vytvoří název z hodnot barevných složek."""
-    return '#' + hex(0x1_00_00_00
-                     + ((red * 256) + green) * 256 + blue)[3:]
+    return '#' + _HEX[red] + _HEX[green] + _HEX[blue]
 
 
 class _NC:
     """Třída definující instanční metody jednotlivých barev.
     """
 
-    def __init__(self, rgb: Tuple[int, int, int], name: str):
+    def __init__(self, rgb: tuple[int, int, int], name: str):
         """Vytvoří barvu se zadanými barevnými složkam a názvem.
         Tvorba je ale podmíněna - atribut _not_new musí být False
         """
@@ -120,9 +175,20 @@ class _NC:
 
 ############################################################################
 
-_name2color = {}
-_tkname2color = {}
-_rgb2color = {}
+# registry odkazují na barvy slabě, barva zmizí, až ji nic nepoužívá
+_name2color = _WeakValueDictionary()
+_tkname2color = _WeakValueDictionary()
+_rgb2color = _WeakValueDictionary()
+# pojmenované barvy, drží je v registrech trvale
+_named = []
+# naposledy použité nepojmenované barvy podle složek, od nejdéle
+# nepoužité (dict zachovává pořadí vložení, použitá barva se vloží
+# znovu na konec)
+_unnamed = {}
+# přechody color_blend podle (start, end, steps), stejně od nejdéle nepoužitého
+_blends = {}
+# dvojice šestnáctkových číslic pro složky 0 až 255
+_HEX = tuple(f'{value:02x}' for value in range(256))
 
 BLACK = getColor(red=0, green=0, blue=0, name='black')
 BLUE = getColor(0x00, 0x00, 0xFF, 'blue')  # (0,   0,   255)
@@ -0,0 +1,22 @@
+"""
+Zde najdete přístup k volitelnému NumPy.
+Balíček NumPy nevyžaduje, pokud je nainstalován, použije ho pro
+výpočty s velkými poli. Import se provádí až při prvním použití,
+aby import balíčku zůstal rychlý.
+"""
+
+_numpy = None
+
+
+def get_numpy():
+    """
+    Vrátí modul numpy, nebo None, pokud není nainstalován.
+    """
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
@@ -0,0 +1,252 @@
+"""
+Zde najdete vykreslení plátna do obrázku bez tkinter.
+Tvary na plátně (Rectangle, Ellipse, Triangle) se v pořadí odspodu
+nahoru vyplní po řádcích do framebufferu, který je možné uložit jako
+PPM nebo PNG. Framebuffer je bytearray, nebo pole NumPy, pokud je
+NumPy nainstalován. Texty se nevykreslují, na to je třeba písmo.
+Pixel patří tvaru, pokud v tvaru leží jeho střed.
+"""
+
+import math
+import struct
+import zlib
+
+from .CanvasShapes import canvas
+from .Ellipse import Ellipse
+from .Shape import Shape
+from .OptionalNumpy import get_numpy
+from .Triangle import Triangle
+
+# největší počet zapamatovaných úseků tvarů při jednom vykreslení
+_MAX_TEMPLATES = 4096
+
+
+class Framebuffer:
+    """
+    Obrázek v paměti, 3 bajty (r, g, b) na pixel po řádcích.
+    """
+
+    def __init__(self, width: int, height: int, pixels):
+        """
+        :param pixels: bytearray nebo pole NumPy (height, width, 3) typu uint8
+        """
+        self.width = width
+        self.height = height
+        self.pixels = pixels
+
+    def tobytes(self) -> bytes:
+        """
+        Vrátí pixely jako bytes (r, g, b po řádcích).
+        """
+        return bytes(self.pixels) if isinstance(self.pixels, bytearray) else self.pixels.tobytes()
+
+    def get_pixel(self, x: int, y: int) -> tuple:
+        """
+        Vrátí barvu pixelu jako (r, g, b).
+        """
+        if isinstance(self.pixels, bytearray):
+            offset = 3 * (y * self.width + x)
+            return tuple(self.pixels[offset:offset + 3])
+        return tuple(int(value) for value in self.pixels[y, x])
+
+    def to_ppm(self) -> bytes:
+        return b"P6\n%d %d\n255\n" % (self.width, self.height) + self.tobytes()
+
+    def to_png(self) -> bytes:
+        data = self.tobytes()
+        stride = 3 * self.width
+        # každý řádek začíná typem filtru 0 (žádný)
+        raw = b"".join(b"\x00" + data[offset:offset + stride] for offset in range(0, len(data), stride))
+        return (b"\x89PNG\r\n\x1a\n"
+                + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0))
+                + _png_chunk(b"IDAT", zlib.compress(raw, 6))
+                + _png_chunk(b"IEND", b""))
+
+    def save(self, path: str) -> None:
+        """
+        Uloží obrázek, formát podle přípony (.png, jinak PPM).
+        """
+        with open(path, "wb") as file:
+            file.write(self.to_png() if path.lower().endswith(".png") else self.to_ppm())
+
+
+def rasterize(width: int = None, height: int = None, background=None, use_numpy: bool = None) -> Framebuffer:
+    """
+    Vykreslí tvary na plátně do framebufferu.
+    :param width: šířka obrázku, základně šířka plátna
+    :param height: výška obrázku, základně výška plátna
+    :param background: barva pozadí, základně barva plátna
+    :param use_numpy: použít NumPy, základně pokud je nainstalován
+    :return: Framebuffer
+    """
+    # rozměry jako u okna plátna, viz CanvasShapes._update_canvas_config
+    width = canvas.canvas_height if width is None else width
+    height = canvas.canvas_width if height is None else height
+    background = canvas.canvas_color if background is None else background
+    numpy = get_numpy() if use_numpy is None or use_numpy else None
+    if use_numpy and numpy is None:
+        raise Exception("NumPy is not installed")
+
+    items = [canvas.find_shape(item_id) for item_id in canvas.z_order.in_order(canvas._shapes)]
+    items = [item for item in items if isinstance(item, Shape)]
+    if numpy is not None:
+        pixels = numpy.empty((height, width, 3), dtype=numpy.uint8)
+        pixels[:, :] = background.rgb
+        _fill_numpy(numpy, pixels, items, width, height)
+    else:
+        pixels = bytearray(bytes(background.rgb) * (width * height))
+        _fill_bytearray(pixels, items, width, height)
+    return Framebuffer(width, height, pixels)
+
+
+def save_image(path: str, **options) -> Framebuffer:
+    """
+    Vykreslí plátno a uloží ho jako PNG nebo PPM (podle přípony).
+    shapes.save_image("platno.png")
+    :param options: parametry funkce rasterize
+    :return: vykreslený Framebuffer
+    """
+    framebuffer = rasterize(**options)
+    framebuffer.save(path)
+    return framebuffer
+
+
+def _spans(shape, top: int, bottom: int) -> list:
+    """
+    Vrátí úseky pixelů (od, do) uvnitř elipsy nebo trojúhelníku pro
+    řádky top až bottom - 1, bez ořezání na šířku obrázku. Řádek, přes
+    který tvar nezasahuje, má prázdný úsek (od >= do).
+    """
+    ceil = math.ceil
+    if isinstance(shape, Ellipse):
+        left, upper, right, lower = shape._get_bounds()
+        center_x, center_y = (left + right) / 2 - 0.5, (upper + lower) / 2 - 0.5
+        radius_x, radius_y = (right - left) / 2, (lower - upper) / 2
+        if radius_x <= 0 or radius_y <= 0:
+            return []
+        spans = []
+        for row in range(top, bottom):
+            dy = (row - center_y) / radius_y
+            dy = 1 - dy * dy
+            if dy > 0:
+                half = radius_x * math.sqrt(dy)
+                spans.append((ceil(center_x - half), ceil(center_x + half)))
+            else:
+                spans.append((0, 0))
+        return spans
+    # trojúhelník: vrcholy podle y, řádky nad a pod prostředním vrcholem
+    coord = shape.get_coord()
+    (x0, y0), (x1, y1), (x2, y2) = sorted(zip(coord[0::2], coord[1::2]), key=lambda vertex: vertex[1])
+    if y2 == y0:
+        return []
+    long_slope = (x2 - x0) / (y2 - y0)
+    upper_slope = (x1 - x0) / (y1 - y0) if y1 != y0 else 0
+    lower_slope = (x2 - x1) / (y2 - y1) if y2 != y1 else 0
+    spans = []
+    for row in range(top, bottom):
+        y = row + 0.5
+        if y < y0 or y > y2:
+            spans.append((0, 0))
+            continue
+        a = x0 + (y - y0) * long_slope
+        b = x0 + (y - y0) * upper_slope if y < y1 else x1 + (y - y1) * lower_slope
+        if a > b:
+            a, b = b, a
+        spans.append((ceil(a - 0.5), ceil(b - 0.5)))
+    return spans
+
+
+def _is_rectangle(shape) -> bool:
+    return not isinstance(shape, (Ellipse, Triangle))
+
+
+def _fill_bytearray(pixels: bytearray, items: list, width: int, height: int) -> None:
+    ceil = math.ceil
+    floor = math.floor
+    colors = {}
+    # úseky elips a trojúhelníků se počítají jen jednou pro každý
+    # rozměr, směr a posun o zlomek pixelu, viz _relative_spans
+    templates = {}
+    stride = 3 * width
+    for shape in items:
+        color = colors.get(shape._color)
+        if color is None:
+            color = colors[shape._color] = bytes(shape._color.rgb)
+        left, upper, right, lower = shape._get_bounds()
+        if _is_rectangle(shape):
+            top, bottom = ceil(upper - 0.5), ceil(lower - 0.5)
+            top, bottom = top if top > 0 else 0, bottom if bottom < height else height
+            x0, x1 = ceil(left - 0.5), ceil(right - 0.5)
+            x0, x1 = x0 if x0 > 0 else 0, x1 if x1 < width else width
+            if top < bottom and x0 < x1:
+                span = color * (x1 - x0)
+                for offset in range(top * stride + 3 * x0, bottom * stride, stride):
+                    pixels[offset:offset + len(span)] = span
+            continue
+        base_x, base_y = floor(left), floor(upper)
+        key = (type(shape), right - left, lower - upper, getattr(shape, "dir8", None),
+               left - base_x, upper - base_y)
+        template = templates.get(key)
+        if template is None:
+            if len(templates) >= _MAX_TEMPLATES:
+                templates.clear()
+            spans = _relative_spans(shape, base_x, base_y)
+            # úseky jako posuny v bajtech od levého horního rohu tvaru
+            template = templates[key] = (spans, [
+                (row * stride + 3 * start, row * stride + 3 * end, end - start)
+                for row, (start, end) in enumerate(spans) if start < end])
+        spans, chunks = template
+        if (base_y >= 0 and base_x >= 0 and base_y + len(spans) <= height
+                and base_x + ceil(right - left) + 1 <= width):
+            # celý tvar je uvnitř obrázku, bez ořezání
+            offset = base_y * stride + 3 * base_x
+            for start, end, count in chunks:
+                pixels[offset + start:offset + end] = color * count
+            continue
+        for row, (start, end) in enumerate(spans, base_y):
+            if 0 <= row < height:
+                start, end = max(0, base_x + start), min(width, base_x + end)
+                if start < end:
+                    pixels[row * stride + 3 * start:row * stride + 3 * end] = color * (end - start)
+
+
+def _relative_spans(shape, base_x: int, base_y: int) -> list:
+    """
+    Vrátí úseky tvaru pro řádky od base_y, s pixely počítanými od base_x.
+    """
+    _, _, _, lower = shape._get_bounds()
+    return [(start - base_x, end - base_x) for start, end in _spans(shape, base_y, _pixel(lower))]
+
+
+def _fill_numpy(numpy, pixels, items: list, width: int, height: int) -> None:
+    for shape in items:
+        left, upper, right, lower = shape._get_bounds()
+        top, bottom = max(0, _pixel(upper)), min(height, _pixel(lower))
+        if top >= bottom:
+            continue
+        if _is_rectangle(shape):
+            x0, x1 = max(0, _pixel(left)), min(width, _pixel(right))
+            if x0 < x1:
+                pixels[top:bottom, x0:x1] = shape._color.rgb
+            continue
+        spans = _spans(shape, top, bottom)
+        if not spans:
+            continue
+        starts, ends = numpy.array(spans).T
+        x0, x1 = max(0, _pixel(left)), min(width, _pixel(right))
+        if x0 >= x1:
+            continue
+        columns = numpy.arange(x0, x1)
+        mask = (columns >= starts[:, None]) & (columns < ends[:, None])
+        pixels[top:bottom, x0:x1][mask] = shape._color.rgb
+
+
+def _pixel(value: float) -> int:
+    """
+    Index prvního pixelu, jehož střed leží na souřadnici value nebo za ní.
+    """
+    return math.ceil(value - 0.5)
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
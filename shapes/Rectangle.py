@@ -11,6 +11,7 @@ class Rectangle(Shape):
     Pozice instance je definována jako pozice
     jeho levého horního rohu.
     """
+    __slots__ = ()
 
     def __init__(self, x=0, y=0, width=2 * canvas_step, height=canvas_step, color=RED):
         """
@@ -30,20 +31,12 @@ class Rectangle(Shape):
         """
         super().__init__(x, y, width, height, color)
 
-    def paint(self) -> None:
+    def _create_item(self) -> int:
         """
-        Metoda paint vytvoří tvar na plátně, pokud není vytvořen.
-        Pokud je pouze aktualizuje stav tvaru na plátně podle
-        atributů třídy.
+        Vytvoří obdélník na plátně podle atributů třídy.
+        Aktualizaci již vytvořeného tvaru řeší Shape.paint.
         """
-        if not self._is_painted_on_canvas:
-            self.canvas_id = canvas.create_rectangle(self.get_coord(), tag=self.__repr__(), fill=self.color.tkn, width=0)
-            self._is_painted_on_canvas = True
-            canvas.update_shapes()
-        else:
-            canvas.itemconfig(self.__repr__(), fill=self.color.tkn)
-            canvas.coords(self.__repr__(), self.get_coord())
-            canvas.update_shapes()
+        return canvas.create_rectangle(self.get_coord(), tag=self._get_tags(), fill=self.color.tkn, width=0)
 
     def copy(self) -> Shape:
         return Rectangle(self.x, self.y, self.width, self.height, self.color)
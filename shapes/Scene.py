@@ -0,0 +1,357 @@
+"""
+Zde najdete ukládání a načítání celé scény na plátně.
+Scéna obsahuje všechny tvary a texty na plátně v pořadí odspodu
+nahoru, jejich barvy (podle názvu), směry trojúhelníků a příslušnost
+k multishapům. Ukládá se buď do kompaktního binárního formátu, nebo
+do JSON Lines (jeden objekt na řádek).
+Načítání čte soubor postupně a tvary vytváří po dávkách, každá dávka
+se překreslí jednou, takže se celý soubor nikdy nenačítá do paměti.
+"""
+
+import json
+import struct
+
+from .CanvasShapes import canvas
+from .Direction8 import values9
+from .Ellipse import Ellipse
+from .Multishape import Multishape
+from .NamedColor import _create_tkname, getColor
+from .Rectangle import Rectangle
+from .Text import Text
+from .Triangle import Triangle
+
+# výchozí počet tvarů vytvořených v jedné dávce při načítání
+DEFAULT_BATCH_SIZE = 10000
+
+_MAGIC = b"SHPS"
+_VERSION = 2
+_JSONL_FORMAT = "shapes-scene"
+
+# druhy záznamů binárního formátu
+_END = 0
+_RECTANGLE = 1
+_ELLIPSE = 2
+_TRIANGLE = 3
+_TEXT = 4
+_COLOR = 5
+_MULTISHAPE = 6
+
+_SHAPE_KINDS = {Rectangle: _RECTANGLE, Ellipse: _ELLIPSE, Triangle: _TRIANGLE}
+_SHAPE_CLASSES = {_RECTANGLE: Rectangle, _ELLIPSE: Ellipse, _TRIANGLE: Triangle}
+_CLASS_NAMES = {"Rectangle": Rectangle, "Ellipse": Ellipse, "Triangle": Triangle}
+_DIRECTIONS = {direction.short_name: direction for direction in values9}
+# argumenty konstruktoru za barvou, které záznam tvaru obsahuje
+_EXTRA_ARGUMENTS = {Triangle: ("dir8",)}
+
+# tvar (za bajtem druhu): index barvy, x, y, width, height
+_SHAPE = struct.Struct("<I4d")
+_DIRECTION = struct.Struct("<B")
+# text: x, y, délka textu v bajtech
+_TEXT_HEAD = struct.Struct("<2dI")
+# barva: index, r, g, b, délka názvu
+_COLOR_HEAD = struct.Struct("<I3BH")
+# multishape: délka názvu, dokončen, x, y, width, height, index rodiče
+# (-1 bez rodiče), počet částí
+_MULTISHAPE_HEAD = struct.Struct("<IB4diI")
+_KIND = struct.Struct("<B")
+_HEADER = struct.Struct("<4sB")
+
+
+def save_scene(target, format: str = None) -> int:
+    """
+    Uloží tvary a texty na plátně do souboru.
+    shapes.save_scene("scena.bin")
+    shapes.save_scene("scena.jsonl")
+    :param target: cesta k souboru nebo otevřený soubor (binární pro
+    formát "binary", textový pro "jsonl")
+    :param format: "binary" nebo "jsonl", základně podle přípony
+    (.jsonl znamená JSON Lines, cokoli jiného binární formát)
+    :return: počet uložených tvarů a textů
+    """
+    format = _get_format(target, format)
+    if isinstance(target, str):
+        if format == "jsonl":
+            with open(target, "w", encoding="utf-8") as file:
+                return _save_jsonl(file)
+        with open(target, "wb") as file:
+            return _save_binary(file)
+    return _save_jsonl(target) if format == "jsonl" else _save_binary(target)
+
+
+def load_scene(source, format: str = None, batch_size: int = DEFAULT_BATCH_SIZE) -> tuple:
+    """
+    Načte scénu uloženou funkcí save_scene a vytvoří její tvary,
+    texty a multishapy na plátně. Soubor se čte postupně, tvary se
+    vytvářejí po batch_size kusech a každá dávka se překreslí jednou.
+    :param source: cesta k souboru nebo otevřený soubor
+    :param format: "binary" nebo "jsonl", základně podle přípony
+    :param batch_size: počet tvarů v jedné dávce
+    :return: dvojice (list tvarů a textů odspodu nahoru, list multishapů)
+    """
+    format = _get_format(source, format)
+    if isinstance(source, str):
+        if format == "jsonl":
+            with open(source, encoding="utf-8") as file:
+                return _load(_read_jsonl(file), batch_size)
+        with open(source, "rb") as file:
+            return _load(_read_binary(file), batch_size)
+    records = _read_jsonl(source) if format == "jsonl" else _read_binary(source)
+    return _load(records, batch_size)
+
+
+def _get_format(target, format: str | None) -> str:
+    if format is None:
+        name = target if isinstance(target, str) else getattr(target, "name", "")
+        format = "jsonl" if str(name).endswith(".jsonl") else "binary"
+    if format not in ("binary", "jsonl"):
+        raise Exception(f"Unknown scene format: {format}")
+    return format
+
+
+def _scene_contents() -> tuple:
+    """
+    Vrátí tvary a texty na plátně odspodu nahoru a multishapy,
+    jejichž části na plátně jsou. Rodič je v seznamu vždy před
+    svými vnořenými multishapy.
+    """
+    items = [canvas.find_shape(item_id) for item_id in canvas.z_order.in_order(canvas._shapes)]
+    multishapes = {}
+    for item in items:
+        for group in getattr(item, "_multishapes", ()):
+            if isinstance(group, Multishape):
+                for node in group._get_path():
+                    multishapes.setdefault(id(node), node)
+    return items, list(multishapes.values())
+
+
+def _multishape_record(multishape: Multishape, indexes: dict, groups: dict) -> tuple:
+    """
+    Vrátí data multishapu. Vlastní části (bez částí vnořených multishapů)
+    se zapíší indexy v uloženém pořadí, rodič indexem mezi multishapy.
+    """
+    parts = [indexes[id(part)] for part in multishape.parts if id(part) in indexes]
+    bounds = (multishape.x, multishape.y, multishape.width, multishape.height)
+    parent = groups[id(multishape._parent)] if multishape._parent is not None else None
+    return multishape._name, multishape._creation_done, bounds, parent, parts
+
+
+def _save_binary(file) -> int:
+    items, multishapes = _scene_contents()
+    file.write(_HEADER.pack(_MAGIC, _VERSION))
+    colors = {}
+    indexes = {}
+    for index, item in enumerate(items):
+        indexes[id(item)] = index
+        if isinstance(item, Text):
+            text = item.text.encode("utf-8")
+            file.write(_KIND.pack(_TEXT) + _TEXT_HEAD.pack(item.x, item.y, len(text)) + text)
+            continue
+        color = item.color
+        color_index = colors.get(color)
+        if color_index is None:
+            color_index = colors[color] = len(colors)
+            name = color.name.encode("utf-8")
+            file.write(_KIND.pack(_COLOR) + _COLOR_HEAD.pack(color_index, *color.rgb, len(name)) + name)
+        kind = _SHAPE_KINDS[type(item)]
+        file.write(_KIND.pack(kind) + _SHAPE.pack(color_index, item.x, item.y, item.width, item.height))
+        if kind == _TRIANGLE:
+            file.write(_DIRECTION.pack(item.dir8.ordinal8))
+    groups = {id(multishape): index for index, multishape in enumerate(multishapes)}
+    for multishape in multishapes:
+        name, done, bounds, parent, parts = _multishape_record(multishape, indexes, groups)
+        name = name.encode("utf-8")
+        parent = -1 if parent is None else parent
+        file.write(_KIND.pack(_MULTISHAPE) + _MULTISHAPE_HEAD.pack(len(name), done, *bounds, parent, len(parts))
+                   + name + struct.pack(f"<{len(parts)}I", *parts))
+    file.write(_KIND.pack(_END))
+    return len(items)
+
+
+def _save_jsonl(file) -> int:
+    items, multishapes = _scene_contents()
+    file.write(json.dumps({"format": _JSONL_FORMAT, "version": _VERSION}) + "\n")
+    indexes = {}
+    for index, item in enumerate(items):
+        indexes[id(item)] = index
+        if isinstance(item, Text):
+            record = {"type": "Text", "x": item.x, "y": item.y, "text": item.text}
+        else:
+            record = {"type": type(item).__name__, "x": item.x, "y": item.y,
+                      "width": item.width, "height": item.height,
+                      "color": item.color.name, "rgb": item.color.rgb}
+            if isinstance(item, Triangle):
+                record["dir8"] = item.dir8.short_name
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    groups = {id(multishape): index for index, multishape in enumerate(multishapes)}
+    for multishape in multishapes:
+        name, done, bounds, parent, parts = _multishape_record(multishape, indexes, groups)
+        file.write(json.dumps({"type": "Multishape", "name": name, "done": done, "bounds": bounds,
+                               "parent": parent, "parts": parts}, ensure_ascii=False) + "\n")
+    return len(items)
+
+
+def _read_binary(file):
+    """
+    Postupně čte záznamy binárního formátu.
+    :return: generátor záznamů ve stejném tvaru jako _read_jsonl
+    """
+    magic, version = _HEADER.unpack(_read_exactly(file, _HEADER.size))
+    if magic != _MAGIC or version != _VERSION:
+        raise Exception(f"Not a scene file or unsupported version: {magic!r}, {version}")
+    colors = {}
+    while True:
+        kind = _read_exactly(file, 1)[0]
+        if kind == _END:
+            return
+        if kind == _COLOR:
+            index, red, green, blue, length = _COLOR_HEAD.unpack(_read_exactly(file, _COLOR_HEAD.size))
+            name = _read_exactly(file, length).decode("utf-8")
+            colors[index] = _restore_color(name, (red, green, blue))
+        elif kind == _TEXT:
+            x, y, length = _TEXT_HEAD.unpack(_read_exactly(file, _TEXT_HEAD.size))
+            yield Text, (_number(x), _number(y), _read_exactly(file, length).decode("utf-8"))
+        elif kind == _MULTISHAPE:
+            length, done, x, y, width, height, parent, count = _MULTISHAPE_HEAD.unpack(
+                _read_exactly(file, _MULTISHAPE_HEAD.size))
+            name = _read_exactly(file, length).decode("utf-8")
+            parts = struct.unpack(f"<{count}I", _read_exactly(file, 4 * count))
+            parent = None if parent < 0 else parent
+            yield Multishape, (name, bool(done), tuple(map(_number, (x, y, width, height))), parent, parts)
+        elif kind in _SHAPE_CLASSES:
+            color_index, x, y, width, height = _SHAPE.unpack(_read_exactly(file, _SHAPE.size))
+            arguments = (_number(x), _number(y), _number(width), _number(height), colors[color_index])
+            if kind == _TRIANGLE:
+                arguments += (values9[_read_exactly(file, 1)[0]],)
+            yield _SHAPE_CLASSES[kind], arguments
+        else:
+            raise Exception(f"Unknown record in scene file: {kind}")
+
+
+def _read_jsonl(file):
+    """
+    Postupně čte záznamy formátu JSON Lines.
+    :return: generátor dvojic (třída, argumenty)
+    """
+    header = json.loads(file.readline() or "{}")
+    if header.get("format") != _JSONL_FORMAT or header.get("version") != _VERSION:
+        raise Exception(f"Not a scene file or unsupported version: {header}")
+    colors = {}
+    for line in file:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        kind = record["type"]
+        if kind == "Text":
+            yield Text, (record["x"], record["y"], record["text"])
+        elif kind == "Multishape":
+            yield Multishape, (record["name"], record["done"], tuple(record["bounds"]),
+                               record["parent"], record["parts"])
+        else:
+            key = (record["color"], tuple(record["rgb"]))
+            color = colors.get(key)
+            if color is None:
+                color = colors[key] = _restore_color(*key)
+            arguments = (record["x"], record["y"], record["width"], record["height"], color)
+            if kind == "Triangle":
+                arguments += (_DIRECTIONS[record["dir8"]],)
+            yield _CLASS_NAMES[kind], arguments
+
+
+def _load(records, batch_size: int) -> tuple:
+    """
+    Vytvoří tvary ze záznamů po dávkách, multishapy až na konci.
+    Po sobě jdoucí tvary stejné třídy se vytvoří najednou přes bulk.
+    Multishapy se dokončí až po sestavení celého stromu, do dokončeného
+    by už nešlo vložit vnořený multishape.
+    """
+    loaded = []
+    multishapes = []
+    finished = []
+    records = iter(records)
+    while True:
+        count = 0
+        run_class, run = None, []
+        with canvas.batch():
+            for cls, arguments in records:
+                if cls is not run_class and run:
+                    _create_run(loaded, run_class, run)
+                    run = []
+                if cls is Multishape:
+                    name, done, bounds, parent, parts = arguments
+                    multishape = _restore_multishape(loaded, multishapes, name, bounds, parent, parts)
+                    if done:
+                        finished.append(multishape)
+                    run_class = None
+                    continue
+                if cls is Text:
+                    loaded.append(Text(*arguments))
+                    run_class = None
+                else:
+                    run_class = cls
+                    run.append(arguments)
+                count += 1
+                if count == batch_size:
+                    break
+            if run:
+                _create_run(loaded, run_class, run)
+        if count < batch_size:
+            for multishape in finished:
+                multishape.creation_is_done()
+            return loaded, multishapes
+
+
+def _create_run(loaded: list, cls, run: list) -> None:
+    """
+    Vytvoří tvary jedné třídy najednou (jako Shape.bulk, ale bez
+    kolekce) a přidá je do loaded.
+    """
+    columns = list(zip(*run))
+    attributes = dict(zip(_EXTRA_ARGUMENTS.get(cls, ()), columns[5:]))
+    loaded.extend(cls._create_many(*columns[:5], attributes))
+
+
+def _restore_multishape(loaded: list, multishapes: list, name: str, bounds: tuple, parent, parts) -> Multishape:
+    """
+    Vytvoří multishape z jeho vlastních částí, vloží ho do rodiče
+    (ten je v multishapes vždy před ním) a přidá ho do multishapes.
+    """
+    multishape = Multishape(name)
+    # obvodový obdélník (bounds) se odvodí z částí, uložený je jen pro informaci
+    for index in parts:
+        multishape.add_shape(loaded[index])
+    if parent is not None:
+        multishapes[parent].add_child(multishape)
+    multishapes.append(multishape)
+    return multishape
+
+
+def _restore_color(name: str, rgb: tuple):
+    """
+    Vrátí uloženou barvu - podle názvu, pokud je známá, jinak ji
+    vytvoří ze složek.
+    """
+    try:
+        return getColor(name=name)
+    except KeyError:
+        pass
+    if name == _create_tkname(*rgb):
+        return getColor(*rgb)
+    try:
+        return getColor(*rgb, name=name)
+    except KeyError:
+        # stejné složky už má barva jiného názvu
+        return getColor(*rgb)
+
+
+def _number(value: float):
+    """
+    Celá čísla se uložila jako float, vrátí je zpět jako int.
+    """
+    return int(value) if value.is_integer() else value
+
+
+def _read_exactly(file, size: int) -> bytes:
+    data = file.read(size)
+    if len(data) != size:
+        raise Exception("Unexpected end of scene file")
+    return data
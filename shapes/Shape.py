@@ -1,7 +1,10 @@
-from abc import ABC
-from .Abstract_classes import Resizable, ID, Paintable, ICopyable, IRemovable
+import inspect
+import math
+from abc import ABC, abstractmethod
+from .Abstract_classes import Resizable, ID, Paintable, ICopyable, IRemovable, DIRTY_GEOMETRY, DIRTY_COLOR
 from .NamedColor import YELLOW
 from .CanvasShapes import canvas
+from .ShapeCollection import ShapeCollection
 
 
 class Shape(Resizable, ID, Paintable, ICopyable, IRemovable, ABC):
@@ -11,7 +14,11 @@ class Shape(Resizable, ID, Paintable, ICopyable, IRemovable, ABC):
     několikrát.
     Také jsou zde implementována abstraktní třída, aby
     nešlo vytvořit Shape instanci.
+    Atributy jsou ve __slots__, aby instance neměla vlastní __dict__
+    a na plátně se vešlo velké množství tvarů.
     """
+    __slots__ = ('_repr', 'canvas_id', '_is_painted_on_canvas', '_dirty', 'tk_calls',
+                 '_color', '_multishapes', '__weakref__')
 
     def __init__(self, x, y, width, height, color=YELLOW):
         """
@@ -24,18 +31,154 @@ class Shape(Resizable, ID, Paintable, ICopyable, IRemovable, ABC):
         :param height: výška obrazce
         :param color: barva obrazce, je třeba použít metody NamedColor
         """
+        self._dirty = 0
+        self.tk_calls = 0
         ID.__init__(self)
-        canvas.all_shapes.append(self)
         Resizable.__init__(self, x, y, width, height)
+        # multishapy, jejichž je tvar součástí, viz _count_corners,
+        # většina tvarů v žádném není, proto sdílená prázdná n-tice
+        self._multishapes = ()
 
         self.color = color
         Paintable.__init__(self)
 
+    @classmethod
+    def bulk(cls, xs, ys, widths, heights, colors=None, **attributes) -> ShapeCollection:
+        """
+        Vytvoří najednou mnoho tvarů z polí souřadnic, např. mřížku:
+        Rectangle.bulk(xs, ys, 10, 10, colors)
+        Tvary se nevytvářejí konstruktorem po jednom - id se přidělí
+        najednou, položky na plátně se vytvoří v jedné dávce, tvary se
+        zaregistrují najednou a plátno se překreslí jen jednou.
+        :param xs: vodorovné souřadnice
+        :param ys: svislé souřadnice
+        :param widths: šířky
+        :param heights: výšky
+        Každý z parametrů může být posloupnost (list, array.array,
+        pole NumPy) nebo jedno číslo společné všem tvarům.
+        :param colors: barva nebo posloupnost barev, základně jako
+        u konstruktoru třídy
+        :param attributes: další atributy tvarů, např. dir8 u Triangle,
+        jedna hodnota nebo posloupnost
+        :return: ShapeCollection s vytvořenými tvary
+        """
+        collection = ShapeCollection()
+        collection._add(cls._create_many(xs, ys, widths, heights, colors, attributes, (collection,)))
+        return collection
+
+    @classmethod
+    def _create_many(cls, xs, ys, widths, heights, colors, attributes: dict, groups: tuple = ()) -> list:
+        """
+        Vytvoří, vykreslí a zaregistruje tvary pro bulk, parametry
+        jsou stejné jako u bulk. Načtení scény tvary vytváří takto
+        přímo, bez kolekce.
+        :param groups: skupiny tvarů (_multishapes), u bulk jeho kolekce
+        :return: list vytvořených tvarů
+        """
+        count = next((len(values) for values in (xs, ys, widths, heights) if hasattr(values, "__len__")), None)
+        if count is None:
+            raise Exception("At least one of xs, ys, widths, heights has to be a sequence")
+        columns = [_as_list(values, count) for values in (xs, ys, widths, heights)]
+        parameters = inspect.signature(cls.__init__).parameters
+        if colors is None:
+            colors = parameters["color"].default
+        colors = _as_list(colors, count)
+        # další parametry konstruktoru (např. dir8) mají základní hodnotu
+        for name, parameter in parameters.items():
+            if name in _BULK_PARAMETERS or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+                continue
+            if parameter.default is parameter.empty and name not in attributes:
+                raise Exception(f"Missing value of {name} for {cls.__name__}.bulk")
+            attributes.setdefault(name, parameter.default)
+        attributes = {name: _as_list(values, count) for name, values in attributes.items()}
+
+        shapes = []
+        name = cls.__name__
+        first = ID._counter + 1
+        ID._counter += count
+        for index, (x, y, width, height, color) in enumerate(zip(*columns, colors)):
+            shape = cls.__new__(cls)
+            shape._dirty = 0
+            shape.tk_calls = 0
+            shape._repr = name + str(first + index)
+            shape.x = x
+            shape.y = y
+            shape.width = width
+            shape.height = height
+            shape._multishapes = groups
+            shape._color = color
+            shape._is_painted_on_canvas = False
+            for attribute, values in attributes.items():
+                setattr(shape, attribute, values[index])
+            shapes.append(shape)
+        cls._prepare_bulk(shapes)
+
+        with canvas.batch():
+            for shape in shapes:
+                shape.canvas_id = shape._create_item()
+                shape._is_painted_on_canvas = True
+                shape.tk_calls = 1
+            canvas.register_shapes(shapes)
+            canvas.update_shapes()
+        return shapes
+
+    @classmethod
+    def _prepare_bulk(cls, shapes: list) -> None:
+        """
+        Doplní tvary vytvořené v bulk před vytvořením jejich položek
+        na plátně, např. hromadně spočítané souřadnice.
+        """
+
+    @property
+    def color(self):
+        """
+        Barva obrazce, změna se projeví při dalším paint().
+        """
+        return self._color
+
+    @color.setter
+    def color(self, color) -> None:
+        self._color = color
+        self._dirty |= DIRTY_COLOR
+
+    def paint(self) -> None:
+        """
+        Metoda paint vytvoří tvar na plátně, pokud není vytvořen.
+        Pokud je, pošle na plátno jen ty vlastnosti, které se od
+        posledního vykreslení změnily.
+        """
+        if not self._is_painted_on_canvas:
+            self.canvas_id = self._create_item()
+            self._is_painted_on_canvas = True
+            self.tk_calls += 1
+            canvas.register_shape(self)
+        else:
+            if self._dirty & DIRTY_COLOR:
+                canvas.itemconfig(self.canvas_id, fill=self.color.tkn)
+                self.tk_calls += 1
+            if self._dirty & DIRTY_GEOMETRY:
+                canvas.coords(self.canvas_id, self.get_coord())
+                self.tk_calls += 1
+        self._dirty = 0
+        canvas.update_shapes()
+
+    @abstractmethod
+    def _create_item(self) -> int:
+        """
+        Vytvoří položku tvaru na plátně, implementují potomci.
+        :return: id položky na plátně
+        """
+
     def rub_out(self) -> None:
         """
         Dočasně přebarví tvar na barvu pozadí.
         """
-        canvas.itemconfig(self.__repr__(), fill=canvas.canvas_color.tkn)
+        if not self._is_painted_on_canvas:
+            return
+        canvas.itemconfig(self.canvas_id, fill=canvas.canvas_color.tkn)
+        self.tk_calls += 1
+        # na plátně je jiná barva než v atributu color
+        self._dirty |= DIRTY_COLOR
         canvas.update_shapes()
 
     def change_shape_color(self, color=None) -> None:
@@ -46,24 +189,108 @@ class Shape(Resizable, ID, Paintable, ICopyable, IRemovable, ABC):
         """
         if color is not None:
             self.color = color
-        canvas.itemconfig(self.__repr__(), fill=self.color.tkn)
+        if not self._is_painted_on_canvas:
+            # odstraněný tvar, jeho položku už může mít jiný tvar (pool)
+            return
+        canvas.itemconfig(self.canvas_id, fill=self.color.tkn)
+        self.tk_calls += 1
+        self._dirty &= ~DIRTY_COLOR
         canvas.update_shapes()
 
     def _count_corners(self) -> None:
         """
-        Přepočítá souřadnice
+        Poznamená změnu souřadnic (rohy se odvozují z polohy a velikosti)
+        a oznámí ji multishapům, jejichž je tvar součástí.
+        """
+        self._dirty |= DIRTY_GEOMETRY
+        for multishape in self._multishapes:
+            multishape._invalidate_geometry()
+        if self._is_painted_on_canvas:
+            canvas.spatial_index.mark_dirty(self)
+
+    def _moved(self, dx, dy) -> None:
+        """
+        Posun nemění tvar, takže místo přepočítání všech souřadnic
+        a překreslení stačí položku na plátně posunout.
+        """
+        self._count_corners()
+        if not self._is_painted_on_canvas:
+            self.paint()
+            return
+        canvas.move(self.canvas_id, dx, dy)
+        self.tk_calls += 1
+        self._dirty &= ~DIRTY_GEOMETRY
+        if self._dirty:
+            # např. barva po rub_out, pošle se zbytek změn
+            self.paint()
+        else:
+            canvas.update_shapes()
+
+    def _place(self, x, y) -> None:
+        """
+        Nastaví polohu bez zásahu do plátna. Používá Multishape,
+        který pak posune všechny své části najednou.
+        """
+        self.x = x
+        self.y = y
+        self._count_corners()
+        self._dirty &= ~DIRTY_GEOMETRY
+
+    def _get_tags(self) -> tuple:
+        """
+        Vrátí tagy položky na plátně - vlastní tag a skupinové
+        tagy multishapů, jejichž je tvar součástí, i jejich rodičů.
+        """
+        return (self._repr,) + tuple(tag for multishape in self._multishapes for tag in multishape._group_tags)
+
+    def _set_geometry(self, x, y, width, height) -> None:
+        """
+        Nastaví polohu i velikost najednou a tvar překreslí jen jednou.
+        Používá Multishape při hromadných transformacích.
         """
-        self.corner_1 = (self.x, self.y)
-        self.corner_2 = (self.x + self.width, self.y + self.height)
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self._count_corners()
+        self.paint()
 
     def get_coord(self) -> list:
         """
         Z 2 corners vytvoří list
         :return: vrací souřadnice v jedné proměnné
         """
-        coord = [item for sublist in [self.corner_1, self.corner_2]
-                 for item in sublist]
-        return coord
+        return [self.x, self.y, self.x + self.width, self.y + self.height]
+
+    def _get_bounds(self) -> tuple:
+        """
+        Vrátí obvodový obdélník jako (left, top, right, bottom).
+        """
+        x1, y1 = self.x, self.y
+        x2, y2 = x1 + self.width, y1 + self.height
+        return min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)
+
+    def contains_point(self, x, y) -> bool:
+        """
+        Zjistí, zda bod leží v obrazci. Základně se testuje obvodový
+        obdélník, potomci s jiným tvarem test zpřesňují.
+        """
+        left, top, right, bottom = self._get_bounds()
+        return left <= x <= right and top <= y <= bottom
+
+    def intersects_rect(self, left, top, right, bottom) -> bool:
+        """
+        Zjistí, zda obrazec zasahuje do obdélníku (left <= right, top <= bottom).
+        """
+        x1, y1, x2, y2 = self._get_bounds()
+        return x1 <= right and left <= x2 and y1 <= bottom and top <= y2
+
+    def distance_to(self, x, y) -> float:
+        """
+        Vrátí vzdálenost bodu od obrazce, uvnitř obrazce 0.
+        """
+        left, top, right, bottom = self._get_bounds()
+        return math.hypot(max(left - x, 0, x - right), max(top - y, 0, y - bottom))
 
     def to_string(self) -> str:
         """
@@ -77,20 +304,30 @@ class Shape(Resizable, ID, Paintable, ICopyable, IRemovable, ABC):
 
     def remove(self):
         """
-        Odstraní tvar z plátna.
+        Odstraní tvar z plátna. Tvar vytvořený metodou bulk přitom
+        vypadne ze své kolekce.
         """
+        if not self._is_painted_on_canvas:
+            return
         self._is_painted_on_canvas = False
-        canvas.delete(self.id)
+        canvas.delete(self.canvas_id)
+        self.tk_calls += 1
+        canvas.unregister_shape(self)
+        for group in self._multishapes:
+            if isinstance(group, ShapeCollection):
+                group._discard(self)
 
     def raise_above_shape(self, shape) -> None:
         """
         Zvedne obrazec nad jiný obrazec
         :param shape: pozice na kterou se má obrazec zvednout
         """
-        if isinstance(shape, Shape):
-            canvas.tag_raise(self.__repr__(), shape.__repr__())
-        else:
-            canvas.tag_raise(self.__repr__(), shape.get_highest_shape().__repr__())
+        target = shape if isinstance(shape, Shape) else shape.get_highest_shape()
+        if target is None or not (self._is_painted_on_canvas and target._is_painted_on_canvas):
+            # některý z tvarů (nebo žádná část multishapu) není na plátně
+            return
+        canvas.tag_raise(self.canvas_id, target.canvas_id)
+        self.tk_calls += 1
         canvas.update_shapes()
 
     def lower_below_shape(self, shape) -> None:
@@ -98,22 +335,50 @@ class Shape(Resizable, ID, Paintable, ICopyable, IRemovable, ABC):
         Snižuje obrazec pod jiný obrazec
         :param shape: pozice na kterou se má obrazec snížit
         """
-        if isinstance(shape, Shape):
-            canvas.tag_lower(self.__repr__(), shape.__repr__())
-        else:
-            canvas.tag_lower(self.__repr__(), shape.get_lowest_shape().__repr__())
+        target = shape if isinstance(shape, Shape) else shape.get_lowest_shape()
+        if target is None or not (self._is_painted_on_canvas and target._is_painted_on_canvas):
+            # některý z tvarů (nebo žádná část multishapu) není na plátně
+            return
+        canvas.tag_lower(self.canvas_id, target.canvas_id)
+        self.tk_calls += 1
         canvas.update_shapes()
 
     def raise_to_top(self) -> None:
         """
         Zvedne obrazec na vrchol
         """
-        canvas.tag_raise(self.__repr__())
+        if not self._is_painted_on_canvas:
+            return
+        canvas.tag_raise(self.canvas_id)
+        self.tk_calls += 1
         canvas.update_shapes()
 
     def lower_to_bottom(self) -> None:
         """
         Snižuje obrazec na dno
         """
-        canvas.tag_lower(self.__repr__())
+        if not self._is_painted_on_canvas:
+            return
+        canvas.tag_lower(self.canvas_id)
+        self.tk_calls += 1
         canvas.update_shapes()
+
+
+# parametry konstruktoru, které bulk nastavuje sám
+_BULK_PARAMETERS = ("self", "x", "y", "width", "height", "color")
+
+
+def _as_list(values, count: int) -> list:
+    """
+    Převede posloupnost (i array.array nebo pole NumPy) na list
+    o count prvcích, jednu hodnotu zopakuje.
+    """
+    if hasattr(values, "tolist"):
+        values = values.tolist()
+    elif isinstance(values, str) or not hasattr(values, "__len__"):
+        return [values] * count
+    else:
+        values = list(values)
+    if len(values) != count:
+        raise Exception(f"Expected {count} values, got {len(values)}")
+    return values
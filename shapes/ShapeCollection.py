@@ -0,0 +1,147 @@
+"""
+Zde najdete kolekci tvarů vytvořených najednou metodou Shape.bulk().
+Všechny tvary kolekce mají na plátně společný tag, takže je možné je
+posunout, přebarvit nebo přeskládat jedním příkazem.
+"""
+
+from .Abstract_classes import DIRTY_COLOR
+from .CanvasShapes import canvas
+
+
+class ShapeCollection:
+    """
+    Lehká kolekce tvarů se společným tagem na plátně.
+    Kolekce se tvarům zapíše mezi skupiny (_multishapes) stejně jako
+    Multishape, díky tomu mají její tag i položky vytvořené později
+    znovu metodou paint(). Tvar odstraněný samostatně (Shape.remove)
+    z kolekce vypadne, aby ho kolekce a přes ni ostatní tvary kolekce
+    nedržely v paměti.
+    """
+
+    _counter = 0
+    # počet příkazů, které kolekce sama poslala na plátno
+    tk_calls = 0
+
+    def __init__(self):
+        ShapeCollection._counter += 1
+        self._group_tag = "collection_" + str(ShapeCollection._counter)
+        self._group_tags = (self._group_tag,)
+        # tvary v pořadí vytvoření, dict kvůli odebrání tvaru v O(1)
+        self._shapes = {}
+        self._shapes_list = None
+
+    @property
+    def shapes(self) -> list:
+        """
+        Tvary kolekce v pořadí vytvoření.
+        """
+        if self._shapes_list is None:
+            self._shapes_list = list(self._shapes)
+        return self._shapes_list
+
+    def _add(self, shapes: list) -> None:
+        self._shapes.update(dict.fromkeys(shapes))
+        self._shapes_list = None
+
+    def _discard(self, shape) -> None:
+        """
+        Vyřadí z kolekce tvar odstraněný samostatně, viz Shape.remove.
+        """
+        del self._shapes[shape]
+        self._shapes_list = None
+        shape._multishapes = tuple(group for group in shape._multishapes if group is not self)
+
+    def __len__(self) -> int:
+        return len(self._shapes)
+
+    def __iter__(self):
+        return iter(self._shapes)
+
+    def __getitem__(self, index):
+        return self.shapes[index]
+
+    def __repr__(self) -> str:
+        return f"ShapeCollection {self._group_tag} with {len(self._shapes)} shapes"
+
+    def _painted(self) -> list:
+        return [shape for shape in self._shapes if shape._is_painted_on_canvas]
+
+    def move(self, dx, dy) -> None:
+        """
+        Posune všechny tvary kolekce o dx, dy jedním příkazem plátna.
+        """
+        for shape in self._shapes:
+            shape._place(shape.x + dx, shape.y + dy)
+        canvas.move(self._group_tag, dx, dy)
+        self.tk_calls += 1
+        canvas.update_shapes()
+
+    def set_color(self, colors) -> None:
+        """
+        Přebarví tvary kolekce. Jedna barva se nastaví všem tvarům
+        jedním příkazem, posloupnost barev (po jedné pro každý tvar)
+        se pošle v jedné dávce.
+        :param colors: barva nebo posloupnost barev
+        """
+        if hasattr(colors, "tkn"):
+            for shape in self._shapes:
+                shape._color = colors
+                shape._dirty &= ~DIRTY_COLOR
+            canvas.itemconfig(self._group_tag, fill=colors.tkn)
+            self.tk_calls += 1
+            canvas.update_shapes()
+            return
+        colors = list(colors)
+        if len(colors) != len(self._shapes):
+            raise Exception(f"Expected {len(self._shapes)} colors, got {len(colors)}")
+        with canvas.batch():
+            for shape, color in zip(self._shapes, colors):
+                if shape._is_painted_on_canvas:
+                    shape.change_shape_color(color)
+                else:
+                    shape.color = color
+
+    def raise_to_top(self) -> None:
+        """
+        Zvedne všechny tvary kolekce na vrchol, jejich vzájemné
+        pořadí se zachová.
+        """
+        canvas.tag_raise_group(self._group_tag, [shape.canvas_id for shape in self._painted()])
+        self.tk_calls += 1
+        canvas.update_shapes()
+
+    def lower_to_bottom(self) -> None:
+        """
+        Sníží všechny tvary kolekce na dno, jejich vzájemné
+        pořadí se zachová.
+        """
+        canvas.tag_lower_group(self._group_tag, [shape.canvas_id for shape in self._painted()])
+        self.tk_calls += 1
+        canvas.update_shapes()
+
+    def remove(self) -> None:
+        """
+        Odstraní všechny tvary kolekce z plátna jedním příkazem.
+        Na rozdíl od Shape.remove tvary zůstanou v kolekci a je možné
+        je znovu vykreslit.
+        """
+        painted = self._painted()
+        if not painted:
+            return
+        canvas.delete(*[shape.canvas_id for shape in painted])
+        self.tk_calls += 1
+        for shape in painted:
+            shape._is_painted_on_canvas = False
+        canvas.unregister_shapes(painted)
+        canvas.update_shapes()
+
+    # Kolekce se chová jako skupina tvarů, viz Shape._count_corners
+
+    def _invalidate_geometry(self) -> None:
+        pass
+
+    def _invalidate_order(self) -> None:
+        pass
+
+    def _invalidate_painted(self) -> None:
+        pass
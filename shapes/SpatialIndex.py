@@ -0,0 +1,227 @@
+"""
+Zde najdete prostorový index tvarů na plátně.
+Plátno je rozděleno na pravidelnou mřížku čtvercových buněk a každý
+tvar je zapsán ve všech buňkách, které zasahuje jeho obvodový
+obdélník. Dotaz na bod nebo obdélník pak prochází jen tvary z buněk,
+kterých se dotaz týká, a na ně použije přesný test tvaru
+(contains_point, intersects_rect, distance_to).
+"""
+
+import math
+
+# výchozí velikost buňky mřížky v pixelech
+DEFAULT_CELL_SIZE = 64
+# tvary, které by zabraly víc buněk, se ukládají zvlášť a testují vždy
+_MAX_CELLS_PER_SHAPE = 1024
+
+
+class SpatialIndex:
+    """
+    Mřížkový prostorový index tvarů.
+    Změny polohy a velikosti tvarů se pouze poznamenají (mark_dirty)
+    a do mřížky se promítnou až při dalším dotazu, takže posun
+    tvaru stojí jedno vložení do množiny.
+    """
+
+    def __init__(self, cell_size: int = DEFAULT_CELL_SIZE):
+        """
+        :param cell_size: velikost buňky mřížky v pixelech
+        """
+        self.cell_size = cell_size
+        self._cells = {}
+        self._cell_ranges = {}
+        self._oversized = set()
+        self._dirty = set()
+        # rozsah obsazených buněk (zmenšuje se až po vyprázdnění mřížky)
+        self._extent = None
+
+    def __len__(self) -> int:
+        return len(self._cell_ranges.keys() | self._dirty)
+
+    def add(self, shape) -> None:
+        """
+        Přidá tvar do indexu.
+        """
+        self._dirty.add(shape)
+
+    def mark_dirty(self, shape) -> None:
+        """
+        Poznamená změnu polohy nebo velikosti tvaru.
+        """
+        self._dirty.add(shape)
+
+    def discard(self, shape) -> None:
+        """
+        Odebere tvar z indexu.
+        """
+        self._dirty.discard(shape)
+        self._unlink(shape)
+
+    def _unlink(self, shape) -> None:
+        cell_range = self._cell_ranges.pop(shape, None)
+        if cell_range is None:
+            return
+        if cell_range is _OVERSIZED:
+            self._oversized.discard(shape)
+            return
+        cells = self._cells
+        for cell in _iter_cells(cell_range):
+            members = cells[cell]
+            members.discard(shape)
+            if not members:
+                del cells[cell]
+
+    def _flush(self) -> None:
+        """
+        Promítne poznamenané změny do mřížky.
+        """
+        if not self._dirty:
+            return
+        cells = self._cells
+        for shape in self._dirty:
+            cell_range = self._cell_range(*shape._get_bounds())
+            if self._cell_ranges.get(shape) == cell_range:
+                continue
+            self._unlink(shape)
+            self._cell_ranges[shape] = cell_range
+            if cell_range is _OVERSIZED:
+                self._oversized.add(shape)
+                continue
+            self._extend(cell_range)
+            for cell in _iter_cells(cell_range):
+                members = cells.get(cell)
+                if members is None:
+                    cells[cell] = {shape}
+                else:
+                    members.add(shape)
+        self._dirty.clear()
+
+    def _extend(self, cell_range) -> None:
+        if self._extent is None or not self._cells:
+            self._extent = cell_range
+            return
+        x1, y1, x2, y2 = self._extent
+        self._extent = (min(x1, cell_range[0]), min(y1, cell_range[1]),
+                        max(x2, cell_range[2]), max(y2, cell_range[3]))
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        cell_range = (math.floor(left / size), math.floor(top / size),
+                      math.floor(right / size), math.floor(bottom / size))
+        if (cell_range[2] - cell_range[0] + 1) * (cell_range[3] - cell_range[1] + 1) > _MAX_CELLS_PER_SHAPE:
+            return _OVERSIZED
+        return cell_range
+
+    def _candidates(self, left, top, right, bottom) -> set:
+        """
+        Vrátí tvary z buněk, které zasahuje zadaný obdélník.
+        """
+        self._flush()
+        cells = self._cells
+        size = self.cell_size
+        found = set(self._oversized)
+        x1, y1 = math.floor(left / size), math.floor(top / size)
+        x2, y2 = math.floor(right / size), math.floor(bottom / size)
+        if (x2 - x1 + 1) * (y2 - y1 + 1) > len(cells):
+            # dotaz je větší než obsazená část mřížky
+            for (cx, cy), members in cells.items():
+                if x1 <= cx <= x2 and y1 <= cy <= y2:
+                    found |= members
+            return found
+        for cell in _iter_cells((x1, y1, x2, y2)):
+            members = cells.get(cell)
+            if members:
+                found |= members
+        return found
+
+    def shapes_at(self, x, y) -> list:
+        """
+        Vrátí tvary, které obsahují bod x, y.
+        :return: list tvarů (v libovolném pořadí)
+        """
+        return [shape for shape in self._candidates(x, y, x, y) if shape.contains_point(x, y)]
+
+    def shapes_in_rect(self, x1, y1, x2, y2) -> list:
+        """
+        Vrátí tvary, které zasahují do obdélníku zadaného dvěma rohy.
+        :return: list tvarů (v libovolném pořadí)
+        """
+        left, right = min(x1, x2), max(x1, x2)
+        top, bottom = min(y1, y2), max(y1, y2)
+        return [shape for shape in self._candidates(left, top, right, bottom)
+                if shape.intersects_rect(left, top, right, bottom)]
+
+    def nearest(self, x, y, max_distance: float = math.inf):
+        """
+        Najde tvar nejbližší bodu x, y. Prohledává buňky v rostoucích
+        soustředných čtvercích kolem bodu, dokud nemůže existovat bližší tvar.
+        :param max_distance: tvary vzdálenější než tato vzdálenost se ignorují
+        :return: dvojice (tvar, vzdálenost), nebo (None, inf)
+        """
+        self._flush()
+        best_shape, best_distance = None, math.inf
+        checked = set()
+
+        def check(candidates) -> None:
+            nonlocal best_shape, best_distance
+            for shape in candidates:
+                if shape in checked:
+                    continue
+                checked.add(shape)
+                # vzdálenost od obvodového obdélníku je dolní odhad
+                left, top, right, bottom = shape._get_bounds()
+                if math.hypot(max(left - x, 0, x - right), max(top - y, 0, y - bottom)) >= best_distance:
+                    continue
+                distance = shape.distance_to(x, y)
+                if distance < best_distance and distance <= max_distance:
+                    best_shape, best_distance = shape, distance
+
+        check(self._oversized)
+        if self._cells:
+            size = self.cell_size
+            cx, cy = math.floor(x / size), math.floor(y / size)
+            x1, y1, x2, y2 = self._extent
+            max_ring = max(abs(cx - x1), abs(cx - x2), abs(cy - y1), abs(cy - y2))
+            for ring in range(max_ring + 1):
+                # buňky tohoto a dalších kruhů jsou od bodu alespoň (ring - 1) * size
+                if min(best_distance, max_distance) <= (ring - 1) * size:
+                    break
+                for cell in _iter_ring(cx, cy, ring):
+                    members = self._cells.get(cell)
+                    if members:
+                        check(members)
+        return best_shape, best_distance
+
+
+class _Oversized:
+    """
+    Značka pro tvary, které se do mřížky neukládají.
+    """
+
+    def __repr__(self) -> str:
+        return "OVERSIZED"
+
+
+_OVERSIZED = _Oversized()
+
+
+def _iter_cells(cell_range):
+    x1, y1, x2, y2 = cell_range
+    for cx in range(x1, x2 + 1):
+        for cy in range(y1, y2 + 1):
+            yield cx, cy
+
+
+def _iter_ring(cx, cy, ring):
+    """
+    Projde buňky ve vzdálenosti přesně ring buněk (čtvercový kruh).
+    """
+    if ring == 0:
+        yield cx, cy
+        return
+    for dx in range(-ring, ring + 1):
+        yield cx + dx, cy - ring
+        yield cx + dx, cy + ring
+    for dy in range(-ring + 1, ring):
+        yield cx - ring, cy + dy
+        yield cx + ring, cy + dy
@@ -1,4 +1,4 @@
-from .Abstract_classes import Movable, ICopyable, IRemovable, ID, Paintable
+from .Abstract_classes import Movable, ICopyable, IRemovable, ID, Paintable, DIRTY_TEXT
 from .CanvasShapes import canvas
 
 
@@ -11,6 +11,8 @@ class Text(Movable, ID, Paintable, ICopyable, IRemovable):
         okopírovat
         odstranit z plátna
     """
+    __slots__ = ('_repr', 'canvas_id', '_is_painted_on_canvas', '_dirty', 'tk_calls',
+                 '_text', '__weakref__')
 
     def __init__(self, x=0, y=0, text="text"):
         """
@@ -19,25 +21,53 @@ class Text(Movable, ID, Paintable, ICopyable, IRemovable):
         :param y: y souřadnice, základně 0
         :param text: text který bude vypsán, základně "text"
         """
+        self._dirty = 0
+        self.tk_calls = 0
         ID.__init__(self)
         Movable.__init__(self, x, y)
         self.text = text
         Paintable.__init__(self)
         self.paint()
 
+    @property
+    def text(self) -> str:
+        """
+        Zobrazený text, změna se projeví při dalším paint().
+        """
+        return self._text
+
+    @text.setter
+    def text(self, text: str) -> None:
+        self._text = text
+        self._dirty |= DIRTY_TEXT
+
     def paint(self) -> None:
         """
         Metoda paint vytvoří tvar na plátně, pokud není vytvořen.
-        Pokud je pouze aktualizuje stav tvaru na plátně podle
-        atributů třídy.
+        Pokud je, pošle na plátno změněný text. Poloha se
+        aktualizuje už při posunu, viz _moved.
         """
         if not self._is_painted_on_canvas:
-            self.canvas_id = canvas.create_text(self.x, self.y, text=self.text, tag=self.__repr__())
+            self.canvas_id = canvas.create_text(self.x, self.y, text=self.text, tag=self._repr)
             self._is_painted_on_canvas = True
-        else:
-            canvas.itemconfig(self.__repr__())
-            canvas.coords(self.__repr__(), self.x, self.y)
+            self.tk_calls += 1
+            canvas.register_shape(self)
+        elif self._dirty & DIRTY_TEXT:
+            canvas.itemconfig(self.canvas_id, text=self.text)
+            self.tk_calls += 1
             canvas.update_shapes()
+        self._dirty = 0
+
+    def _moved(self, dx, dy) -> None:
+        """
+        Text se při posunu nemění, stačí ho na plátně posunout.
+        """
+        if not self._is_painted_on_canvas:
+            self.paint()
+            return
+        canvas.move(self.canvas_id, dx, dy)
+        self.tk_calls += 1
+        canvas.update_shapes()
 
     def copy(self):
         """
@@ -59,5 +89,9 @@ class Text(Movable, ID, Paintable, ICopyable, IRemovable):
         Odstraní text z plátna. Nezničí ale objekt, takže je ho
         možné znovu zobrazit na plátně pomocí metody paint.
         """
+        if not self._is_painted_on_canvas:
+            return
         self._is_painted_on_canvas = False
-        canvas.delete(self.id)
+        canvas.delete(self.canvas_id)
+        self.tk_calls += 1
+        canvas.unregister_shape(self)
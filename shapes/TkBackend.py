@@ -0,0 +1,27 @@
+import time
+import tkinter
+
+
+class TkBackend(tkinter.Canvas):
+    """
+    Backend kreslící do okna tkinter.
+    Modul se importuje až při prvním kreslení, viz Backends.
+    """
+
+    def __init__(self):
+        tkinter.Canvas.__init__(self)
+        self.master.title("Plátno")
+        # self.master.geometry(f"{pos_x}+{pos_y}")
+
+    def show(self) -> None:
+        """
+        Aktivuje správce geometrie a přenese okno do popředí.
+        """
+        self.pack()
+        self.master.attributes("-topmost", True)
+
+    def clock(self) -> float:
+        """
+        Monotónní čas v milisekundách.
+        """
+        return time.perf_counter() * 1000
@@ -1,8 +1,12 @@
+import math
+
 import shapes.Direction8 as directions
 
 from .Shape import Shape
+from .Abstract_classes import DIRTY_GEOMETRY
 from .NamedColor import *
 from .CanvasShapes import canvas, canvas_step
+from .OptionalNumpy import get_numpy
 
 
 class Triangle(Shape):
@@ -18,6 +22,7 @@ class Triangle(Shape):
     Směr trojúhelníku je směr
     do kterého je natočen hlavní vrchol trojúhelníku.
     """
+    __slots__ = ('dir8', '_coord_key', '_coord')
 
     def __init__(self, x=0, y=0, width=2 * canvas_step,
                  height=canvas_step, color=YELLOW, dir8=directions.NORTH):
@@ -39,98 +44,202 @@ class Triangle(Shape):
         základně NORTH
         """
         self.dir8 = dir8
+        # poslední vrcholy z _get_vertices a geometrie, pro kterou platí
+        self._coord_key = None
+        self._coord = None
         super().__init__(x, y, width, height, color)
 
-    def paint(self) -> None:
+    @classmethod
+    def _prepare_bulk(cls, shapes: list) -> None:
         """
-        Metoda paint vytvoří tvar na plátně, pokud není vytvořen.
-        Pokud je pouze aktualizuje stav tvaru na plátně podle
-        atributů třídy.
+        Spočítá vrcholy všech trojúhelníků z Shape.bulk najednou,
+        vytvoření položek na plátně je pak vezme z paměti _get_vertices.
         """
-        if not self._is_painted_on_canvas:
-            self.canvas_id = canvas.create_polygon(self.get_coord(), tag=self.__repr__(),
-                                  fill=self.color.tkn, width=0)
-            self._is_painted_on_canvas = True
-            canvas.update_shapes()
-        else:
-            canvas.itemconfig(self.__repr__(), fill=self.color.tkn)
-            canvas.coords(self.__repr__(), self.get_coord())
-            canvas.update_shapes()
+        coords = triangle_coords([shape.x for shape in shapes], [shape.y for shape in shapes],
+                                 [shape.width for shape in shapes], [shape.height for shape in shapes],
+                                 [shape.dir8 for shape in shapes], use_numpy=False)
+        for shape, coord in zip(shapes, coords):
+            shape._coord = coord
+            shape._coord_key = (shape.x, shape.y, shape.width, shape.height, shape.dir8)
+
+    def _create_item(self) -> int:
+        """
+        Vytvoří trojúhelník na plátně podle atributů třídy.
+        Aktualizaci již vytvořeného tvaru řeší Shape.paint.
+        """
+        return canvas.create_polygon(self._get_vertices(), tag=self._get_tags(),
+                                     fill=self.color.tkn, width=0)
 
     def get_coord(self) -> list:
         """
         Přepočítá body tak aby jsme dostaly výstup, který můžeme
-        použít na plátně.
-        """
-        coord = [int, int, int, int, int, int]
-        match self.dir8:
-            case directions.NORTH:
-                coord[0] = (self.corner_1[0] + self.corner_2[0]) / 2
-                coord[1] = self.corner_1[1]
-                coord[2] = self.corner_2[0]
-                coord[3] = self.corner_2[1]
-                coord[4] = self.corner_1[0]
-                coord[5] = self.corner_2[1]
-            case directions.NORTH_EAST:
-                coord[0] = self.corner_2[0]
-                coord[1] = self.corner_1[1]
-                coord[2] = self.corner_2[0]
-                coord[3] = self.corner_2[1]
-                coord[4] = self.corner_1[0]
-                coord[5] = self.corner_1[1]
-            case directions.EAST:
-                coord[0] = self.corner_1[0]
-                coord[1] = self.corner_1[1]
-                coord[2] = self.corner_2[0]
-                coord[3] = (self.corner_1[1] + self.corner_2[1]) / 2
-                coord[4] = self.corner_1[0]
-                coord[5] = self.corner_2[1]
-            case directions.SOUTH_EAST:
-                coord[0] = self.corner_2[0]
-                coord[1] = self.corner_1[1]
-                coord[2] = self.corner_2[0]
-                coord[3] = self.corner_2[1]
-                coord[4] = self.corner_1[0]
-                coord[5] = self.corner_2[1]
-            case directions.SOUTH:
-                coord[0] = self.corner_1[0]
-                coord[1] = self.corner_1[1]
-                coord[2] = self.corner_2[0]
-                coord[3] = self.corner_1[1]
-                coord[4] = (self.corner_1[0] + self.corner_2[0]) / 2
-                coord[5] = self.corner_2[1]
-            case directions.SOUTH_WEST:
-                coord[0] = self.corner_1[0]
-                coord[1] = self.corner_1[1]
-                coord[2] = self.corner_2[0]
-                coord[3] = self.corner_2[1]
-                coord[4] = self.corner_1[0]
-                coord[5] = self.corner_2[1]
-            case directions.WEST:
-                coord[0] = self.corner_2[0]
-                coord[1] = self.corner_1[1]
-                coord[2] = self.corner_2[0]
-                coord[3] = self.corner_2[1]
-                coord[4] = self.corner_1[0]
-                coord[5] = (self.corner_1[1] + self.corner_2[1]) / 2
-            case directions.NORTH_WEST:
-                coord[0] = self.corner_1[0]
-                coord[1] = self.corner_1[1]
-                coord[2] = self.corner_2[0]
-                coord[3] = self.corner_1[1]
-                coord[4] = self.corner_1[0]
-                coord[5] = self.corner_2[1]
+        použít na plátně. Vrací list jako ostatní tvary, je to kopie
+        zapamatovaných vrcholů, viz _get_vertices.
+        """
+        return list(self._get_vertices())
+
+    def _get_vertices(self) -> tuple:
+        """
+        Vrátí vrcholy jako n-tici. Vrcholy se berou ze šablony směru,
+        poslední výsledek se pamatuje, dokud se nezmění poloha, velikost
+        ani směr.
+        """
+        key = (self.x, self.y, self.width, self.height, self.dir8)
+        if key == self._coord_key:
+            return self._coord
+        # stejně jako _apply_template, bez volání funkce
+        x, y, width, height, dir8 = key
+        template = _TEMPLATES.get(dir8) or _get_template(dir8)
+        right, bottom = x + width, y + height
+        xs = (x, (x + right) / 2, right)
+        ys = (y, (y + bottom) / 2, bottom)
+        self._coord = coord = (xs[template[0]], ys[template[1]], xs[template[2]],
+                               ys[template[3]], xs[template[4]], ys[template[5]])
+        self._coord_key = key
         return coord
 
+    def contains_point(self, x, y) -> bool:
+        """
+        Zjistí, zda bod leží uvnitř trojúhelníku (včetně hran).
+        """
+        x1, y1, x2, y2, x3, y3 = self._get_vertices()
+        d1 = (x - x2) * (y1 - y2) - (x1 - x2) * (y - y2)
+        d2 = (x - x3) * (y2 - y3) - (x2 - x3) * (y - y3)
+        d3 = (x - x1) * (y3 - y1) - (x3 - x1) * (y - y1)
+        has_negative = d1 < 0 or d2 < 0 or d3 < 0
+        has_positive = d1 > 0 or d2 > 0 or d3 > 0
+        return not (has_negative and has_positive)
+
+    def intersects_rect(self, left, top, right, bottom) -> bool:
+        """
+        Zjistí, zda trojúhelník zasahuje do obdélníku - některý vrchol
+        leží v obdélníku, některý roh obdélníku v trojúhelníku, nebo
+        se protínají hrany.
+        """
+        if not super().intersects_rect(left, top, right, bottom):
+            return False
+        coord = self._get_vertices()
+        vertices = list(zip(coord[0::2], coord[1::2]))
+        if any(left <= x <= right and top <= y <= bottom for x, y in vertices):
+            return True
+        corners = [(left, top), (right, top), (right, bottom), (left, bottom)]
+        if any(self.contains_point(x, y) for x, y in corners):
+            return True
+        return any(_segments_intersect(vertices[i], vertices[(i + 1) % 3], corners[j], corners[(j + 1) % 4])
+                   for i in range(3) for j in range(4))
+
+    def distance_to(self, x, y) -> float:
+        """
+        Vrátí vzdálenost bodu od trojúhelníku, uvnitř trojúhelníku 0.
+        """
+        if self.contains_point(x, y):
+            return 0.0
+        coord = self._get_vertices()
+        vertices = list(zip(coord[0::2], coord[1::2]))
+        return min(_distance_to_segment(x, y, vertices[i], vertices[(i + 1) % 3]) for i in range(3))
+
     def set_direction(self, direction):
         """
         Tato metoda změní směr trojúhelníku.
         :param direction: směr
         """
         self.dir8 = direction
-        self.get_coord()
+        self._dirty |= DIRTY_GEOMETRY
         self.paint()
 
     def copy(self) -> Shape:
         return Triangle(self.x, self.y, self.width,
                         self.height, self.color, self.dir8)
+
+
+# vrcholy pro každý směr jako indexy do (levý okraj, střed, pravý okraj)
+# pro x a (horní okraj, střed, dolní okraj) pro y, tj. normované
+# souřadnice 0, 1/2 a 1 v obvodovém obdélníku
+_TEMPLATES = {
+    directions.NORTH: (1, 0, 2, 2, 0, 2),
+    directions.NORTH_EAST: (2, 0, 2, 2, 0, 0),
+    directions.EAST: (0, 0, 2, 1, 0, 2),
+    directions.SOUTH_EAST: (2, 0, 2, 2, 0, 2),
+    directions.SOUTH: (0, 0, 2, 0, 1, 2),
+    directions.SOUTH_WEST: (0, 0, 2, 2, 0, 2),
+    directions.WEST: (2, 0, 2, 2, 0, 1),
+    directions.NORTH_WEST: (0, 0, 2, 0, 0, 2),
+}
+
+
+def _get_template(dir8) -> tuple:
+    template = _TEMPLATES.get(dir8)
+    if template is None:
+        raise Exception(f"Triangle cannot point to direction {getattr(dir8, 'long_name', dir8)}")
+    return template
+
+
+def _apply_template(x, y, width, height, dir8) -> tuple:
+    """
+    Vrátí vrcholy trojúhelníku v obdélníku x, y, width, height
+    natočeného do směru dir8.
+    """
+    x1, y1, x2, y2, x3, y3 = _get_template(dir8)
+    right, bottom = x + width, y + height
+    xs = (x, (x + right) / 2, right)
+    ys = (y, (y + bottom) / 2, bottom)
+    return xs[x1], ys[y1], xs[x2], ys[y2], xs[x3], ys[y3]
+
+
+def triangle_coords(xs, ys, widths, heights, dir8s, use_numpy: bool = None) -> list:
+    """
+    Spočítá vrcholy mnoha trojúhelníků najednou, výsledek je stejný
+    jako get_coord každého z nich.
+    :param xs: vodorovné souřadnice
+    :param ys: svislé souřadnice
+    :param widths: šířky
+    :param heights: výšky
+    :param dir8s: směry, posloupnost nebo jeden společný směr
+    :param use_numpy: použít NumPy, základně pokud je nainstalován;
+    NumPy vrací všechny souřadnice jako float
+    :return: list n-tic (x1, y1, x2, y2, x3, y3)
+    """
+    if isinstance(dir8s, directions._Dir8):
+        dir8s = [dir8s] * len(xs)
+    numpy = get_numpy() if use_numpy is None or use_numpy else None
+    if use_numpy and numpy is None:
+        raise Exception("NumPy is not installed")
+    if numpy is None:
+        return [_apply_template(*geometry) for geometry in zip(xs, ys, widths, heights, dir8s)]
+    # normované souřadnice vrcholů, řádek pro každý trojúhelník
+    templates = numpy.array([_get_template(dir8) for dir8 in dir8s], dtype=numpy.float64).reshape(-1, 6) / 2
+    coords = numpy.empty_like(templates)
+    left = numpy.asarray(xs, dtype=numpy.float64)[:, None]
+    top = numpy.asarray(ys, dtype=numpy.float64)[:, None]
+    coords[:, 0::2] = left + templates[:, 0::2] * numpy.asarray(widths, dtype=numpy.float64)[:, None]
+    coords[:, 1::2] = top + templates[:, 1::2] * numpy.asarray(heights, dtype=numpy.float64)[:, None]
+    return [tuple(coord) for coord in coords.tolist()]
+
+
+def _orientation(a, b, c) -> float:
+    return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+
+def _segments_intersect(a, b, c, d) -> bool:
+    """
+    Zjistí, zda se protínají úsečky ab a cd (včetně dotyku).
+    """
+    o1, o2 = _orientation(a, b, c), _orientation(a, b, d)
+    o3, o4 = _orientation(c, d, a), _orientation(c, d, b)
+    if ((o1 > 0 and o2 < 0) or (o1 < 0 and o2 > 0)) and ((o3 > 0 and o4 < 0) or (o3 < 0 and o4 > 0)):
+        return True
+
+    def on_segment(p, q, r) -> bool:
+        return min(p[0], q[0]) <= r[0] <= max(p[0], q[0]) and min(p[1], q[1]) <= r[1] <= max(p[1], q[1])
+    return ((o1 == 0 and on_segment(a, b, c)) or (o2 == 0 and on_segment(a, b, d))
+            or (o3 == 0 and on_segment(c, d, a)) or (o4 == 0 and on_segment(c, d, b)))
+
+
+def _distance_to_segment(x, y, a, b) -> float:
+    """
+    Vrátí vzdálenost bodu x, y od úsečky ab.
+    """
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    length = dx * dx + dy * dy
+    t = 0 if length == 0 else max(0, min(1, ((x - a[0]) * dx + (y - a[1]) * dy) / length))
+    return math.hypot(a[0] + t * dx - x, a[1] + t * dy - y)
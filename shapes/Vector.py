@@ -0,0 +1,271 @@
+"""
+Zde najdete export plátna do vektorových formátů SVG a PostScript bez
+tkinter (Canvas.postscript potřebuje otevřené okno).
+Tvary a texty se zapisují v pořadí odspodu nahoru postupně, po dávkách
+řádků, takže se celý dokument nikdy nesestavuje v paměti. Části
+multishapu, které jdou na plátně po sobě, se v SVG zapíší do jednoho
+elementu <g>, v PostScriptu je označí komentář.
+"""
+
+from xml.sax.saxutils import escape, quoteattr
+
+from .CanvasShapes import canvas
+from .Ellipse import Ellipse
+from .Multishape import Multishape
+from .Text import Text
+from .Triangle import Triangle
+
+# počet řádků zapsaných do souboru najednou
+_CHUNK_SIZE = 4096
+# velikost písma textů, přibližně jako základní písmo Tk
+FONT_SIZE = 12
+
+
+def export_svg(target, width: int = None, height: int = None) -> int:
+    """
+    Zapíše tvary a texty na plátně jako SVG.
+    shapes.export_svg("platno.svg")
+    :param target: cesta k souboru nebo otevřený textový soubor
+    :param width: šířka obrázku, základně šířka plátna
+    :param height: výška obrázku, základně výška plátna
+    :return: počet zapsaných tvarů a textů
+    """
+    return _export(target, _SvgWriter, width, height)
+
+
+def export_postscript(target, width: int = None, height: int = None) -> int:
+    """
+    Zapíše tvary a texty na plátně jako PostScript (jedna stránka
+    velikosti plátna).
+    shapes.export_postscript("platno.ps")
+    :param target: cesta k souboru nebo otevřený textový soubor
+    :param width: šířka stránky, základně šířka plátna
+    :param height: výška stránky, základně výška plátna
+    :return: počet zapsaných tvarů a textů
+    """
+    return _export(target, _PostScriptWriter, width, height)
+
+
+def _export(target, writer_class, width: int | None, height: int | None) -> int:
+    # rozměry jako u okna plátna, viz CanvasShapes._update_canvas_config
+    width = canvas.canvas_height if width is None else width
+    height = canvas.canvas_width if height is None else height
+    if isinstance(target, str):
+        with open(target, "w", encoding="utf-8") as file:
+            return _write(file, writer_class(width, height))
+    return _write(target, writer_class(width, height))
+
+
+def _write(file, writer) -> int:
+    lines = [writer.header(canvas.canvas_color)]
+    # zápis podle třídy, isinstance na abstraktních třídách je pomalé
+    writers = {}
+    source = groups = ()
+    count = 0
+    for item_id in canvas.z_order.in_order(canvas._shapes):
+        item = canvas.find_shape(item_id)
+        kind = type(item)
+        write = writers.get(kind)
+        if write is None:
+            write = writers[kind] = writer.writer_for(item)
+        item_source = getattr(item, "_multishapes", ())
+        if item_source != source:
+            source = item_source
+            current = tuple(node for group in source if isinstance(group, Multishape)
+                            for node in group._get_path())
+        else:
+            current = groups
+        if current != groups:
+            # společný začátek zůstane otevřený, zbytek se uzavře
+            common = 0
+            while common < min(len(groups), len(current)) and groups[common] is current[common]:
+                common += 1
+            lines.extend(writer.end_group(group) for group in reversed(groups[common:]))
+            lines.extend(writer.begin_group(group) for group in current[common:])
+            groups = current
+        line = write(item)
+        if line:
+            lines.append(line)
+            count += 1
+        if len(lines) >= _CHUNK_SIZE:
+            file.write("".join(lines))
+            lines.clear()
+    lines.extend(writer.end_group(group) for group in reversed(groups))
+    lines.append(writer.footer())
+    file.write("".join(lines))
+    return count
+
+
+class _SvgWriter:
+    """
+    Vytváří řádky dokumentu SVG.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        # skupiny, které už byly otevřeny, viz begin_group
+        self._opened = set()
+
+    def header(self, background) -> str:
+        return (f'<?xml version="1.0" encoding="UTF-8"?>\n'
+                f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+                f'viewBox="0 0 {self.width} {self.height}">\n'
+                f'<rect width="100%" height="100%" fill="{background.tkn}"/>\n')
+
+    def footer(self) -> str:
+        return "</svg>\n"
+
+    def begin_group(self, multishape: Multishape) -> str:
+        """
+        Otevře skupinu multishapu. Pokud mezi částmi leží jiný tvar,
+        skupina se otevře znovu; id smí mít jen první, všechny části
+        spojuje atribut data-group.
+        """
+        tag = multishape._group_tag
+        if tag in self._opened:
+            return f'<g data-group="{tag}" data-name={quoteattr(multishape._name)}>\n'
+        self._opened.add(tag)
+        return f'<g id="{tag}" data-group="{tag}" data-name={quoteattr(multishape._name)}>\n'
+
+    def end_group(self, multishape: Multishape) -> str:
+        return "</g>\n"
+
+    def writer_for(self, item):
+        """
+        Vrátí metodu, která zapíše tvar nebo text dané třídy.
+        """
+        if isinstance(item, Text):
+            return self.text
+        if isinstance(item, Triangle):
+            return self.triangle
+        if isinstance(item, Ellipse):
+            return self.ellipse
+        return self.rectangle
+
+    def text(self, item: Text) -> str:
+        return (f'<text x="{_number(item.x)}" y="{_number(item.y)}" font-size="{FONT_SIZE}" '
+                f'text-anchor="middle" dominant-baseline="central">{escape(str(item.text))}</text>\n')
+
+    def triangle(self, item: Triangle) -> str:
+        coord = item.get_coord()
+        points = " ".join(f"{_number(coord[i])},{_number(coord[i + 1])}" for i in range(0, len(coord), 2))
+        return f'<polygon points="{points}" fill="{item._color.tkn}"/>\n'
+
+    def ellipse(self, item: Ellipse) -> str:
+        left, top, right, bottom = item._get_bounds()
+        if right <= left or bottom <= top:
+            return ""
+        return (f'<ellipse cx="{_number((left + right) / 2)}" cy="{_number((top + bottom) / 2)}" '
+                f'rx="{_number((right - left) / 2)}" ry="{_number((bottom - top) / 2)}" '
+                f'fill="{item._color.tkn}"/>\n')
+
+    def rectangle(self, item) -> str:
+        left, top, right, bottom = item._get_bounds()
+        if right <= left or bottom <= top:
+            return ""
+        return (f'<rect x="{_number(left)}" y="{_number(top)}" width="{_number(right - left)}" '
+                f'height="{_number(bottom - top)}" fill="{item._color.tkn}"/>\n')
+
+
+class _PostScriptWriter:
+    """
+    Vytváří řádky dokumentu PostScript. Souřadnice se otočí tak, aby
+    odpovídaly plátnu (počátek vlevo nahoře), barva se nastaví jen
+    při změně.
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self._colors = {}
+        self._current = None
+
+    def header(self, background) -> str:
+        return (f"%!PS-Adobe-3.0\n"
+                f"%%BoundingBox: 0 0 {self.width} {self.height}\n"
+                f"%%Pages: 1\n"
+                f"%%EndComments\n"
+                f"/C {{ setrgbcolor }} bind def\n"
+                f"/R {{ rectfill }} bind def\n"
+                f"/E {{ gsave translate scale newpath 0 0 1 0 360 arc fill grestore }} bind def\n"
+                f"/T {{ moveto lineto lineto closepath fill }} bind def\n"
+                f"/S {{ gsave moveto 1 -1 scale dup stringwidth pop 2 div neg {-FONT_SIZE / 3:.1f} rmoveto "
+                f"show grestore }} bind def\n"
+                f"/Helvetica findfont {FONT_SIZE} scalefont setfont\n"
+                f"%%Page: 1 1\n"
+                f"0 {self.height} translate 1 -1 scale\n"
+                f"{self._color(background)}0 0 {self.width} {self.height} R\n")
+
+    def footer(self) -> str:
+        return "showpage\n%%EOF\n"
+
+    def begin_group(self, multishape: Multishape) -> str:
+        return f"% begin {multishape._group_tag} {_comment(multishape._name)}\n"
+
+    def end_group(self, multishape: Multishape) -> str:
+        return f"% end {multishape._group_tag}\n"
+
+    def writer_for(self, item):
+        """
+        Vrátí metodu, která zapíše tvar nebo text dané třídy.
+        """
+        if isinstance(item, Text):
+            return self.text
+        if isinstance(item, Triangle):
+            return self.triangle
+        if isinstance(item, Ellipse):
+            return self.ellipse
+        return self.rectangle
+
+    def text(self, item: Text) -> str:
+        text = str(item.text).encode("latin-1", "replace").decode("latin-1")
+        text = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        return f"{self._color(None)}({text}) {_number(item.x)} {_number(item.y)} S\n"
+
+    def triangle(self, item: Triangle) -> str:
+        coord = item.get_coord()
+        points = " ".join(f"{_number(coord[i])} {_number(coord[i + 1])}" for i in range(0, len(coord), 2))
+        return f"{self._color(item._color)}{points} T\n"
+
+    def ellipse(self, item: Ellipse) -> str:
+        left, top, right, bottom = item._get_bounds()
+        if right <= left or bottom <= top:
+            return ""
+        return (f"{self._color(item._color)}{_number((right - left) / 2)} {_number((bottom - top) / 2)} "
+                f"{_number((left + right) / 2)} {_number((top + bottom) / 2)} E\n")
+
+    def rectangle(self, item) -> str:
+        left, top, right, bottom = item._get_bounds()
+        if right <= left or bottom <= top:
+            return ""
+        return (f"{self._color(item._color)}{_number(left)} {_number(top)} "
+                f"{_number(right - left)} {_number(bottom - top)} R\n")
+
+    def _color(self, color) -> str:
+        """
+        Vrátí příkaz pro změnu barvy, nebo "", pokud je barva už
+        nastavena. None znamená černou barvu textů.
+        """
+        if color is self._current:
+            return ""
+        self._current = color
+        command = self._colors.get(color)
+        if command is None:
+            rgb = color.rgb if color is not None else (0, 0, 0)
+            command = self._colors[color] = " ".join(f"{value / 255:.4g}" for value in rgb) + " C "
+        return command
+
+
+def _number(value) -> str:
+    """
+    Zapíše souřadnici bez zbytečných desetinných míst.
+    """
+    if type(value) is int:
+        return str(value)
+    value = round(value, 3)
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def _comment(text: str) -> str:
+    return " ".join(str(text).split())
@@ -0,0 +1,321 @@
+"""
+Zde najdete index pořadí položek na plátně (z-order).
+Plátno si pořadí položek udržuje samo, aby se Multishape nemusel na
+pořadí svých částí ptát Tk přes find_all(), což znamená výpis celého
+display listu.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+
+# rozestup klíčů při přečíslování, mezi dva sousední klíče se vejde
+# mnoho vložení, než je třeba klíče znovu přečíslovat
+_SPACING = 1024.0
+# počet klíčů v jednom bloku seřazených klíčů, blok se při dvojnásobku rozdělí
+_BLOCK_SIZE = 512
+
+
+class _SortedKeys:
+    """
+    Seřazené klíče rozdělené do bloků o nejvýše 2 * _BLOCK_SIZE klíčích.
+    Blok se najde půlením přes maxima bloků, vložení i odebrání klíče
+    pak posune jen klíče v jednom bloku, ne celý seznam. Vložení,
+    odebrání i hledání souseda tak stojí O(log n) porovnání; jen když
+    blok vznikne nebo zanikne, posune se seznam bloků (n / _BLOCK_SIZE
+    odkazů).
+    """
+    __slots__ = ('_blocks', '_maxes', '_len')
+
+    def __init__(self, keys=()):
+        """
+        :param keys: už seřazené klíče
+        """
+        keys = list(keys)
+        self._blocks = [keys[start:start + _BLOCK_SIZE] for start in range(0, len(keys), _BLOCK_SIZE)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(keys)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+    def first(self) -> float | None:
+        return self._blocks[0][0] if self._blocks else None
+
+    def last(self) -> float | None:
+        return self._maxes[-1] if self._maxes else None
+
+    def add(self, key: float) -> None:
+        blocks, maxes = self._blocks, self._maxes
+        self._len += 1
+        if not maxes:
+            blocks.append([key])
+            maxes.append(key)
+            return
+        index = bisect_left(maxes, key)
+        if index == len(maxes):
+            # nad nejvyšší klíč, nejčastější případ (nová položka)
+            index -= 1
+            block = blocks[index]
+            block.append(key)
+            maxes[index] = key
+        else:
+            block = blocks[index]
+            insort(block, key)
+        if len(block) > 2 * _BLOCK_SIZE:
+            half = block[_BLOCK_SIZE:]
+            del block[_BLOCK_SIZE:]
+            blocks.insert(index + 1, half)
+            maxes[index] = block[-1]
+            maxes.insert(index + 1, half[-1])
+
+    def add_run(self, keys: list) -> None:
+        """
+        Vloží seřazené klíče, mezi které nepatří žádný jiný klíč
+        (přesouvané položky jdou vždy mezi dva sousedy), najednou do
+        jednoho bloku.
+        """
+        blocks, maxes = self._blocks, self._maxes
+        self._len += len(keys)
+        if not maxes:
+            blocks.append([])
+            maxes.append(keys[-1])
+        index = bisect_left(maxes, keys[0])
+        if index == len(maxes):
+            index -= 1
+        block = blocks[index]
+        position = bisect_left(block, keys[0])
+        block[position:position] = keys
+        maxes[index] = block[-1]
+        if len(block) > 2 * _BLOCK_SIZE:
+            parts = [block[start:start + _BLOCK_SIZE] for start in range(0, len(block), _BLOCK_SIZE)]
+            blocks[index:index + 1] = parts
+            maxes[index:index + 1] = [part[-1] for part in parts]
+
+    def remove(self, key: float) -> None:
+        index = bisect_left(self._maxes, key)
+        block = self._blocks[index]
+        del block[bisect_left(block, key)]
+        self._len -= 1
+        if block:
+            self._maxes[index] = block[-1]
+        else:
+            del self._blocks[index]
+            del self._maxes[index]
+
+    def higher(self, key: float) -> float | None:
+        """
+        Vrátí nejbližší vyšší klíč, nebo None.
+        """
+        index = bisect_right(self._maxes, key)
+        if index == len(self._maxes):
+            return None
+        block = self._blocks[index]
+        return block[bisect_right(block, key)]
+
+    def lower(self, key: float) -> float | None:
+        """
+        Vrátí nejbližší nižší klíč, nebo None.
+        """
+        index = bisect_left(self._maxes, key)
+        if index < len(self._blocks):
+            block = self._blocks[index]
+            position = bisect_left(block, key)
+            if position:
+                return block[position - 1]
+        return self._maxes[index - 1] if index else None
+
+
+class StackingIndex:
+    """
+    Index pořadí položek plátna odspodu nahoru.
+    Každá položka má číselný klíč, vyšší klíč znamená vyšší vrstvu.
+    Klíče jsou uloženy seřazené po blocích (_SortedKeys), takže přidání,
+    odebrání i vyhledání souseda při přesunu je O(log n). Při přesunu dostanou přesouvané položky
+    nové klíče mezi klíči sousedů, ostatní položky se nemění.
+    Operace, které index nedokáže sledovat (např. přesun podle tagu),
+    index zneplatní a ten se při dalším dotazu obnoví z find_all().
+    """
+
+    def __init__(self, find_all, on_change=None):
+        """
+        :param find_all: funkce vracející id všech položek odspodu nahoru
+        :param on_change: funkce volaná s listem id, jejichž pořadí se změnilo
+        """
+        self._find_all = find_all
+        self._on_change = on_change
+        self._keys = {}
+        self._sorted_keys = _SortedKeys()
+        self._items = {}
+        self._valid = True
+        # zvýší se při každém obnovení z find_all(), viz Multishape
+        self.generation = 0
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._keys)
+
+    def __contains__(self, item_id) -> bool:
+        self.refresh()
+        return item_id in self._keys
+
+    def invalidate(self) -> None:
+        """
+        Označí index za neplatný, obnoví se při dalším dotazu.
+        """
+        self._valid = False
+
+    def refresh(self) -> None:
+        """
+        Pokud je index neplatný, obnoví ho z find_all().
+        """
+        if not self._valid:
+            self._renumber(list(self._find_all()))
+            self._valid = True
+            self.generation += 1
+
+    def _renumber(self, order: list) -> None:
+        """
+        Přidělí položkám v daném pořadí nové klíče s rozestupem _SPACING.
+        """
+        self._keys = {}
+        self._items = {}
+        for position, item_id in enumerate(order, 1):
+            key = position * _SPACING
+            self._keys[item_id] = key
+            self._items[key] = item_id
+        self._sorted_keys = _SortedKeys(self._items)
+
+    def key(self, item_id) -> float | None:
+        """
+        Vrátí klíč položky, vyšší klíč je vyšší vrstva.
+        """
+        self.refresh()
+        return self._keys.get(item_id)
+
+    def add(self, item_id: int) -> None:
+        """
+        Přidá nově vytvořenou položku, ta je vždy nahoře. Položka,
+        která už v indexu je, se přesune nahoru.
+        """
+        if not self._valid:
+            return
+        old_key = self._keys.get(item_id)
+        if old_key is not None:
+            # znovu použitá položka (pool), její starý klíč se odebere
+            self._remove_key(old_key)
+        last = self._sorted_keys.last()
+        key = (last if last is not None else 0) + _SPACING
+        self._keys[item_id] = key
+        self._items[key] = item_id
+        self._sorted_keys.add(key)
+
+    def discard(self, item_id: int) -> None:
+        """
+        Odebere smazanou položku.
+        """
+        if not self._valid:
+            return
+        key = self._keys.pop(item_id, None)
+        if key is not None:
+            self._remove_key(key)
+
+    def discard_many(self, item_ids) -> None:
+        """
+        Odebere najednou mnoho smazaných položek. Pokud jich je hodně,
+        seřazené klíče se sestaví znovu jedním průchodem.
+        """
+        if not self._valid:
+            return
+        removed = set()
+        for item_id in item_ids:
+            key = self._keys.pop(item_id, None)
+            if key is not None:
+                del self._items[key]
+                removed.add(key)
+        if len(removed) * _BLOCK_SIZE > len(self._sorted_keys):
+            self._sorted_keys = _SortedKeys(key for key in self._sorted_keys if key not in removed)
+        else:
+            for key in removed:
+                self._sorted_keys.remove(key)
+
+    def _remove_key(self, key: float) -> None:
+        del self._items[key]
+        self._sorted_keys.remove(key)
+
+    def in_order(self, item_ids) -> list:
+        """
+        Seřadí zadaná id odspodu nahoru, id mimo index vynechá.
+        """
+        self.refresh()
+        keys = self._keys
+        return sorted((item_id for item_id in item_ids if item_id in keys), key=keys.__getitem__)
+
+    def raise_items(self, item_ids, above=None) -> None:
+        """
+        Přesune položky nad položku above, případně úplně nahoru,
+        stejně jako tag_raise. Vzájemné pořadí přesouvaných položek
+        se zachová.
+        """
+        self._move(item_ids, above, True)
+
+    def lower_items(self, item_ids, below=None) -> None:
+        """
+        Přesune položky pod položku below, případně úplně dolů,
+        stejně jako tag_lower. Vzájemné pořadí přesouvaných položek
+        se zachová.
+        """
+        self._move(item_ids, below, False)
+
+    def _move(self, item_ids, target, upwards: bool) -> None:
+        self.refresh()
+        moved = self.in_order(item_ids)
+        if not moved:
+            return
+        if target is not None and (target not in self._keys or target in moved):
+            # takový přesun index nesleduje, zeptá se raději plátna
+            self.invalidate()
+            return
+        for item_id in moved:
+            self._remove_key(self._keys.pop(item_id))
+        count = len(moved)
+        low, high = self._neighbours(target, upwards)
+        if low is not None and high is not None and (high - low) / (count + 1) <= abs(high) * 1e-12:
+            # mezi sousedy už není místo, klíče se přečíslují
+            self._renumber([self._items[key] for key in self._sorted_keys])
+            low, high = self._neighbours(target, upwards)
+        if low is None:
+            # pod nejnižší položku
+            step = _SPACING
+            low = high - step * (count + 1)
+        elif high is None:
+            # nad nejvyšší položku
+            step = _SPACING
+        else:
+            step = (high - low) / (count + 1)
+        new_keys = [low + step * (n + 1) for n in range(count)]
+        for item_id, key in zip(moved, new_keys):
+            self._keys[item_id] = key
+            self._items[key] = item_id
+        self._sorted_keys.add_run(new_keys)
+        if self._on_change is not None:
+            self._on_change(moved)
+
+    def _neighbours(self, target, upwards: bool) -> tuple:
+        """
+        Vrátí klíče, mezi které se mají přesouvané položky vložit.
+        None znamená, že na té straně žádná položka není.
+        """
+        sorted_keys = self._sorted_keys
+        if target is None:
+            if upwards:
+                last = sorted_keys.last()
+                return (last if last is not None else 0), None
+            first = sorted_keys.first()
+            return None, (first if first is not None else 0)
+        key = self._keys[target]
+        if upwards:
+            return key, sorted_keys.higher(key)
+        return sorted_keys.lower(key), key
@@ -27,11 +27,17 @@ verze: 1.3 29.04.2024
 """
 
 from .CanvasShapes import canvas, canvas_step
+from .Backends import MemoryBackend, register_backend
 from .Multishape import Multishape
+from .ShapeCollection import ShapeCollection
+from .Instance import MultishapeInstance
 from .Rectangle import Rectangle
 from .Triangle import Triangle
 from .Ellipse import Ellipse
 from .Text import Text
+from .Scene import save_scene, load_scene
+from .Raster import rasterize, save_image
+from .Vector import export_svg, export_postscript
 from .NamedColor import *
 from .Direction8 import *
 
@@ -43,3 +49,12 @@ def mainloop() -> None:
     aby okno zůstalo po vykonání skriptu.
     """
     canvas.mainloop()
+
+
+def use_backend(backend) -> None:
+    """
+    Zvolí vykreslovací backend plátna, např. "memory" pro běh bez
+    displeje. Je třeba zavolat před vytvořením prvního tvaru.
+    :param backend: jméno backendu nebo jeho instance
+    """
+    canvas.use_backend(backend)
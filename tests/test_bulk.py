@@ -0,0 +1,66 @@
+"""
+Testy hromadného vytváření tvarů (backend memory).
+
+    python -m unittest discover tests
+"""
+
+import gc
+import unittest
+import weakref
+
+import shapes
+
+shapes.use_backend("memory")
+
+
+class TriangleBulkTest(unittest.TestCase):
+
+    def tearDown(self):
+        for shape in list(shapes.canvas.all_shapes):
+            shape.remove()
+
+    def test_default_direction(self):
+        triangles = shapes.Triangle.bulk([0, 20], [0, 0], 10, 10)
+        expected = shapes.Triangle(40, 0, 10, 10)
+        for triangle in triangles.shapes:
+            self.assertIs(triangle.dir8, expected.dir8)
+            self.assertEqual(list(shapes.canvas.backend.items[triangle.canvas_id].coords), list(triangle.get_coord()))
+        triangles.move(5, 0)
+        self.assertEqual(triangles.shapes[0].x, 5)
+
+    def test_directions(self):
+        directions = [shapes.Direction8.SOUTH, shapes.Direction8.EAST]
+        triangles = shapes.Triangle.bulk([0, 20], [0, 0], 10, 10, dir8=directions)
+        for triangle, dir8 in zip(triangles.shapes, directions):
+            copy = shapes.Triangle(triangle.x, triangle.y, 10, 10, dir8=dir8)
+            self.assertEqual(triangle.get_coord(), copy.get_coord())
+
+
+
+class CollectionMemberTest(unittest.TestCase):
+
+    def tearDown(self):
+        for shape in list(shapes.canvas.all_shapes):
+            shape.remove()
+
+    def test_removed_shape_is_released(self):
+        cells = shapes.Rectangle.bulk(range(0, 40, 10), 0, 5, 5)
+        removed = weakref.ref(cells[1])
+        cells[1].remove()
+        self.assertEqual(len(cells), 3)
+        self.assertNotIn(removed(), cells.shapes)
+        gc.collect()
+        self.assertIsNone(removed())
+        cells.move(1, 0)
+        self.assertEqual([cell.x for cell in cells], [1, 21, 31])
+
+    def test_collection_remove_keeps_shapes(self):
+        cells = shapes.Rectangle.bulk(range(0, 40, 10), 0, 5, 5)
+        cells.remove()
+        self.assertEqual(len(cells), 4)
+        cells[0].paint()
+        self.assertIn(cells._group_tag, shapes.canvas.backend.items[cells[0].canvas_id].tags)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+"""
+Testy registru barev (backend memory).
+
+    python -m unittest discover tests
+"""
+
+import unittest
+
+import shapes
+from shapes import NamedColor
+
+shapes.use_backend("memory")
+
+
+class UnnamedColorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.max_unnamed = NamedColor.MAX_UNNAMED_COLORS
+        NamedColor.MAX_UNNAMED_COLORS = 8
+
+    def tearDown(self):
+        NamedColor.MAX_UNNAMED_COLORS = self.max_unnamed
+        for shape in list(shapes.canvas.all_shapes):
+            shape.remove()
+
+    def test_used_color_is_kept(self):
+        shape = shapes.Rectangle(0, 0, 10, 10, shapes.getColor(1, 2, 3))
+        for blue in range(100):
+            shapes.getColor(4, 5, blue)
+        self.assertIs(shapes.getColor(1, 2, 3), shape.color)
+        self.assertIs(shapes.getColor(name=shape.color.name), shape.color)
+
+    def test_unused_color_is_forgotten(self):
+        for blue in range(100):
+            shapes.getColor(6, 7, blue)
+        self.assertLessEqual(len([rgb for rgb in NamedColor._rgb2color if rgb[:2] == (6, 7)]), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
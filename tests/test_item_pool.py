@@ -0,0 +1,56 @@
+"""
+Testy poolu položek plátna a indexu pořadí (backend memory).
+
+    python -m unittest discover tests
+"""
+
+import unittest
+
+import shapes
+
+shapes.use_backend("memory")
+
+
+def visible_order() -> list:
+    """
+    Vrátí pořadí zobrazených položek přímo z backendu, bez indexu.
+    """
+    backend = shapes.canvas.backend
+    return [item_id for item_id in backend.find_all() if backend.items[item_id].options.get("state") != "hidden"]
+
+
+class ItemPoolOrderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = shapes.canvas.set_item_pool(max_size=10)
+
+    def tearDown(self):
+        for shape in list(shapes.canvas.all_shapes):
+            shape.remove()
+        shapes.canvas.set_item_pool(False)
+
+    def test_reused_item_after_refresh(self):
+        first = shapes.Rectangle(0, 0, 5, 5)
+        removed = shapes.Rectangle(1, 1, 5, 5)
+        top = shapes.Rectangle(2, 2, 5, 5)
+        removed.remove()
+        # přesun podle tagu zneplatní index, obnoví se z find_all
+        shapes.canvas.tag_raise(first._repr)
+        self.assertEqual(len(shapes.canvas.z_order), 2)
+        reused = shapes.Rectangle(3, 3, 5, 5)
+        self.assertEqual(reused.canvas_id, removed.canvas_id)
+        z_order = shapes.canvas.z_order
+        self.assertEqual(len(z_order), 3)
+        self.assertEqual(z_order.in_order(shapes.canvas.find_all()), visible_order())
+
+        reused.lower_to_bottom()
+        # opakované vkládání nad stejnou položku vyčerpá místo mezi
+        # klíči a index se sám přečísluje
+        for _ in range(30):
+            first.raise_above_shape(reused)
+            top.raise_above_shape(reused)
+        self.assertEqual(z_order.in_order(shapes.canvas.find_all()), visible_order())
+        self.assertIs(shapes.canvas.find_shape(visible_order()[0]), reused)
+
+if __name__ == "__main__":
+    unittest.main()
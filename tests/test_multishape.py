@@ -0,0 +1,66 @@
+"""
+Testy vnořených multishapů (backend memory).
+
+    python -m unittest discover tests
+"""
+
+import unittest
+
+import shapes
+
+shapes.use_backend("memory")
+
+
+class NestedMultishapeTest(unittest.TestCase):
+
+    def tearDown(self):
+        for shape in list(shapes.canvas.all_shapes):
+            shape.remove()
+
+    def test_second_parent_gets_copy(self):
+        arm = shapes.Multishape("arm", shapes.Rectangle(0, 0, 5, 5), shapes.Rectangle(5, 0, 5, 5))
+        first = shapes.Multishape("first", arm)
+        second = shapes.Multishape("second", arm)
+        self.assertIs(first.children[0], arm)
+        copy, = second.children
+        self.assertIsNot(copy, arm)
+        self.assertIs(copy._parent, second)
+        self.assertEqual([(part.x, part.y) for part in copy.parts], [(0, 0), (5, 0)])
+        self.assertFalse(set(copy.parts) & set(arm.parts))
+        self.assertEqual(len(shapes.canvas.all_shapes), 4)
+
+    def test_cycle_raises(self):
+        arm = shapes.Multishape("arm", shapes.Rectangle(0, 0, 5, 5))
+        body = shapes.Multishape("body", arm)
+        with self.assertRaises(Exception):
+            arm.add_child(body)
+
+
+
+class InstanceTest(unittest.TestCase):
+
+    def tearDown(self):
+        for shape in list(shapes.canvas.all_shapes):
+            shape.remove()
+
+    def test_refresh_skips_removed_parts(self):
+        wheel = shapes.Ellipse(10, 0, 5, 5)
+        robot = shapes.Multishape("robot", shapes.Rectangle(0, 0, 10, 10), wheel)
+        robot.creation_is_done()
+        instance = robot.instantiate(50, 50)
+        self.assertEqual(len(instance._item_ids), 2)
+        options = shapes.canvas.backend.items[instance._item_ids[1]].options
+        self.assertEqual(options.get("outline"), "")
+        wheel.remove()
+        instance.refresh()
+        self.assertEqual(len(instance._item_ids), 1)
+        robot.remove()
+        instance.refresh()
+        self.assertEqual(instance._item_ids, ())
+        wheel.paint()
+        instance.refresh()
+        self.assertEqual(len(instance._item_ids), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
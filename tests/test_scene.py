@@ -0,0 +1,69 @@
+"""
+Testy uložení a načtení scény (backend memory).
+
+    python -m unittest discover tests
+"""
+
+import io
+import unittest
+
+import shapes
+
+shapes.use_backend("memory")
+
+
+def tree(multishape: shapes.Multishape) -> tuple:
+    """
+    Vrátí strom multishapu jako názvy, souřadnice vlastních částí a podstromy.
+    """
+    parts = [(type(part).__name__, part.x, part.y, part.width, part.height) for part in multishape.parts]
+    return multishape._name, parts, [tree(child) for child in multishape.children]
+
+
+class SceneTreeTest(unittest.TestCase):
+
+    def setUp(self):
+        wheel = shapes.Multishape("wheel", shapes.Ellipse(10, 40, 10, 10), shapes.Ellipse(30, 40, 10, 10))
+        robot = shapes.Multishape("robot", shapes.Rectangle(10, 10, 30, 30))
+        robot.add_child(wheel)
+        robot.creation_is_done()
+        self.army = shapes.Multishape("army", shapes.Triangle(60, 10, 20, 20))
+        self.army.add_child(robot)
+        self.army.creation_is_done()
+
+    def tearDown(self):
+        for shape in list(shapes.canvas.all_shapes):
+            shape.remove()
+
+    def round_trip(self, format: str) -> list:
+        expected = tree(self.army)
+        buffer = io.StringIO() if format == "jsonl" else io.BytesIO()
+        shapes.save_scene(buffer, format=format)
+        self.tearDown()
+        buffer.seek(0)
+        loaded, multishapes = shapes.load_scene(buffer, format=format)
+        self.assertEqual(len(loaded), 4)
+        roots = [multishape for multishape in multishapes if multishape._parent is None]
+        self.assertEqual([tree(root) for root in roots], [expected])
+        return roots
+
+    def test_nested_binary(self):
+        self.round_trip("binary")
+        # tvary se načtou bez kolekce bulk, jen s tagy svých multishapů
+        for shape in shapes.canvas.all_shapes:
+            self.assertTrue(all(isinstance(group, shapes.Multishape) for group in shape._multishapes))
+            tags = shapes.canvas.backend.items[shape.canvas_id].tags
+            self.assertFalse([tag for tag in tags if tag.startswith("collection_")])
+
+    def test_nested_jsonl(self):
+        army, = self.round_trip("jsonl")
+        robot, = army.children
+        wheel, = robot.children
+        self.assertEqual(len(army._get_all_parts()), 4)
+        self.assertEqual([army._creation_done, robot._creation_done, wheel._creation_done], [True, True, False])
+        army.move_right(5)
+        self.assertEqual([part.x for part in wheel.parts], [15, 35])
+
+
+if __name__ == "__main__":
+    unittest.main()